@@ -1,5 +1,68 @@
 """
-auth.py
+Authentication
+JWT bearer tokens for the admin API.
+
+Tokens carry either `sudo: true` (all groups, group management) or a
+`groups` list of the group ids they may read. Verification is local
+(signature + expiry), no database round trip per request.
 """
 
-# TODO: Implement
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+
+from config import settings
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def create_access_token(subject: str, sudo: bool = False, groups: Optional[List[int]] = None) -> str:
+    """Signed token for a SUDO admin or for a set of groups."""
+    expires = datetime.now(timezone.utc) + timedelta(minutes=settings.API_ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {"sub": subject, "sudo": sudo, "groups": groups or [], "exp": expires}
+    return jwt.encode(claims, settings.API_SECRET_KEY, algorithm=settings.API_ALGORITHM)
+
+
+async def get_token_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)
+) -> Dict[str, Any]:
+    """Claims of a valid bearer token (401 otherwise)."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return jwt.decode(credentials.credentials, settings.API_SECRET_KEY, algorithms=[settings.API_ALGORITHM])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+async def require_sudo(claims: Dict[str, Any] = Depends(get_token_claims)) -> Dict[str, Any]:
+    if not claims.get("sudo"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="SUDO token required")
+    return claims
+
+
+async def require_group_access(group_id: int, claims: Dict[str, Any] = Depends(get_token_claims)) -> Dict[str, Any]:
+    """For routes with a {group_id} path parameter."""
+    if not claims.get("sudo") and group_id not in claims.get("groups", ()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No access to this group")
+    return claims
+
+
+__all__ = [
+    "create_access_token",
+    "get_token_claims",
+    "require_sudo",
+    "require_group_access",
+]
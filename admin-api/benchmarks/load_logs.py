@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Log Listing Load Test
+Throughput and latency of GET /api/logs/groups/{id} on a group with
+millions of events (default 10M).
+
+The events are seeded into `logs_buckets` of a scratch database with the
+bot's writer layout (database-migrations/log_buckets.py) and production
+indexes. Workers then page through the timeline: each session starts at a
+random point in time (`until`) and follows next_cursor for --depth pages,
+so deep pages are measured as well as first pages.
+
+By default the app runs in-process (httpx ASGI transport, no network);
+with --url the requests go to a running server, which must use the same
+DATABASE_NAME and API_SECRET_KEY.
+
+Needs a running MongoDB.
+
+Usage (from admin-api/):
+    MONGODB_URI=mongodb://localhost:27017/ python benchmarks/load_logs.py [--events 10000000] [--seed]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_NAME", "bench_admin_api")
+os.environ.setdefault("API_SECRET_KEY", "bench")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from auth import create_access_token
+from config import settings
+from services.database import close_database, get_database, init_database
+from indexes import INDEXES
+from log_buckets import LOG_BUCKETS_COLLECTION, bucket_updates
+
+GROUP_ID = -1001
+TYPES = ["delete", "warn", "mute", "kick", "ban", "join", "leave", "settings"]
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+async def seed(events: int, days: int, batch_size: int):
+    """Write `events` evenly spread over `days` into one group's buckets."""
+    db = get_database()
+    await db.drop_collection(LOG_BUCKETS_COLLECTION)
+    collection = db[LOG_BUCKETS_COLLECTION]
+    await collection.create_indexes(INDEXES[LOG_BUCKETS_COLLECTION])
+
+    rng = random.Random(42)
+    step = days * 86400 / events
+    started = time.perf_counter()
+    for offset in range(0, events, batch_size):
+        batch = [
+            (
+                GROUP_ID,
+                rng.choices(TYPES, [50, 15, 10, 5, 5, 10, 4, 1])[0],
+                START + timedelta(seconds=index * step),
+                rng.randrange(1, 5_000),
+                rng.randrange(1, 2_000_000),
+                {"module": "anti_spam", "rule": "flood"},
+            )
+            for index in range(offset, min(offset + batch_size, events))
+        ]
+        await collection.bulk_write(bucket_updates(batch, settings.LOG_BUCKET_MINUTES), ordered=False)
+        if (offset // batch_size) % 200 == 0:
+            print(f"  seeded {offset + len(batch):,} events", end="\r")
+    elapsed = time.perf_counter() - started
+    print(f"seeded {events:,} events in {elapsed:.1f}s ({events / elapsed:,.0f}/s)          ")
+
+
+async def session(client: httpx.AsyncClient, rng: random.Random, days: int, depth: int, limit: int, latencies: dict):
+    until = START + timedelta(seconds=rng.uniform(0, days * 86400))
+    params = {"limit": limit, "until": until.isoformat()}
+    for page in range(depth):
+        started = time.perf_counter()
+        response = await client.get(f"/api/logs/groups/{GROUP_ID}", params=params)
+        latencies["first" if page == 0 else "next"].append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        cursor = response.json()["next_cursor"]
+        if not cursor:
+            return
+        params = {"limit": limit, "until": until.isoformat(), "cursor": cursor}
+
+
+def percentile(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] if len(values) > 1 else values[0]
+
+
+async def main(args):
+    await init_database()
+    try:
+        if args.seed or await get_database()[LOG_BUCKETS_COLLECTION].estimated_document_count() == 0:
+            await seed(args.events, args.days, args.batch_size)
+
+        token = create_access_token("bench", sudo=True)
+        headers = {"Authorization": f"Bearer {token}"}
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, headers=headers, timeout=30)
+        else:
+            from main import app
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers)
+
+        latencies = {"first": [], "next": []}
+        rng = random.Random(7)
+        queue = asyncio.Queue()
+        for _ in range(args.sessions):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                await session(client, rng, args.days, args.depth, args.limit, latencies)
+
+        async with client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+        requests = len(latencies["first"]) + len(latencies["next"])
+        print(
+            f"{requests:,} requests ({args.sessions} sessions x {args.depth} pages of {args.limit}), "
+            f"concurrency {args.concurrency}: {requests / elapsed:,.0f} req/s"
+        )
+        for name, values in latencies.items():
+            if values:
+                print(
+                    f"  {name:5} pages  p50 {percentile(values, 50):7.2f} ms  "
+                    f"p95 {percentile(values, 95):7.2f} ms  p99 {percentile(values, 99):7.2f} ms"
+                )
+    finally:
+        if args.drop:
+            await get_database().drop_collection(LOG_BUCKETS_COLLECTION)
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=90, help="Time span of the seeded events")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", action="store_true", help="Reseed even if the scratch collection has data")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=10, help="Pages followed per session")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--url", default=None, help="Running admin API (default: in-process)")
+    parser.add_argument("--drop", action="store_true", help="Drop the scratch collection afterwards")
+    asyncio.run(main(parser.parse_args()))
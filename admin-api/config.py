@@ -1,5 +1,67 @@
 """
-config.py
+Admin API Configuration
+Loads environment variables (same .env as bot-core) for the admin API.
 """
 
-# TODO: Implement
+from typing import List
+from pydantic_settings import BaseSettings
+from pydantic import Field, field_validator
+
+
+class Settings(BaseSettings):
+    """
+    Admin API settings loaded from environment variables.
+    Variables used only by bot-core are ignored.
+    """
+    
+    # ==================== Database Configuration ====================
+    MONGODB_URI: str = Field(default="mongodb://localhost:27017/", description="MongoDB connection URI")
+    DATABASE_NAME: str = Field(default="telegram_group_bot", description="Database name")
+    SKIP_INDEX_BOOTSTRAP: bool = Field(default=False, description="Skip index reconciliation on startup")
+    API_MONGODB_MAX_POOL_SIZE: int = Field(default=100, description="Max MongoDB connections of the API process")
+    API_MONGODB_MIN_POOL_SIZE: int = Field(default=10, description="MongoDB connections kept open when idle")
+    API_MONGODB_READ_PREFERENCE: str = Field(default="primaryPreferred", description="Read preference of API queries (e.g. secondaryPreferred on a replica set)")
+    LOG_BUCKET_MINUTES: int = Field(default=60, description="Width of a log bucket document in minutes (must match bot-core)")
+    
+    # ==================== API Configuration ====================
+    API_HOST: str = Field(default="0.0.0.0", description="API host")
+    API_PORT: int = Field(default=8000, description="API port")
+    API_SECRET_KEY: str = Field(..., description="Secret key for JWT")
+    API_ALGORITHM: str = Field(default="HS256", description="JWT algorithm")
+    API_ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, description="Token expiration in minutes")
+    API_PAGE_SIZE: int = Field(default=50, description="Default page size of list endpoints")
+    API_MAX_PAGE_SIZE: int = Field(default=500, description="Largest page size a client may request")
+    STATS_CACHE_TTL: int = Field(default=30, description="Seconds a computed stats response is reused")
+    EXPORT_BATCH_SIZE: int = Field(default=1000, description="Rows read and sent per export chunk")
+    EXPORT_GZIP_LEVEL: int = Field(default=6, description="gzip level of exports (1 fastest, 9 smallest)")
+    STATS_CACHE_MAX_SIZE: int = Field(default=2048, description="Stats responses kept in memory")
+    
+    # ==================== Logging Configuration ====================
+    LOG_LEVEL: str = Field(default="INFO", description="Log level")
+    
+    # ==================== Dashboard Configuration ====================
+    CORS_ORIGINS: List[str] = Field(
+        default=["http://localhost:3000"],
+        description="CORS allowed origins"
+    )
+    
+    @field_validator('CORS_ORIGINS', mode='before')
+    def parse_cors_origins(cls, v):
+        """Parse CORS_ORIGINS from comma-separated string or list."""
+        if isinstance(v, str):
+            return [x.strip() for x in v.split(',') if x.strip()]
+        return v
+    
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        case_sensitive = True
+        extra = "ignore"
+
+
+# ==================== Create Settings Instance ====================
+settings = Settings()
+
+
+# ==================== Export ====================
+__all__ = ["settings"]
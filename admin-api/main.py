@@ -1,5 +1,58 @@
 """
-main.py
+Admin API
+REST API for the dashboard and external integrations.
+
+Run from admin-api/:
+    uvicorn main:app --host 0.0.0.0 --port 8000 --workers 4
+
+Each worker process owns one Motor client (connection pool), opened in the
+lifespan handler and shared by all requests of that worker.
 """
 
-# TODO: Implement
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from loguru import logger
+
+from config import settings
+from services.database import close_database, init_database
+from routes import groups, logs, stats, users
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_database()
+    logger.success("🚀 Admin API started")
+    yield
+    await close_database()
+    logger.info("👋 Admin API stopped")
+
+
+app = FastAPI(title="Telegram Group Bot Admin API", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["ETag"],
+)
+# Log pages of a few hundred events compress ~10x
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+for module in (groups, users, logs, stats):
+    app.include_router(module.router, prefix="/api")
+
+
+@app.get("/health", tags=["health"])
+async def health():
+    return {"status": "ok", "stats_cache": stats.stats_cache.get_stats()}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("main:app", host=settings.API_HOST, port=settings.API_PORT, log_level=settings.LOG_LEVEL.lower())
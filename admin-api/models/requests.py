@@ -1,5 +1,17 @@
 """
-requests.py
+Request Models
+Pydantic models accepted by the admin API routes.
 """
 
-# TODO: Implement
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class GroupUpdate(BaseModel):
+    """Partial update of a group; omitted fields are left unchanged."""
+    approved: Optional[bool] = Field(default=None, description="Approve or revoke the group")
+    language: Optional[str] = Field(default=None, min_length=2, max_length=8, description="Group language code")
+
+
+__all__ = ["GroupUpdate"]
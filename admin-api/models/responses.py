@@ -1,5 +1,97 @@
 """
-responses.py
+Response Models
+Pydantic models returned by the admin API routes.
 """
 
-# TODO: Implement
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TopUser(BaseModel):
+    user_id: int
+    messages: int = Field(description="Estimated message count (top-K sketch, may overestimate)")
+
+
+class PeakHour(BaseModel):
+    hour: int = Field(description="UTC hour of day")
+    messages: int
+
+
+class GroupStatsResponse(BaseModel):
+    group_id: int
+    since: datetime
+    until: datetime
+    messages: int
+    joins: int
+    leaves: int
+    actions: Dict[str, int] = Field(description="Moderation actions by type")
+    media: Dict[str, int] = Field(description="Messages by kind")
+    hours: List[int] = Field(description="Messages per UTC hour of day")
+    peak_hours: List[PeakHour]
+    top_users: List[TopUser]
+    documents_read: int = Field(description="Rollup documents merged for this response")
+
+
+# ==================== Groups ====================
+
+class GroupSummary(BaseModel):
+    group_id: int
+    approved: bool = False
+    language: Optional[str] = None
+    owner_user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class GroupListResponse(BaseModel):
+    items: List[GroupSummary]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page (null on the last page)")
+
+
+# ==================== Members ====================
+
+class MemberSummary(BaseModel):
+    user_id: int
+    role: Optional[str] = None
+    is_vip: bool = False
+    warns: int = 0
+    join_time: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    added_by: Optional[int] = None
+
+
+class MemberListResponse(BaseModel):
+    items: List[MemberSummary]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page (null on the last page)")
+
+
+# ==================== Logs ====================
+
+class LogEntry(BaseModel):
+    id: str = Field(description="Stable event id (bucket id and position)")
+    group_id: int
+    type: str
+    timestamp: datetime
+    actor_id: Optional[int] = None
+    target_id: Optional[int] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+
+
+class LogPage(BaseModel):
+    items: List[LogEntry]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page (null on the last page)")
+
+
+__all__ = [
+    "TopUser",
+    "PeakHour",
+    "GroupStatsResponse",
+    "GroupSummary",
+    "GroupListResponse",
+    "MemberSummary",
+    "MemberListResponse",
+    "LogEntry",
+    "LogPage",
+]
@@ -1,5 +1,92 @@
 """
-groups.py
+Group Routes
+Group list (keyset-paginated), details and approval.
+
+The list is ordered by (created_at, _id) newest first and served by the
+(approved, created_at, _id) index; without an approval filter both
+approval values are merged from that index.
+
+Writes set `updated_at`, which the bot's group cache watcher uses to
+invalidate cached group configs.
 """
 
-# TODO: Implement
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pymongo import DESCENDING, ReturnDocument
+
+from auth import require_sudo
+from config import settings
+from models.requests import GroupUpdate
+from models.responses import GroupListResponse, GroupSummary
+from services.database import get_database
+from services.pagination import after_key, decode_cursor, encode_cursor
+
+
+router = APIRouter(prefix="/groups", tags=["groups"], dependencies=[Depends(require_sudo)])
+
+# Fields returned by the group endpoints
+_PROJECTION = {
+    "_id": 1,
+    "group_id": 1,
+    "approved": 1,
+    "language": 1,
+    "owner_user_id": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+
+@router.get("", response_model=GroupListResponse)
+async def list_groups(
+    approved: Optional[bool] = Query(default=None, description="Only approved (true) or pending (false) groups"),
+    limit: int = Query(default=settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page")
+):
+    """Groups, newest first."""
+    query = {"approved": approved if approved is not None else {"$in": [True, False]}}
+    position = decode_cursor(cursor, 2)
+    if position is not None:
+        query = {"$and": [query, after_key(("created_at", "_id"), position)]}
+
+    docs = await get_database()["groups"].find(query, _PROJECTION).sort(
+        [("created_at", DESCENDING), ("_id", DESCENDING)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    return GroupListResponse(items=[GroupSummary(**doc) for doc in docs], next_cursor=next_cursor)
+
+
+@router.get("/{group_id}", response_model=GroupSummary)
+async def get_group(group_id: int):
+    doc = await get_database()["groups"].find_one({"group_id": group_id}, _PROJECTION)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return GroupSummary(**doc)
+
+
+@router.patch("/{group_id}", response_model=GroupSummary)
+async def update_group(group_id: int, update: GroupUpdate):
+    """Approve/revoke a group or change its language."""
+    fields = update.model_dump(exclude_none=True)
+    if not fields:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    fields["updated_at"] = datetime.now(timezone.utc)
+
+    doc = await get_database()["groups"].find_one_and_update(
+        {"group_id": group_id},
+        {"$set": fields},
+        projection=_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return GroupSummary(**doc)
+
+
+__all__ = ["router"]
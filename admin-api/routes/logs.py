@@ -1,5 +1,81 @@
 """
-logs.py
+Log Routes
+Event log of a group, newest first, keyset-paginated (services/logs.py),
+and its full streaming export (services/export.py).
 """
 
-# TODO: Implement
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from auth import require_group_access
+from config import settings
+from models.responses import LogEntry, LogPage
+from services.export import FORMATS, export_response
+from services.logs import iter_log_events, page_logs, resume_position
+from services.pagination import decode_cursor
+
+
+router = APIRouter(prefix="/logs", tags=["logs"])
+
+# Exported columns (`id` is the resume key)
+EXPORT_FIELDS = ("id", "timestamp", "type", "actor_id", "target_id", "data")
+
+
+def _utc(ts: Optional[datetime]) -> Optional[datetime]:
+    if ts is not None and ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+@router.get(
+    "/groups/{group_id}",
+    response_model=LogPage,
+    dependencies=[Depends(require_group_access)]
+)
+async def list_logs(
+    group_id: int,
+    type: Optional[List[str]] = Query(default=None, description="Event types (repeatable)"),
+    actor_id: Optional[int] = Query(default=None),
+    target_id: Optional[int] = Query(default=None),
+    since: Optional[datetime] = Query(default=None),
+    until: Optional[datetime] = Query(default=None),
+    limit: int = Query(default=settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page")
+):
+    """Events of a group, newest first. Filters must stay the same while paging."""
+    since, until = _utc(since), _utc(until)
+    if since is not None and until is not None and since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+
+    entries, next_cursor = await page_logs(
+        group_id,
+        limit,
+        position=decode_cursor(cursor, 4),
+        types=type,
+        actor_id=actor_id,
+        target_id=target_id,
+        since=since,
+        until=until
+    )
+    return LogPage(items=[LogEntry(**entry) for entry in entries], next_cursor=next_cursor)
+
+
+@router.get("/groups/{group_id}/export", dependencies=[Depends(require_group_access)])
+async def export_logs(
+    group_id: int,
+    format: str = Query(default="ndjson", pattern=f"^({'|'.join(FORMATS)})$"),
+    type: Optional[List[str]] = Query(default=None, description="Event types (repeatable)"),
+    since: Optional[datetime] = Query(default=None),
+    until: Optional[datetime] = Query(default=None),
+    after: Optional[str] = Query(default=None, description="id of the last row received, to resume")
+):
+    """Every event of a group, oldest first, as gzip NDJSON or CSV."""
+    since, until = _utc(since), _utc(until)
+    position = await resume_position(group_id, after)
+    rows = iter_log_events(group_id, types=type, since=since, until=until, after=position)
+    return export_response(rows, format, EXPORT_FIELDS, f"logs_{group_id}")
+
+
+__all__ = ["router"]
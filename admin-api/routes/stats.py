@@ -1,5 +1,81 @@
 """
-stats.py
+Stats Routes
+Dashboard statistics served from the pre-aggregated rollups
+(`stats_hourly`/`stats_daily`/`stats_monthly`, see database-migrations/stats_rollups.py).
+
+Responses are cached for STATS_CACHE_TTL seconds and carry an ETag; the
+default range end is truncated to the minute so polling dashboards share
+cache entries.
 """
 
-# TODO: Implement
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from auth import require_group_access
+from config import settings
+from models.responses import GroupStatsResponse, PeakHour, TopUser
+from services.cache import ResponseCache
+from services.database import get_database
+from stats_rollups import DEFAULT_TOP_K, load_stats, peak_hours
+
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+# Longest range one request may cover
+MAX_RANGE = timedelta(days=366)
+
+stats_cache = ResponseCache(ttl=settings.STATS_CACHE_TTL, max_size=settings.STATS_CACHE_MAX_SIZE)
+
+
+@router.get(
+    "/groups/{group_id}",
+    response_model=GroupStatsResponse,
+    responses={304: {"description": "Not modified (If-None-Match)"}},
+    dependencies=[Depends(require_group_access)]
+)
+async def group_stats(
+    request: Request,
+    group_id: int,
+    since: Optional[datetime] = Query(default=None, description="Range start (default: 7 days ago)"),
+    until: Optional[datetime] = Query(default=None, description="Range end (default: now)"),
+    top: int = Query(default=10, ge=1, le=DEFAULT_TOP_K, description="Top users to return")
+):
+    """Counters, peak hours and top users of a group over [since, until)."""
+    until = until or datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    since = since or until - timedelta(days=7)
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if until - since > MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Range is limited to 366 days")
+
+    key = (group_id, since, until, top)
+    cached = stats_cache.get(key)
+    if cached is not None:
+        return stats_cache.respond(request, *cached)
+
+    summary = await load_stats(get_database(), group_id, since, until)
+
+    body = GroupStatsResponse(
+        group_id=group_id,
+        since=since,
+        until=until,
+        messages=summary["messages"],
+        joins=summary["joins"],
+        leaves=summary["leaves"],
+        actions=summary["actions"],
+        media=summary["media"],
+        hours=summary["hours"],
+        peak_hours=[PeakHour(hour=hour, messages=count) for hour, count in peak_hours(summary)],
+        top_users=[TopUser(user_id=user_id, messages=count) for user_id, count in summary["top"].top(top)],
+        documents_read=summary["documents"],
+    ).model_dump_json().encode()
+    return stats_cache.respond(request, stats_cache.set(key, body), body)
+
+
+__all__ = ["router", "stats_cache"]
@@ -1,5 +1,104 @@
 """
-users.py
+User Routes
+Members of a group (`group_users`), keyset-paginated.
+
+Each order is served by a (group_id, <field>, _id) index, so any page is
+one index seek:
+
+    user_id     (group_id, user_id)              unique, no tie-breaker needed
+    last_seen   (group_id, last_seen, _id)       most recently active first
+    join_time   (group_id, join_time, _id)       newest members first
+
+Members without a value for the ordering field are not listed by that order.
+
+The export streams every member in user_id order (services/export.py);
+`after=<user_id>` resumes it.
 """
 
-# TODO: Implement
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from pymongo import ASCENDING, DESCENDING
+
+from auth import require_group_access
+from config import settings
+from models.responses import MemberListResponse, MemberSummary
+from services.database import get_database
+from services.export import FORMATS, export_response
+from services.pagination import after_key, decode_cursor, encode_cursor
+
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+# Fields returned by the member endpoints
+_PROJECTION = {
+    "_id": 1,
+    "user_id": 1,
+    "role": 1,
+    "is_vip": 1,
+    "warns": 1,
+    "join_time": 1,
+    "last_seen": 1,
+    "added_by": 1,
+}
+
+
+@router.get(
+    "/groups/{group_id}",
+    response_model=MemberListResponse,
+    dependencies=[Depends(require_group_access)]
+)
+async def list_members(
+    group_id: int,
+    order: str = Query(default="user_id", pattern="^(user_id|last_seen|join_time)$"),
+    limit: int = Query(default=settings.API_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page")
+):
+    """Members of a group in the requested order."""
+    if order == "user_id":
+        fields, sort = ("user_id",), [("user_id", ASCENDING)]
+        query = {"group_id": group_id}
+        position = decode_cursor(cursor, 1)
+        if position is not None:
+            query.update(after_key(fields, position, descending=False))
+    else:
+        fields, sort = (order, "_id"), [(order, DESCENDING), ("_id", DESCENDING)]
+        query = {"group_id": group_id, order: {"$type": "date"}}
+        position = decode_cursor(cursor, 2)
+        if position is not None:
+            query = {"$and": [query, after_key(fields, position)]}
+
+    docs = await get_database()["group_users"].find(query, _PROJECTION).sort(sort).limit(
+        limit + 1
+    ).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(*(docs[-1][field] for field in fields))
+
+    return MemberListResponse(
+        items=[MemberSummary(**{**doc, "is_vip": bool(doc.get("is_vip")), "warns": doc.get("warns") or 0}) for doc in docs],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/groups/{group_id}/export", dependencies=[Depends(require_group_access)])
+async def export_members(
+    group_id: int,
+    format: str = Query(default="ndjson", pattern=f"^({'|'.join(FORMATS)})$"),
+    after: Optional[int] = Query(default=None, description="user_id of the last row received, to resume")
+):
+    """Every member of a group, by user_id, as gzip NDJSON or CSV."""
+    query = {"group_id": group_id}
+    if after is not None:
+        query["user_id"] = {"$gt": after}
+
+    rows = get_database()["group_users"].find(query, {**_PROJECTION, "_id": 0}).sort(
+        "user_id", ASCENDING
+    ).batch_size(settings.EXPORT_BATCH_SIZE)
+    fields = [field for field in _PROJECTION if field != "_id"]
+    return export_response(rows, format, fields, f"members_{group_id}")
+
+
+__all__ = ["router"]
@@ -0,0 +1,58 @@
+"""
+Response Cache
+Short-TTL in-process cache of serialized responses, with ETags.
+
+Stats responses are merged from rollup documents that change at most every
+STATS_FLUSH_INTERVAL seconds, while dashboards poll them much more often.
+A cached body is reused until it expires, and its ETag lets clients
+revalidate with If-None-Match and get an empty 304.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+
+class ResponseCache:
+    """LRU-bounded TTL cache of (etag, body) per key."""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, bytes]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1], entry[2]
+
+    def set(self, key: Hashable, body: bytes) -> str:
+        """Store a body and return its ETag."""
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._entries[key] = (time.monotonic() + self.ttl, etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return etag
+
+    def respond(self, request: Request, etag: str, body: bytes) -> Response:
+        """JSON response, or 304 when the client already has this ETag."""
+        headers = {"ETag": etag, "Cache-Control": f"private, max-age={int(self.ttl)}"}
+        if etag in request.headers.get("if-none-match", ""):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "size": len(self._entries)}
+
+
+__all__ = ["ResponseCache"]
@@ -1,5 +1,89 @@
 """
-database.py
+Database Service
+MongoDB connection for the admin API using Motor (async).
+
+A single client is created at startup (main.py lifespan); every request
+borrows connections from its pool through get_database().
+
+Indexes are reconciled from the same declarations bot-core uses
+(database-migrations/indexes.py).
 """
 
-# TODO: Implement
+import sys
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from loguru import logger
+from typing import Optional
+
+from config import settings
+
+# Index declarations shared with bot-core
+sys.path.append(str(Path(__file__).resolve().parents[2] / "database-migrations"))
+from indexes import reconcile_indexes
+
+
+# ==================== Global Database Instance ====================
+_client: Optional[AsyncIOMotorClient] = None
+_database: Optional[AsyncIOMotorDatabase] = None
+
+
+def get_database() -> AsyncIOMotorDatabase:
+    """
+    Get database instance.
+    Must call init_database() first.
+    """
+    if _database is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    return _database
+
+
+async def init_database() -> AsyncIOMotorDatabase:
+    """
+    Initialize MongoDB connection and reconcile indexes.
+    """
+    global _client, _database
+    
+    # One client (and connection pool) per process, shared by every request
+    _client = AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        maxPoolSize=settings.API_MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.API_MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=60000,
+        readPreference=settings.API_MONGODB_READ_PREFERENCE,
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=5000,
+        socketTimeoutMS=5000
+    )
+    _database = _client[settings.DATABASE_NAME]
+    
+    await _client.admin.command('ping')
+    logger.info(f"📊 Connected to MongoDB: {settings.DATABASE_NAME}")
+    
+    if not settings.SKIP_INDEX_BOOTSTRAP:
+        summary = await reconcile_indexes(_database)
+        logger.info(
+            f"📇 Indexes ready in {summary['elapsed_ms']} ms "
+            f"(created={summary['created']}, rebuilt={summary['rebuilt']})"
+        )
+    
+    return _database
+
+
+async def close_database():
+    """
+    Close database connection gracefully.
+    """
+    global _client, _database
+    
+    if _client:
+        _client.close()
+        _client = None
+        _database = None
+        logger.info("📊 MongoDB connection closed")
+
+
+__all__ = [
+    "init_database",
+    "close_database",
+    "get_database",
+]
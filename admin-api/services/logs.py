@@ -0,0 +1,214 @@
+"""
+Log Pages
+Keyset pagination over the bucketed event log (`logs_buckets`,
+see database-migrations/log_buckets.py).
+
+Events live inside bucket documents, so a page position is an event
+position: (bucket_start, timestamp, bucket _id, index in the bucket).
+Buckets are read newest first on the (group_id, bucket_start) indexes and
+buckets sharing a start time (one per event type) are merged before
+emitting, so events come out newest first across types.
+
+A page reads the buckets it returns plus, for the first bucket start, the
+events already returned by the previous page: cost is proportional to the
+page size, never to its depth.
+
+Exports (iter_log_events) stream buckets oldest first in storage order
+instead, resumable after any event id.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+from config import settings
+from services.database import get_database
+from services.pagination import encode_cursor, to_ms
+from log_buckets import LOG_BUCKETS_COLLECTION, expand_event
+
+
+# Bucket documents fetched per round trip (a full bucket is ~1000 events)
+_BATCH_SIZE = 8
+
+# Group timeline index, also used for type-filtered exports so the sort
+# never falls back to an in-memory sort of every bucket
+_TIMELINE_INDEX = [("group_id", ASCENDING), ("bucket_start", DESCENDING), ("_id", DESCENDING)]
+
+
+def _bucket_query(
+    group_id: int,
+    types: Optional[Sequence[str]],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    position: Optional[Tuple]
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"group_id": group_id}
+    if types:
+        query["type"] = types[0] if len(types) == 1 else {"$in": list(types)}
+
+    bucket_range: Dict[str, Any] = {}
+    if since is not None:
+        bucket_range["$gt"] = since - timedelta(minutes=settings.LOG_BUCKET_MINUTES)
+    if until is not None:
+        bucket_range["$lte"] = until
+    if position is not None:
+        start = position[0]
+        if "$lte" not in bucket_range or start < bucket_range["$lte"]:
+            bucket_range["$lte"] = start
+    if bucket_range:
+        query["bucket_start"] = bucket_range
+    return query
+
+
+async def page_logs(
+    group_id: int,
+    limit: int,
+    position: Optional[Tuple] = None,
+    types: Optional[Sequence[str]] = None,
+    actor_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a group's events, newest first.
+
+    Args:
+        position: Decoded cursor (bucket_start, timestamp, bucket_id, index)
+            of the last event of the previous page
+
+    Returns:
+        (entries, next cursor or None on the last page)
+    """
+    after = None
+    if position is not None:
+        after = (to_ms(position[1]), position[2], position[3])
+
+    cursor = get_database()[LOG_BUCKETS_COLLECTION].find(
+        _bucket_query(group_id, types, since, until, position)
+    ).sort("bucket_start", DESCENDING).batch_size(_BATCH_SIZE)
+
+    entries: List[Dict[str, Any]] = []
+    group: List[Tuple[Tuple, Dict[str, Any]]] = []
+    group_start = None
+
+    def drain() -> bool:
+        """Emit the merged events of one bucket start; True once past a full page."""
+        group.sort(key=lambda item: item[0], reverse=True)
+        for key, entry in group:
+            if after is not None and key >= after:
+                continue
+            entries.append(entry)
+            if len(entries) > limit:
+                return True
+        group.clear()
+        return False
+
+    async for bucket in cursor:
+        if group_start is not None and bucket["bucket_start"] != group_start and drain():
+            break
+        group_start = bucket["bucket_start"]
+
+        for index, event in enumerate(bucket.get("events", ())):
+            if actor_id is not None and event.get("a") != actor_id:
+                continue
+            if target_id is not None and event.get("t") != target_id:
+                continue
+            entry = expand_event(bucket, event)
+            if since is not None and entry["timestamp"] < since:
+                continue
+            if until is not None and entry["timestamp"] > until:
+                continue
+            entry["id"] = f"{bucket['_id']}:{index}"
+            entry["_key"] = (bucket["bucket_start"], bucket["_id"], index)
+            group.append(((to_ms(entry["timestamp"]), bucket["_id"], index), entry))
+    else:
+        drain()
+
+    # One entry past the page tells whether another page exists
+    next_cursor = None
+    if len(entries) > limit:
+        last = entries[limit - 1]
+        start, bucket_id, index = last["_key"]
+        next_cursor = encode_cursor(start, last["timestamp"], bucket_id, index)
+    entries = entries[:limit]
+    for entry in entries:
+        del entry["_key"]
+    return entries, next_cursor
+
+
+# ==================== Export ====================
+
+async def resume_position(group_id: int, after: Optional[str]) -> Optional[Tuple[datetime, ObjectId, int]]:
+    """
+    (bucket_start, bucket_id, index) of an event id ("<bucket_id>:<index>").
+
+    Raises:
+        HTTPException 400: Malformed id, or its bucket no longer exists
+    """
+    if not after:
+        return None
+    try:
+        bucket_id, index = after.rsplit(":", 1)
+        bucket_id, index = ObjectId(bucket_id), int(index)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid resume id")
+
+    bucket = await get_database()[LOG_BUCKETS_COLLECTION].find_one(
+        {"_id": bucket_id, "group_id": group_id}, {"bucket_start": 1}
+    )
+    if bucket is None:
+        raise HTTPException(status_code=400, detail="Resume id not found (expired?)")
+    return bucket["bucket_start"], bucket_id, index
+
+
+async def iter_log_events(
+    group_id: int,
+    types: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, ObjectId, int]] = None,
+    batch_size: int = _BATCH_SIZE
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Every event of a group, oldest bucket first, one cursor batch in memory.
+
+    Args:
+        after: resume_position() of the last event already received
+    """
+    query = _bucket_query(group_id, types, since, until, None)
+    if after is not None:
+        start, bucket_id, _ = after
+        query = {"$and": [query, {"$or": [
+            {"bucket_start": {"$gt": start}},
+            {"bucket_start": start, "_id": {"$gte": bucket_id}},
+        ]}]}
+
+    cursor = get_database()[LOG_BUCKETS_COLLECTION].find(query).sort(
+        [("bucket_start", ASCENDING), ("_id", ASCENDING)]
+    ).hint(_TIMELINE_INDEX).batch_size(batch_size)
+
+    async for bucket in cursor:
+        first = 0
+        if after is not None and bucket["_id"] == after[1]:
+            first = after[2] + 1
+        events = bucket.get("events", ())
+        for index in range(first, len(events)):
+            entry = expand_event(bucket, events[index])
+            if since is not None and entry["timestamp"] < since:
+                continue
+            if until is not None and entry["timestamp"] > until:
+                continue
+            entry["id"] = f"{bucket['_id']}:{index}"
+            yield entry
+
+
+__all__ = [
+    "page_logs",
+    "resume_position",
+    "iter_log_events",
+]
@@ -0,0 +1,106 @@
+"""
+Pagination Service
+Opaque cursors for keyset (seek) pagination.
+
+List endpoints never use skip/limit: a page ends with the sort key of its
+last item, and the next page starts strictly after it. Every page is then
+one index seek, whatever its depth, and items inserted while a client is
+paging do not shift or duplicate later pages.
+
+A cursor is the sort key encoded as URL-safe base64 JSON. Datetimes are
+stored as epoch milliseconds and ObjectIds as hex strings, so they decode
+back to the same types.
+"""
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_ms(ts: datetime) -> int:
+    """Epoch milliseconds of a (naive UTC or aware) datetime."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int((ts - _EPOCH).total_seconds() * 1000)
+
+
+def from_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc)
+
+
+def _pack(value: Any) -> List[Any]:
+    if isinstance(value, datetime):
+        return ["d", to_ms(value)]
+    if isinstance(value, ObjectId):
+        return ["o", str(value)]
+    return ["v", value]
+
+
+def _unpack(item: List[Any]) -> Any:
+    kind, value = item
+    if kind == "d":
+        return from_ms(int(value))
+    if kind == "o":
+        return ObjectId(value)
+    # Only scalars: a cursor must never smuggle query operators
+    if kind != "v" or not isinstance(value, (int, float, str)):
+        raise ValueError("unsupported cursor value")
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor of a sort key."""
+    raw = json.dumps([_pack(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[Tuple[Any, ...]]:
+    """
+    Sort key of a cursor produced by encode_cursor().
+
+    Raises:
+        HTTPException 400: Malformed cursor, or one from another endpoint
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = tuple(_unpack(item) for item in json.loads(raw))
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def after_key(fields: Sequence[str], values: Sequence[Any], descending: bool = True) -> Dict[str, Any]:
+    """
+    Query condition: strictly after `values` in the order of `fields`.
+
+    For fields (a, b) descending: a < va OR (a == va AND b < vb). Served by
+    an index whose keys are exactly `fields` (after the equality prefix).
+    """
+    op = "$lt" if descending else "$gt"
+    branches = []
+    for position, field in enumerate(fields):
+        branch = {name: values[index] for index, name in enumerate(fields[:position])}
+        branch[field] = {op: values[position]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+__all__ = [
+    "to_ms",
+    "from_ms",
+    "encode_cursor",
+    "decode_cursor",
+    "after_key",
+]
@@ -0,0 +1,5 @@
+"""
+__init__.py
+"""
+
+# TODO: Implement
@@ -0,0 +1,60 @@
+"""
+Pagination Tests
+Keyset cursors of list endpoints (services/pagination.py).
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from services import pagination
+
+
+def test_cursor_round_trip():
+    ts = datetime(2024, 5, 1, 10, 0, 0, 123000, tzinfo=timezone.utc)
+    oid = ObjectId()
+    cursor = pagination.encode_cursor(ts, oid, 42, "name")
+
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor, 4) == (ts, oid, 42, "name")
+
+
+def test_naive_datetimes_are_utc():
+    cursor = pagination.encode_cursor(datetime(2024, 5, 1, 10, 0))
+    assert pagination.decode_cursor(cursor, 1) == (datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc),)
+
+
+def test_empty_cursor():
+    assert pagination.decode_cursor(None, 2) is None
+    assert pagination.decode_cursor("", 2) is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    "W1sidiIseyIkbmUiOjF9XV0",      # [["v", {"$ne": 1}]]: no query operators
+    "W1sibyIsIm5vdC1hbi1pZCJdXQ",   # [["o", "not-an-id"]]
+    "W1sieCIsMV1d",                 # [["x", 1]]: unknown kind
+])
+def test_invalid_cursors(cursor):
+    with pytest.raises(HTTPException) as error:
+        pagination.decode_cursor(cursor, 1)
+    assert error.value.status_code == 400
+
+
+def test_cursor_of_another_size():
+    with pytest.raises(HTTPException):
+        pagination.decode_cursor(pagination.encode_cursor(1), 2)
+
+
+def test_after_key_single_field():
+    assert pagination.after_key(["_id"], [5]) == {"_id": {"$lt": 5}}
+    assert pagination.after_key(["_id"], [5], descending=False) == {"_id": {"$gt": 5}}
+
+
+def test_after_key_compound():
+    assert pagination.after_key(["timestamp", "_id"], [10, 3]) == {"$or": [
+        {"timestamp": {"$lt": 10}},
+        {"timestamp": 10, "_id": {"$lt": 3}},
+    ]}
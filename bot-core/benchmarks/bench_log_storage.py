@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Log Storage Benchmark
+Compares the legacy one-document-per-event `logs` layout with time-bucketed
+documents (`logs_buckets`): write throughput and storage/index size.
+
+Both layouts get their production indexes (database-migrations/indexes.py)
+in a scratch database that is dropped afterwards. The legacy layout is
+written with insert_many in batches of the same size as the bucketed
+writer's flushes.
+
+Needs a running MongoDB.
+
+Usage (from bot-core/):
+    MONGODB_URI=mongodb://localhost:27017/ python benchmarks/bench_log_storage.py [--events 200000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "database-migrations"))
+from indexes import INDEXES
+from log_buckets import bucket_updates
+
+TYPES = ["delete", "warn", "mute", "kick", "ban", "join", "leave", "settings"]
+
+
+def synthesize(rng: random.Random, count: int, groups: int, hours: int) -> list:
+    """Events as (group_id, type, timestamp, actor_id, target_id, data), in time order."""
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    span = hours * 3600
+    group_ids = [-1000 - group for group in range(groups)]
+    # A few busy groups produce most of the events
+    weights = [1 / (rank + 1) for rank in range(groups)]
+
+    events = []
+    for group_id, offset in zip(
+        rng.choices(group_ids, weights, k=count),
+        sorted(rng.uniform(0, span) for _ in range(count))
+    ):
+        events.append((
+            group_id,
+            rng.choices(TYPES, [50, 15, 10, 5, 5, 10, 4, 1])[0],
+            start + timedelta(seconds=offset),
+            rng.randrange(1, 5_000),
+            rng.randrange(1, 2_000_000),
+            {"module": "anti_spam", "rule": "flood", "detail": "8/10s"},
+        ))
+    return events
+
+
+async def storage(db, name: str) -> dict:
+    stats = await db.command("collStats", name)
+    return {
+        "documents": stats["count"],
+        "storage_mb": stats["storageSize"] / 1e6,
+        "index_mb": stats["totalIndexSize"] / 1e6,
+        "indexes": stats["nindexes"],
+    }
+
+
+async def bench_legacy(db, events: list, batch_size: int) -> float:
+    collection = db.logs
+    await collection.create_indexes(INDEXES["logs"])
+    started = time.perf_counter()
+    for offset in range(0, len(events), batch_size):
+        await collection.insert_many(
+            [
+                {"group_id": g, "type": t, "timestamp": ts, "actor_id": a, "target_id": u, **d}
+                for g, t, ts, a, u, d in events[offset:offset + batch_size]
+            ],
+            ordered=False
+        )
+    return time.perf_counter() - started
+
+
+async def bench_buckets(db, events: list, batch_size: int, minutes: int, max_events: int) -> float:
+    collection = db.logs_buckets
+    await collection.create_indexes(INDEXES["logs_buckets"])
+    started = time.perf_counter()
+    for offset in range(0, len(events), batch_size):
+        operations = bucket_updates(events[offset:offset + batch_size], minutes, max_events)
+        await collection.bulk_write(operations, ordered=False)
+    return time.perf_counter() - started
+
+
+async def main(args):
+    events = synthesize(random.Random(42), args.events, args.groups, args.hours)
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    db = client[args.database]
+    try:
+        await client.drop_database(args.database)
+        legacy_elapsed = await bench_legacy(db, events, args.batch_size)
+        bucket_elapsed = await bench_buckets(db, events, args.batch_size, args.bucket_minutes, args.max_events)
+
+        print(f"events: {len(events):,} in {args.groups} groups over {args.hours} h, batches of {args.batch_size}")
+        for name, elapsed in (("logs", legacy_elapsed), ("logs_buckets", bucket_elapsed)):
+            size = await storage(db, name)
+            print(
+                f"{name:13} {len(events) / elapsed:>10,.0f} events/s  "
+                f"docs {size['documents']:>9,}  storage {size['storage_mb']:8.2f} MB  "
+                f"indexes {size['index_mb']:7.2f} MB ({size['indexes']})"
+            )
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=48)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--bucket-minutes", type=int, default=60)
+    parser.add_argument("--max-events", type=int, default=1000)
+    parser.add_argument("--database", default="bench_log_storage")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Permission Check Microbenchmark
+Measures cached permission checks per second (resolver hit + bitset test),
+the work the AuthMiddleware does for a restricted command.
+
+Usage (from bot-core/):
+    python benchmarks/bench_permission_check.py [--checks 2000000] [--groups 1000] [--users 100]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.permission import PERMISSION_KEYS, Role, compile_permissions, parse_requirement
+from services.group_service import GroupConfig
+from services.permission_service import PermissionResolver, _Entry
+
+
+def run(checks: int, groups: int, users: int, seed: int = 42):
+    rng = random.Random(seed)
+    keys = list(PERMISSION_KEYS.values())
+    resolver = PermissionResolver(max_size=groups * users, ttl=3600)
+
+    configs = []
+    for index in range(groups):
+        group_id = -100 - index
+        apanel = {key: rng.random() < 0.7 for key in keys}
+        config = GroupConfig(group_id, {"group_id": group_id, "owner_user_id": 1}, [], {"default_bot_permissions": apanel})
+        configs.append(config)
+        for user_id in range(2, users + 2):
+            role = rng.choice((Role.MEMBER, Role.VIP, Role.ADMIN, Role.ADMIN))
+            upanel = {key: rng.random() < 0.5 for key in rng.sample(keys, 2)}
+            resolver._store((group_id, user_id), _Entry(role, *compile_permissions(upanel)))
+
+    requirements = [parse_requirement(name) for name in ("ban", "mute", "purge", "locks", "admin", "owner")]
+    sequence = [
+        (configs[rng.randrange(groups)], rng.randrange(2, users + 2), requirements[rng.randrange(len(requirements))])
+        for _ in range(checks)
+    ]
+
+    lookup = resolver.lookup
+    allowed = 0
+
+    started = time.perf_counter()
+    for config, user_id, requirement in sequence:
+        if lookup(config, user_id).allows(requirement):
+            allowed += 1
+    elapsed = time.perf_counter() - started
+
+    stats = resolver.get_stats()
+    print(f"checks:        {checks:,}")
+    print(f"grants cached: {stats['size']:,} ({groups:,} groups x {users:,} users)")
+    print(f"compiles:      {stats['compiles']:,}")
+    print(f"allowed:       {allowed:,}")
+    print(f"elapsed:       {elapsed:.3f} s")
+    print(f"throughput:    {checks / elapsed:,.0f} checks/s")
+    print(f"latency:       {elapsed / checks * 1e9:,.0f} ns/check")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=2_000_000)
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+    run(args.checks, args.groups, args.users)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Microbenchmark
+Measures in-memory token bucket checks per second.
+
+Usage (from bot-core/):
+    python benchmarks/bench_rate_limiter.py [--checks 2000000] [--keys 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.token_bucket import TokenBucketLimiter
+
+
+def run(checks: int, keys: int, seed: int = 42):
+    rng = random.Random(seed)
+    limiter = TokenBucketLimiter(idle_ttl=60.0)
+
+    # (user, group, kind) keys, as built by the middleware
+    pool = [(rng.randrange(10**9), -100 - rng.randrange(1000), "command") for _ in range(keys)]
+    sequence = [pool[rng.randrange(keys)] for _ in range(checks)]
+
+    capacity, rate = 20.0, 20 / 60.0
+    check = limiter.check
+    allowed = 0
+
+    started = time.perf_counter()
+    for key in sequence:
+        if check(key, capacity, rate):
+            allowed += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"checks:        {checks:,}")
+    print(f"distinct keys: {keys:,} (tracked: {len(limiter):,})")
+    print(f"allowed:       {allowed:,}")
+    print(f"elapsed:       {elapsed:.3f} s")
+    print(f"throughput:    {checks / elapsed:,.0f} checks/s")
+    print(f"latency:       {elapsed / checks * 1e9:,.0f} ns/check")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=2_000_000)
+    parser.add_argument("--keys", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.checks, args.keys)
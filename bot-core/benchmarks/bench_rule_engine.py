@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Rule Engine Benchmark
+Measures messages evaluated per second (single core) against a realistic
+per-group rule set: content locks, word/domain blacklists with a whitelist,
+regex filters and link rules.
+
+Usage (from bot-core/):
+    python benchmarks/bench_rule_engine.py [--messages 200000] [--words 500] [--domains 200] [--regexes 20]
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pyrogram.enums import ChatType, MessageEntityType, MessageMediaType
+from pyrogram.types import Chat, Message, MessageEntity, User
+
+from services.rule_engine import RulePlan
+
+
+def _word(rng: random.Random, low: int = 3, high: int = 9) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def build_rules(rng: random.Random, words: int, domains: int, regexes: int):
+    locks_doc = {
+        "module_key": "locks",
+        "enabled": True,
+        "locks": {name: True for name in ("sticker", "gif", "voice", "contact", "game", "dice", "inline", "forward")},
+    }
+    anti_spam_doc = {
+        "module_key": "anti_spam",
+        "enabled": True,
+        "blacklist_words": [_word(rng, 5, 10) for _ in range(words)],
+        "whitelist_words": [_word(rng, 8, 12) for _ in range(words // 10)],
+        "blacklist_domains": [f"{_word(rng)}.{rng.choice(['com', 'net', 'xyz', 'ru'])}" for _ in range(domains)],
+        "whitelist_domains": ["youtube.com", "github.com", "wikipedia.org"],
+        "regex_filters": [rf"\b{_word(rng, 4, 6)}\d{{2,4}}\b" for _ in range(regexes)],
+        "whole_word_match": True,
+        "telegram_link_block": True,
+        "url_shortener_block": True,
+    }
+    return locks_doc, anti_spam_doc
+
+
+def build_messages(rng: random.Random, count: int, anti_spam_doc) -> list:
+    chat = Chat(id=-1001234567890, type=ChatType.SUPERGROUP)
+    user = User(id=123456789, is_bot=False, first_name="user")
+    vocabulary = [_word(rng) for _ in range(5000)]
+    blacklisted = anti_spam_doc["blacklist_words"]
+    links = ["https://github.com/x/y", "https://t.me/joinchat/abc", "https://bit.ly/3xyz", "https://example.org/a"]
+
+    messages = []
+    for index in range(count):
+        roll = rng.random()
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 30)))
+        entities = None
+        media = None
+
+        if roll < 0.02:
+            text += " " + rng.choice(blacklisted)            # blacklisted word
+        elif roll < 0.12:
+            link = rng.choice(links)                          # message with a link
+            entities = [MessageEntity(type=MessageEntityType.URL, offset=len(text) + 1, length=len(link))]
+            text += " " + link
+        elif roll < 0.20:
+            media = rng.choice([MessageMediaType.PHOTO, MessageMediaType.STICKER, MessageMediaType.VIDEO])
+
+        messages.append(Message(
+            id=index, chat=chat, from_user=user,
+            text=None if media else text,
+            caption=text if media else None,
+            entities=entities if not media else None,
+            media=media,
+        ))
+    return messages
+
+
+def run(count: int, words: int, domains: int, regexes: int, seed: int = 42):
+    rng = random.Random(seed)
+    locks_doc, anti_spam_doc = build_rules(rng, words, domains, regexes)
+
+    started = time.perf_counter()
+    plan = RulePlan.compile(1, locks_doc, anti_spam_doc)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    messages = build_messages(rng, count, anti_spam_doc)
+    chars = sum(len(m.text or m.caption or "") for m in messages)
+
+    evaluate = plan.evaluate
+    violations = 0
+    started = time.perf_counter()
+    for message in messages:
+        if evaluate(message) is not None:
+            violations += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"rules:       8 locks, {words} words, {domains} domains, {regexes} regexes")
+    print(f"compile:     {compile_ms:.1f} ms")
+    print(f"messages:    {count:,} (avg {chars / count:.0f} chars)")
+    print(f"violations:  {violations:,}")
+    print(f"elapsed:     {elapsed:.3f} s")
+    print(f"throughput:  {count / elapsed:,.0f} messages/s per core")
+    print(f"latency:     {elapsed / count * 1e6:,.1f} µs/message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--words", type=int, default=500)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("--regexes", type=int, default=20)
+    args = parser.parse_args()
+    run(args.messages, args.words, args.domains, args.regexes)
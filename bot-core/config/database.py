@@ -3,6 +3,8 @@ Database Configuration and Connection Management
 MongoDB connection using Motor (async) with connection pooling.
 """
 
+import sys
+from pathlib import Path
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from loguru import logger
@@ -10,6 +12,11 @@ from typing import Optional
 
 from config.settings import settings
 
+# Index declarations are shared with admin-api (database-migrations/indexes.py)
+sys.path.append(str(Path(__file__).resolve().parents[2] / "database-migrations"))
+from indexes import reconcile_indexes
+from log_buckets import LOG_BUCKETS_COLLECTION
+
 
 # ==================== Global Database Instance ====================
 _client: Optional[AsyncIOMotorClient] = None
@@ -29,7 +36,7 @@ def get_database() -> AsyncIOMotorDatabase:
 async def init_database() -> AsyncIOMotorDatabase:
     """
     Initialize MongoDB connection.
-    Creates indexes for optimal query performance.
+    Reconciles indexes for optimal query performance.
     """
     global _client, _database
     
@@ -51,7 +58,7 @@ async def init_database() -> AsyncIOMotorDatabase:
         await _client.admin.command('ping')
         logger.info(f"📊 Connected to MongoDB: {settings.DATABASE_NAME}")
         
-        # Create indexes for performance
+        # Create missing/changed indexes for performance
         await _create_indexes()
         
         return _database
@@ -79,61 +86,25 @@ async def close_database():
 
 async def _create_indexes():
     """
-    Create database indexes for optimal query performance.
-    This is called during initialization.
+    Reconcile database indexes with the shared declarations
+    (database-migrations/indexes.py). Only missing or changed indexes are
+    built, collections in parallel. Skipped when SKIP_INDEX_BOOTSTRAP is set
+    (run the 002_add_indexes migration instead).
     """
-    db = get_database()
-    
-    logger.info("📇 Creating database indexes...")
-    
-    # ==================== users collection ====================
-    await db.users.create_index("user_id", unique=True)
-    await db.users.create_index("username")
-    await db.users.create_index("is_sudo")
-    
-    # ==================== groups collection ====================
-    await db.groups.create_index("group_id", unique=True)
-    await db.groups.create_index("approved")
-    await db.groups.create_index("owner_user_id")
-    await db.groups.create_index([("approved", 1), ("created_at", -1)])
-    
-    # ==================== group_users collection ====================
-    await db.group_users.create_index([("group_id", 1), ("user_id", 1)], unique=True)
-    await db.group_users.create_index([("group_id", 1), ("role", 1)])
-    await db.group_users.create_index([("group_id", 1), ("is_vip", 1)])
-    await db.group_users.create_index([("group_id", 1), ("last_seen", -1)])
-    await db.group_users.create_index([("group_id", 1), ("join_time", -1)])
-    await db.group_users.create_index("added_by")
-    await db.group_users.create_index("invite_link_id")
-    
-    # ==================== admin_defaults collection ====================
-    await db.admin_defaults.create_index("group_id", unique=True)
+    if settings.SKIP_INDEX_BOOTSTRAP:
+        logger.info("📇 Index bootstrap skipped (SKIP_INDEX_BOOTSTRAP)")
+        return
     
-    # ==================== admin_overrides collection ====================
-    await db.admin_overrides.create_index([("group_id", 1), ("admin_user_id", 1)], unique=True)
-    await db.admin_overrides.create_index("group_id")
+    logger.info("📇 Reconciling database indexes...")
     
-    # ==================== invite_links collection ====================
-    await db.invite_links.create_index([("group_id", 1), ("link_id", 1)], unique=True)
-    await db.invite_links.create_index("group_id")
-    await db.invite_links.create_index("created_by")
-    await db.invite_links.create_index([("group_id", 1), ("created_at", -1)])
+    summary = await reconcile_indexes(get_database())
     
-    # ==================== logs collection ====================
-    await db.logs.create_index([("group_id", 1), ("timestamp", -1)])
-    await db.logs.create_index([("group_id", 1), ("type", 1), ("timestamp", -1)])
-    await db.logs.create_index("actor_id")
-    await db.logs.create_index("target_id")
-    await db.logs.create_index("timestamp", expireAfterSeconds=60*60*24*90)  # 90 days TTL
-    
-    # ==================== settings collection ====================
-    await db.settings.create_index([("group_id", 1), ("module_key", 1)], unique=True)
-    await db.settings.create_index("group_id")
-    
-    # ==================== antibetra collection ====================
-    await db.antibetra.create_index("group_id", unique=True)
-    
-    logger.success("✅ Database indexes created")
+    logger.success(
+        f"✅ Database indexes ready in {summary['elapsed_ms']} ms "
+        f"(created={summary['created']}, rebuilt={summary['rebuilt']}, "
+        f"ttl_updated={summary['ttl_updated']}, unchanged={summary['unchanged']}, "
+        f"dropped={summary['dropped']})"
+    )
 
 
 # ==================== Collection Helpers ====================
@@ -173,6 +144,11 @@ def get_logs_collection():
     return get_database().logs
 
 
+def get_logs_buckets_collection():
+    """Get logs_buckets collection (time-bucketed event log)."""
+    return get_database()[LOG_BUCKETS_COLLECTION]
+
+
 def get_settings_collection():
     """Get settings collection."""
     return get_database().settings
@@ -195,6 +171,7 @@ __all__ = [
     "get_admin_overrides_collection",
     "get_invite_links_collection",
     "get_logs_collection",
+    "get_logs_buckets_collection",
     "get_settings_collection",
     "get_antibetra_collection",
 ]
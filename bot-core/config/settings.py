@@ -37,6 +37,7 @@ class Settings(BaseSettings):
     # ==================== Database Configuration ====================
     MONGODB_URI: str = Field(default="mongodb://localhost:27017/", description="MongoDB connection URI")
     DATABASE_NAME: str = Field(default="telegram_group_bot", description="Database name")
+    SKIP_INDEX_BOOTSTRAP: bool = Field(default=False, description="Skip index reconciliation on startup")
     
     # ==================== Language & i18n ====================
     DEFAULT_LANGUAGE: str = Field(default="fa", description="Default language (fa or en)")
@@ -88,6 +89,52 @@ class Settings(BaseSettings):
     # ==================== Scheduler Configuration ====================
     DAILY_REPORT_TIME: str = Field(default="00:00", description="Daily report time (HH:MM UTC)")
     CLEANUP_SCHEDULE: str = Field(default="0 2 * * *", description="Cleanup cron schedule")
+    SCHEDULER_SHARDS: int = Field(default=12, description="Shards each per-group job is split into")
+    SCHEDULER_GROUP_WINDOW: int = Field(default=3600, description="Seconds over which the shards of a per-group job are spread")
+    SCHEDULER_MAX_CONCURRENCY: int = Field(default=4, description="Per-group job tasks running at once")
+    SCHEDULER_MISFIRE_GRACE: int = Field(default=3600, description="Seconds a missed job may still run late")
+    SCHEDULER_LEASE_TTL: int = Field(default=60, description="Seconds a scheduler leader lease lasts without renewal")
+    
+    # ==================== Cache Configuration ====================
+    GROUP_CACHE_MAX_SIZE: int = Field(default=10000, description="Max groups kept in the group config cache")
+    GROUP_CACHE_TTL: int = Field(default=300, description="Group config cache TTL in seconds")
+    GROUP_CACHE_POLL_INTERVAL: int = Field(default=10, description="Polling interval (seconds) when change streams are unavailable")
+    PERMISSION_CACHE_MAX_SIZE: int = Field(default=100000, description="Max (group, user) permission grants kept in memory")
+    PERMISSION_CACHE_TTL: int = Field(default=600, description="Permission grant cache TTL in seconds")
+    ADMIN_ROSTER_CACHE_MAX_SIZE: int = Field(default=10000, description="Max groups whose Telegram admin list is kept in memory")
+    ADMIN_ROSTER_TTL: int = Field(default=900, description="Seconds before a cached admin list is fetched again")
+    
+    # ==================== Outbound API Calls ====================
+    OUTBOUND_GLOBAL_PER_SECOND: float = Field(default=30, description="Outgoing API calls per second across all chats")
+    OUTBOUND_CHAT_PER_MINUTE: float = Field(default=20, description="Messages per minute sent to one chat")
+    OUTBOUND_CHAT_BURST: int = Field(default=5, description="Messages one chat may receive in a burst")
+    OUTBOUND_MAX_CONCURRENCY: int = Field(default=8, description="Outgoing API calls in flight at once")
+    OUTBOUND_MAX_RETRIES: int = Field(default=3, description="Retries of an outgoing call after FloodWait")
+    OUTBOUND_MAX_PENDING: int = Field(default=50000, description="Queued outgoing calls before informational ones are dropped")
+    WELCOME_WINDOW: float = Field(default=10.0, description="Seconds over which join greetings are combined into one message")
+    WELCOME_MAX_MENTIONS: int = Field(default=20, description="Members mentioned in one combined greeting")
+    
+    # ==================== Write Pipelines ====================
+    JOIN_WRITER_BATCH_SIZE: int = Field(default=500, description="Join-tracking ops per bulk write")
+    JOIN_WRITER_FLUSH_INTERVAL: float = Field(default=1.0, description="Max seconds join-tracking writes stay buffered")
+    JOIN_WRITER_MAX_PENDING: int = Field(default=10000, description="Buffered join-tracking ops before producers wait for a flush")
+    LOG_BUCKET_MINUTES: int = Field(default=60, description="Width of one log bucket document in minutes")
+    LOG_BUCKET_MAX_EVENTS: int = Field(default=1000, description="Events per log bucket document before a new one is started")
+    LOG_WRITER_BATCH_SIZE: int = Field(default=500, description="Log events per bulk write")
+    LOG_WRITER_FLUSH_INTERVAL: float = Field(default=2.0, description="Max seconds log events stay buffered")
+    LOG_WRITER_MAX_PENDING: int = Field(default=20000, description="Buffered log events before producers wait for a flush")
+    LAST_SEEN_GRANULARITY: int = Field(default=300, description="Seconds of new activity before a member's last_seen is written again")
+    LAST_SEEN_FLUSH_INTERVAL: float = Field(default=30.0, description="Seconds between last_seen flushes")
+    LAST_SEEN_MAX_TRACKED: int = Field(default=200000, description="Members whose last activity is kept in memory")
+    STATS_FLUSH_INTERVAL: float = Field(default=30.0, description="Seconds between hourly stats counter flushes")
+    STATS_TOP_K: int = Field(default=20, description="Senders tracked per hour/day/month by the top chatters sketch")
+    
+    # ==================== Raid Protection ====================
+    RAID_ENTER_JOINS_PER_MIN: float = Field(default=30, description="Join rate (per minute) that switches a group into raid mode")
+    RAID_EXIT_JOINS_PER_MIN: float = Field(default=10, description="Join rate (per minute) below which raid mode ends")
+    RAID_MIN_DURATION: int = Field(default=120, description="Minimum seconds a group stays in raid mode")
+    RAID_BULK_ADD_SIZE: int = Field(default=10, description="Members added in one message that trigger raid mode")
+    RAID_RESTRICT_SECONDS: int = Field(default=1800, description="How long members joining during a raid stay restricted")
     
     # ==================== File Storage ====================
     TEMP_DIR: str = Field(default="/tmp/telegram_bot", description="Temporary directory")
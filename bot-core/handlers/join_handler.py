@@ -6,6 +6,8 @@ This is the CRITICAL security component that enforces the SUDO-gated installatio
 """
 
 from pyrogram import Client, filters
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.handlers import ChatMemberUpdatedHandler, MessageHandler
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, ChatMemberUpdated
 from loguru import logger
 import sys
@@ -14,13 +16,24 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config.database import (
-    get_groups_collection,
-    get_group_users_collection,
-    get_invite_links_collection
-)
+from config.database import get_groups_collection
 from config.settings import settings
 from i18n.loader import _
+from routers.module_loader import is_enabled_in
+from services.bot_identity import ensure_bot_identity
+from services.group_service import get_group_config, invalidate_group
+from services.outbound import Priority, reply, submit
+from services.raid_monitor import raid_monitor, restriction_queue
+from services.stats_service import record_joins
+from services.tracking_service import get_invite_link_tag, join_dedup, join_writer
+from services.welcome import welcome_users
+
+
+_NOT_MEMBER = (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED)
+_MEMBER = (ChatMemberStatus.MEMBER, ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+
+# Module whose settings hold the anti_raid flag
+ANTI_SPAM = "anti_spam"
 
 
 async def handle_new_chat_members(client: Client, message: Message):
@@ -33,16 +46,83 @@ async def handle_new_chat_members(client: Client, message: Message):
     """
     group_id = message.chat.id
     
-    # Check if bot is among the new members
-    bot_me = await client.get_me()
-    for new_member in message.new_chat_members:
-        if new_member.id == bot_me.id:
-            # BOT WAS ADDED TO GROUP - CHECK SUDO AUTHORIZATION
-            await handle_bot_added_to_group(client, message)
-            return
+    # Check if bot is among the new members (cached identity, no API call)
+    bot_id = await ensure_bot_identity(client)
+    if bot_id in {new_member.id for new_member in message.new_chat_members}:
+        # BOT WAS ADDED TO GROUP - CHECK SUDO AUTHORIZATION
+        await handle_bot_added_to_group(client, message)
+        return
     
     # Regular user joins - track join data
-    await handle_user_join(client, message)
+    sender_id = message.from_user.id if message.from_user else None
+    
+    joins = {}
+    for new_member in message.new_chat_members:
+        # Self-joins are sent by the joining user
+        added_by = sender_id if sender_id != new_member.id else None
+        joins[new_member.id] = {
+            "join_method": "added_by_user" if added_by else "unknown",
+            "added_by": added_by,
+            "join_time": message.date,
+            "last_seen": message.date
+        }
+    
+    await handle_user_joins(client, group_id, joins, message.date, message.chat, message.new_chat_members)
+
+
+async def handle_user_joins(client: Client, group_id: int, joins: dict, join_time, chat=None, users=()):
+    """
+    Common path of both join sources (new_chat_members / chat_member_updated).
+    
+    Telegram usually reports a join through both. The dedup cache turns the
+    second report into only the information it adds (e.g. the invite link),
+    so raid counting, invite counters, greetings and group_users writes see
+    each join once.
+    """
+    fresh = {}
+    merged = {}
+    for user_id, fields in joins.items():
+        is_first, new_fields = join_dedup.observe(group_id, user_id, join_time, fields)
+        if is_first:
+            fresh[user_id] = new_fields
+        elif new_fields:
+            merged[user_id] = new_fields
+    
+    # Join velocity is tracked for every group (raid detection)
+    if fresh:
+        record_joins(group_id, len(fresh))
+        raiding = raid_monitor.record_joins(group_id, len(fresh))
+    else:
+        raiding = raid_monitor.in_raid(group_id)
+    
+    if raiding:
+        await handle_raid_join(client, group_id, list(fresh))
+        return
+    
+    greet = [user for user in users if user.id in fresh and not user.is_bot]
+    if greet:
+        group_config = await get_group_config(group_id)
+        if group_config.approved:
+            welcome_users(client, group_config, chat.title if chat else "", greet)
+    
+    await track_joins(group_id, {**fresh, **merged})
+
+
+async def handle_raid_join(client: Client, group_id: int, user_ids: list):
+    """
+    Cheap path while the group is in raid mode:
+    - no join tracking writes or invite link lookups
+    - new members are queued for restriction (if the anti_spam module's
+      anti_raid setting is on, the same flag as its group-wide duplicate limit)
+    """
+    if not user_ids:
+        # Only a repeated report of joins already handled
+        return
+    raid_monitor.count_skipped(len(user_ids))
+    
+    group_config = await get_group_config(group_id)
+    if is_enabled_in(group_config, ANTI_SPAM) and group_config.get_module(ANTI_SPAM).get("anti_raid", False):
+        restriction_queue.enqueue(client, group_id, user_ids)
 
 
 async def handle_bot_added_to_group(client: Client, message: Message):
@@ -60,12 +140,11 @@ async def handle_bot_added_to_group(client: Client, message: Message):
        - Initialize group settings
     """
     group_id = message.chat.id
-    groups_col = get_groups_collection()
     
     # Check if group exists and is approved
-    group_doc = await groups_col.find_one({"group_id": group_id})
+    group_config = await get_group_config(group_id)
     
-    if settings.AUTH_MODE and (not group_doc or not group_doc.get("approved", False)):
+    if settings.AUTH_MODE and not group_config.approved:
         # UNAUTHORIZED INSTALLATION - REJECT
         logger.warning(f"🚫 Unauthorized installation attempt in group {group_id}")
         
@@ -80,23 +159,12 @@ async def handle_bot_added_to_group(client: Client, message: Message):
             )]
         ])
         
-        # Send unauthorized message
+        # Send unauthorized message, then leave (same lane, so in this order;
+        # queued and retried on FloodWait instead of stalling this handler)
         unauthorized_msg = _(group_id, "auth.unauthorized_install", language)
-        
-        try:
-            await message.reply(
-                unauthorized_msg,
-                reply_markup=keyboard
-            )
-        except Exception as e:
-            logger.error(f"Failed to send unauthorized message: {e}")
-        
-        # Leave the group immediately
-        try:
-            await client.leave_chat(group_id)
-            logger.info(f"👋 Left unauthorized group {group_id}")
-        except Exception as e:
-            logger.error(f"Failed to leave group {group_id}: {e}")
+        reply(message, unauthorized_msg, Priority.MODERATION, reply_markup=keyboard)
+        submit(group_id, lambda: client.leave_chat(group_id), Priority.MODERATION, label="leave_chat")
+        logger.info(f"👋 Leaving unauthorized group {group_id}")
         
         return
     
@@ -104,171 +172,107 @@ async def handle_bot_added_to_group(client: Client, message: Message):
     logger.success(f"✅ Bot added to approved group {group_id}")
     
     # Initialize group document if not exists
-    if not group_doc:
-        await groups_col.insert_one({
+    if not group_config.exists:
+        await get_groups_collection().insert_one({
             "group_id": group_id,
             "approved": False if settings.AUTH_MODE else True,
             "language": settings.DEFAULT_LANGUAGE,
             "owner_user_id": None,
             "created_at": message.date,
+            "updated_at": message.date,
             "settings": {}
         })
+        invalidate_group(group_id)
         logger.info(f"📝 Created new group document for {group_id}")
     
     # Send welcome message
-    language = group_doc.get("language", settings.DEFAULT_LANGUAGE) if group_doc else settings.DEFAULT_LANGUAGE
+    language = group_config.language
     
     welcome_msg = (
         f"✅ {_(group_id, 'auth.group_approved', language)}\n\n"
         f"📖 {_(group_id, 'help.main', language)}"
     )
     
-    try:
-        await message.reply(welcome_msg)
-    except Exception as e:
-        logger.error(f"Failed to send welcome message: {e}")
+    # Re-adds in a burst coalesce into one queued welcome
+    reply(message, welcome_msg, Priority.INFO, key="bot_welcome")
 
 
-async def handle_user_join(client: Client, message: Message):
+async def track_joins(group_id: int, joins: dict):
     """
-    Handle regular user joining the group.
+    Queue join tracking data (flushed in bulk by join_writer).
     
-    Track join data:
-    - join_method: invite_link / added_by_user / join_request / unknown
+    Tracked fields:
+    - join_method: invite_link / join_request / added_by_user / unknown
     - added_by: user_id (if added by someone)
-    - invite_link_id: (if via invite link)
+    - invite_link_id / invite_link_tag: (if via invite link)
     - join_time: timestamp
     """
-    group_id = message.chat.id
-    groups_col = get_groups_collection()
+    if not joins:
+        return
     
     # Check if group is approved
-    group_doc = await groups_col.find_one({"group_id": group_id})
-    if not group_doc or not group_doc.get("approved", False):
+    group_config = await get_group_config(group_id)
+    if not group_config.approved:
         # Group not approved - don't track joins
         return
     
     # Check if join tracking is enabled
-    settings_doc = group_doc.get("settings", {})
-    if not settings_doc.get("track_join", False):
+    if not group_config.settings.get("track_join", False):
         return
     
-    group_users_col = get_group_users_collection()
-    
-    # Determine join method
-    join_method = "unknown"
-    added_by = None
-    invite_link_id = None
-    invite_link_tag = None
-    
-    # Check if user was added by someone
-    if message.from_user:
-        added_by = message.from_user.id
-        join_method = "added_by_user"
-    
-    # Check for invite link (if available in message metadata)
-    # Note: Pyrogram doesn't always provide invite link info, but we try
-    if hasattr(message, 'invite_link') and message.invite_link:
-        join_method = "invite_link"
-        invite_link_id = message.invite_link.invite_link
+    for user_id, fields in joins.items():
+        invite_link_id = fields.get("invite_link_id")
+        if invite_link_id:
+            # Tag lookup is cached, join count increment is batched
+            fields = {**fields, "invite_link_tag": await get_invite_link_tag(group_id, invite_link_id)}
+            await join_writer.record_invite_join(group_id, invite_link_id)
         
-        # Try to get tag from database
-        invite_links_col = get_invite_links_collection()
-        link_doc = await invite_links_col.find_one({
-            "group_id": group_id,
-            "link_id": invite_link_id
-        })
-        if link_doc:
-            invite_link_tag = link_doc.get("tag")
-            # Increment join count
-            await invite_links_col.update_one(
-                {"_id": link_doc["_id"]},
-                {"$inc": {"join_count": 1}}
-            )
-    
-    # Store join data for each new member
-    for new_member in message.new_chat_members:
-        try:
-            await group_users_col.update_one(
-                {"group_id": group_id, "user_id": new_member.id},
-                {
-                    "$set": {
-                        "join_method": join_method,
-                        "added_by": added_by,
-                        "invite_link_id": invite_link_id,
-                        "invite_link_tag": invite_link_tag,
-                        "join_time": message.date,
-                        "last_seen": message.date
-                    },
-                    "$setOnInsert": {
-                        "role": "member",
-                        "is_vip": False,
-                        "warns": 0
-                    }
-                },
-                upsert=True
-            )
-            
-            logger.info(
-                f"📊 Tracked join: user={new_member.id}, "
-                f"method={join_method}, group={group_id}"
-            )
-        except Exception as e:
-            logger.error(f"Failed to track join for user {new_member.id}: {e}")
+        await join_writer.record_join(group_id, user_id, fields)
+        
+        logger.info(
+            f"📊 Tracked join: user={user_id}, "
+            f"method={fields.get('join_method', 'merged')}, group={group_id}"
+        )
 
 
 async def handle_chat_member_updated(client: Client, update: ChatMemberUpdated):
     """
     Handle chat member updates (alternative join tracking method).
     
-    This catches join requests and other membership changes.
+    This catches invite links and join requests, which the
+    new_chat_members service message does not carry.
     """
     group_id = update.chat.id
-    user_id = update.from_user.id if update.from_user else update.new_chat_member.user.id
     
     # Check if this is a new join (old=none/left, new=member/admin)
-    old_status = update.old_chat_member.status if update.old_chat_member else "left"
-    new_status = update.new_chat_member.status if update.new_chat_member else "left"
+    old_status = update.old_chat_member.status if update.old_chat_member else ChatMemberStatus.LEFT
+    new_status = update.new_chat_member.status if update.new_chat_member else ChatMemberStatus.LEFT
     
-    if old_status in ["left", "kicked", "banned"] and new_status in ["member", "administrator", "creator"]:
-        # User joined
-        groups_col = get_groups_collection()
-        group_doc = await groups_col.find_one({"group_id": group_id})
-        
-        if not group_doc or not group_doc.get("approved", False):
-            return
-        
-        settings_doc = group_doc.get("settings", {})
-        if not settings_doc.get("track_join", False):
-            return
-        
-        # Determine join method
-        join_method = "join_request" if hasattr(update, "invite_link") else "unknown"
-        invite_link_id = update.invite_link.invite_link if hasattr(update, "invite_link") and update.invite_link else None
-        
-        group_users_col = get_group_users_collection()
-        
-        try:
-            await group_users_col.update_one(
-                {"group_id": group_id, "user_id": user_id},
-                {
-                    "$set": {
-                        "join_method": join_method,
-                        "invite_link_id": invite_link_id,
-                        "join_time": update.date
-                    },
-                    "$setOnInsert": {
-                        "role": "member",
-                        "is_vip": False,
-                        "warns": 0
-                    }
-                },
-                upsert=True
-            )
-            
-            logger.info(f"📊 Tracked join (member_updated): user={user_id}, group={group_id}")
-        except Exception as e:
-            logger.error(f"Failed to track join (member_updated): {e}")
+    if old_status not in _NOT_MEMBER or new_status not in _MEMBER:
+        return
+    
+    user_id = update.new_chat_member.user.id
+    if user_id == await ensure_bot_identity(client):
+        # Bot joins are handled by handle_bot_added_to_group
+        return
+    
+    added_by = update.from_user.id if update.from_user and update.from_user.id != user_id else None
+    invite_link = update.invite_link
+    
+    if invite_link:
+        join_method = "join_request" if invite_link.creates_join_request else "invite_link"
+    else:
+        join_method = "added_by_user" if added_by else "unknown"
+    
+    await handle_user_joins(client, group_id, {
+        user_id: {
+            "join_method": join_method,
+            "added_by": added_by,
+            "invite_link_id": invite_link.invite_link if invite_link else None,
+            "join_time": update.date,
+            "last_seen": update.date
+        }
+    }, update.date, update.chat, [update.new_chat_member.user])
 
 
 def register_handlers(app: Client):
@@ -277,15 +281,13 @@ def register_handlers(app: Client):
     """
     # New chat members (when users join or bot is added)
     app.add_handler(
-        filters.new_chat_members,
-        handle_new_chat_members,
+        MessageHandler(handle_new_chat_members, filters.new_chat_members),
         group=1
     )
     
-    # Chat member updates (join requests, etc.)
+    # Chat member updates (invite links, join requests, etc.)
     app.add_handler(
-        filters.chat_member_updated,
-        handle_chat_member_updated,
+        ChatMemberUpdatedHandler(handle_chat_member_updated),
         group=1
     )
     
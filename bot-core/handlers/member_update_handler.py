@@ -1,5 +1,85 @@
 """
-member_update_handler.py
+Member Update Handler
+Keeps cached admin rosters current from chat_member_updated events.
+
+Promotions, demotions, ownership transfers and admins leaving are applied
+to the group's cached roster (services/admin_roster.py), so admin checks
+stay local lookups without waiting for the roster TTL. When an admin role
+changes the user's cached permission grant is dropped too.
+
+Bans and kicks made by admins are counted for stats here
+(services/stats_service.py); the bot's own actions are counted where
+it makes them.
 """
 
-# TODO: Implement
+from typing import Optional
+
+from pyrogram import Client
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.handlers import ChatMemberUpdatedHandler
+from pyrogram.types import ChatMemberUpdated
+from loguru import logger
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.admin_roster import admin_roster
+from services.bot_identity import get_bot_id
+from services.permission_service import invalidate_permissions
+from services.stats_service import record_action
+
+# Runs before join tracking (group 1) and module events (group 3), so they
+# already see the updated roster. Only ChatMemberUpdated handlers match here;
+# the middlewares of group -1 handle messages and callback queries.
+MEMBER_UPDATE_HANDLER_GROUP = -1
+
+_GONE = (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED)
+_REMOVABLE = (ChatMemberStatus.MEMBER, ChatMemberStatus.RESTRICTED, ChatMemberStatus.ADMINISTRATOR)
+
+
+def removal_of(update: ChatMemberUpdated) -> Optional[str]:
+    """Stats action (ban/kick) if another user removed the member; a ban + unban counts as the ban."""
+    old, new, actor = update.old_chat_member, update.new_chat_member, update.from_user
+    if new is None or new.user is None or actor is None or new.user.id == actor.id:
+        return None
+    if new.status == ChatMemberStatus.BANNED and (old is None or old.status != ChatMemberStatus.BANNED):
+        return "ban"
+    if new.status == ChatMemberStatus.LEFT and old is not None and old.status in _REMOVABLE:
+        return "kick"
+    return None
+
+
+async def handle_member_updated(client: Client, update: ChatMemberUpdated):
+    """Apply admin changes to the cached roster of the group and count admin removals."""
+    group_id = update.chat.id
+    new = update.new_chat_member
+
+    action = removal_of(update)
+    if action is not None and update.from_user.id != get_bot_id():
+        record_action(group_id, action)
+
+    if new is not None and new.user is not None and new.user.id == get_bot_id():
+        if new.status in _GONE:
+            # Bot removed: the roster would only go stale
+            admin_roster.forget(group_id)
+        return
+
+    if admin_roster.apply_update(update):
+        user = (new.user if new else None) or update.old_chat_member.user
+        invalidate_permissions(group_id, user.id)
+        logger.debug(f"👮 Admin roster of {group_id} updated: user={user.id}, status={new.status if new else None}")
+
+
+def register_handlers(app: Client):
+    """
+    Register member update handlers.
+    """
+    app.add_handler(
+        ChatMemberUpdatedHandler(handle_member_updated),
+        group=MEMBER_UPDATE_HANDLER_GROUP
+    )
+
+    logger.info("✅ Member update handlers registered")
+
@@ -1,5 +1,112 @@
 """
-message_handler.py
+Message Handler
+Enforces content locks and anti-spam filters on group messages.
+
+Every group message is evaluated once against the group's compiled rule
+plan (services/rule_engine.py) instead of one handler per lock/filter.
+It is also where group messages are counted for stats (services/stats_service.py)
+and member activity is recorded (last_seen, services/tracking_service.py).
 """
 
-# TODO: Implement
+from pyrogram import Client, StopPropagation, filters
+from pyrogram.errors import RPCError
+from pyrogram.handlers import MessageHandler
+from pyrogram.types import ChatPermissions, Message
+from loguru import logger
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from routers.module_loader import is_enabled_in
+from services.admin_roster import is_anonymous_admin, is_group_admin
+from services.group_service import get_group_config
+from services.log_service import log_event
+from services.outbound import Priority, submit
+from services.stats_service import record_action, record_message
+from services.tracking_service import touch_last_seen
+from services.rule_engine import RuleEngine, Violation, rule_engine
+
+# Runs after the command router (group 0) and join handlers (group 1),
+# before module event handlers (group 3)
+RULES_HANDLER_GROUP = 2
+
+
+async def is_exempt(client: Client, message: Message) -> bool:
+    """
+    SUDO users, the owner, admins and anonymous admins (posting as the group)
+    are never filtered. Admins come from the cached roster (services/admin_roster.py).
+    """
+    if is_anonymous_admin(message):
+        return True
+    user_id = message.from_user.id if message.from_user else None
+    return await is_group_admin(client, message.chat.id, user_id)
+
+
+async def enforce_rules(client: Client, message: Message):
+    """Evaluate a group message and apply the configured action on violation."""
+    # Every group message passes here once, so it is counted here (O(1), in memory)
+    record_message(message)
+    if message.from_user and not message.service:
+        touch_last_seen(message.chat.id, message.from_user.id)
+
+    group_config = await get_group_config(message.chat.id)
+    enabled = {key for key in RuleEngine.MODULE_KEYS if is_enabled_in(group_config, key)}
+    if not enabled:
+        return
+
+    violation = rule_engine.evaluate(group_config, enabled, message)
+    # Checked only on a violation: groups without any never need their admin roster
+    if violation is None or await is_exempt(client, message):
+        return
+
+    await apply_action(client, message, violation)
+    # The message is gone; later handler groups must not process it
+    # (deleted service messages still carry events, e.g. new members)
+    if not message.service:
+        raise StopPropagation
+
+
+async def apply_action(client: Client, message: Message, violation: Violation):
+    """Delete the message, then mute/kick/ban the sender if configured."""
+    chat_id = message.chat.id
+    user_id = message.from_user.id if message.from_user else None
+
+    logger.debug(
+        f"🚫 {violation.module_key}:{violation.rule} in {chat_id} "
+        f"(user {user_id}, action {violation.action}, {violation.detail!r})"
+    )
+
+    # Moderation lane of the outbound scheduler: globally paced, FloodWait retried there
+    try:
+        await submit(chat_id, message.delete, Priority.MODERATION, label="delete")
+
+        if user_id is not None and violation.action == "mute":
+            await submit(chat_id, lambda: client.restrict_chat_member(chat_id, user_id, ChatPermissions()),
+                         Priority.MODERATION, label="mute")
+        elif user_id is not None and violation.action in ("kick", "ban"):
+            await submit(chat_id, lambda: client.ban_chat_member(chat_id, user_id), Priority.MODERATION, label="ban")
+            if violation.action == "kick":
+                await submit(chat_id, lambda: client.unban_chat_member(chat_id, user_id),
+                             Priority.MODERATION, label="unban")
+    except RPCError as e:
+        logger.warning(f"⚠️  Could not apply {violation.action} in {chat_id}: {e}")
+        return
+
+    record_action(chat_id, violation.action)
+    await log_event(
+        chat_id,
+        violation.action,
+        target_id=user_id,
+        data={"module": violation.module_key, "rule": violation.rule, "detail": violation.detail}
+    )
+
+
+def register_handlers(app: Client):
+    """Register message handlers with Pyrogram."""
+    app.add_handler(
+        MessageHandler(enforce_rules, filters.group & ~filters.me),
+        group=RULES_HANDLER_GROUP
+    )
+    logger.info("✅ Message handlers registered")
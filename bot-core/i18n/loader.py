@@ -1,20 +1,61 @@
 """
 i18n Loader
 Translation system for bilingual (Persian/English) support.
+
+Translations are flattened at load time into a (language, dotted.key) ->
+template table, so rendering a reply costs one dict lookup plus formatting.
+Group languages are kept in memory (warmed by get_group_language()) so the
+sync _() can translate per group without touching the database.
 """
 
 import json
-from pathlib import Path
-from typing import Dict, Optional
+import time
+from string import Formatter
+from typing import Any, Dict, Optional, Tuple
 from loguru import logger
 
 from config.settings import settings
-from config.database import get_groups_collection
+from services.group_service import add_invalidation_listener, get_group_config
 
 
-# Global translations cache
+# Global translations cache (nested, as loaded from JSON)
 _translations: Dict[str, Dict] = {}
 
+# Flattened templates: (language, "dotted.key") -> (text, has_placeholders)
+_templates: Dict[Tuple[str, str], Tuple[str, bool]] = {}
+
+# Group languages known in memory (group_id -> language code)
+_group_languages: Dict[int, str] = {}
+
+# Missing-key warnings are logged at most once per key per interval (seconds)
+_WARN_INTERVAL = 300
+_last_warned: Dict[str, float] = {}
+
+_formatter = Formatter()
+
+
+def _flatten(tree: Dict[str, Any], language: str, prefix: str = ""):
+    """Flatten nested translation dict into _templates."""
+    for name, value in tree.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            _flatten(value, language, f"{key}.")
+        elif isinstance(value, str):
+            has_placeholders = any(
+                field is not None for _lit, field, _spec, _conv in _formatter.parse(value)
+            )
+            _templates[(language, key)] = (value, has_placeholders)
+
+
+def _warn_once(token: str, message: str):
+    """Log a warning, rate-limited per token."""
+    now = time.monotonic()
+    last = _last_warned.get(token)
+    if last is not None and now - last < _WARN_INTERVAL:
+        return
+    _last_warned[token] = now
+    logger.warning(message)
+
 
 def load_translations():
     """
@@ -22,98 +63,115 @@ def load_translations():
     Called during bot startup.
     """
     global _translations
-    
+
     i18n_dir = settings.I18N_DIR
-    
+
     for lang in settings.SUPPORTED_LANGUAGES:
         lang_file = i18n_dir / f"{lang}.json"
-        
+
         if not lang_file.exists():
             logger.error(f"❌ Translation file not found: {lang_file}")
             continue
-        
+
         try:
             with open(lang_file, 'r', encoding='utf-8') as f:
                 _translations[lang] = json.load(f)
-            
+
+            _flatten(_translations[lang], lang)
             logger.success(f"✅ Loaded {lang} translations")
         except Exception as e:
             logger.error(f"❌ Failed to load {lang} translations: {e}")
-    
+
     if not _translations:
         logger.error("❌ No translations loaded! Bot will not work properly.")
         raise RuntimeError("No translations loaded")
 
 
+def _resolve_missing(key: str, language: str) -> Tuple[str, bool]:
+    """
+    Slow path for lookups that missed the flat table:
+    unknown language or key -> default language -> key itself.
+    """
+    if language not in _translations:
+        _warn_once(
+            f"lang:{language}",
+            f"⚠️  Language '{language}' not loaded, falling back to {settings.DEFAULT_LANGUAGE}"
+        )
+    else:
+        _warn_once(f"{language}:{key}", f"⚠️  Translation key not found: {key} (lang: {language})")
+
+    template = _templates.get((settings.DEFAULT_LANGUAGE, key))
+    if template is not None:
+        return template
+
+    return key, False  # Return key itself as fallback
+
+
 def get_translation(key: str, language: str = None) -> str:
     """
     Get translation for a key in specified language.
-    
+
     Args:
         key: Translation key (dot-separated path, e.g., "auth.unauthorized_install")
         language: Language code (fa/en). If None, uses default language.
-    
+
     Returns:
         Translated string or key if not found.
     """
     if language is None:
         language = settings.DEFAULT_LANGUAGE
-    
-    if language not in _translations:
-        logger.warning(f"⚠️  Language '{language}' not loaded, falling back to {settings.DEFAULT_LANGUAGE}")
-        language = settings.DEFAULT_LANGUAGE
-    
-    # Navigate through nested dict using dot-separated key
-    keys = key.split('.')
-    value = _translations.get(language, {})
-    
-    for k in keys:
-        if isinstance(value, dict):
-            value = value.get(k)
-        else:
-            break
-    
-    if value is None or not isinstance(value, str):
-        logger.warning(f"⚠️  Translation key not found: {key} (lang: {language})")
-        return key  # Return key itself as fallback
-    
-    return value
+
+    template = _templates.get((language, key))
+    if template is None:
+        template = _resolve_missing(key, language)
+
+    return template[0]
 
 
 async def get_group_language(group_id: int) -> str:
     """
     Get language setting for a specific group.
-    
+    Also remembers it in memory so _() can use it without DB access.
+
     Args:
         group_id: Telegram group ID
-    
+
     Returns:
         Language code (fa/en)
     """
     try:
-        groups_col = get_groups_collection()
-        group_doc = await groups_col.find_one({"group_id": group_id})
-        
-        if group_doc and "language" in group_doc:
-            return group_doc["language"]
+        group_config = await get_group_config(group_id)
+        _group_languages[group_id] = group_config.language
+        return group_config.language
     except Exception as e:
         logger.error(f"Failed to get group language for {group_id}: {e}")
-    
+
     # Fallback to default
     return settings.DEFAULT_LANGUAGE
 
 
+def _forget_group_language(group_id: Optional[int]):
+    """Group cache invalidation hook - language may have changed."""
+    if group_id is None:
+        _group_languages.clear()
+    else:
+        _group_languages.pop(group_id, None)
+
+
+add_invalidation_listener(_forget_group_language)
+
+
 def _(group_id: Optional[int], key: str, language: Optional[str] = None, **kwargs) -> str:
     """
     Shorthand translation function with formatting support.
-    
+
     Usage:
         # Simple translation
         await message.reply(_(group_id, "auth.unauthorized_install"))
-        
+
         # With language override
         await message.reply(_(group_id, "auth.unauthorized_install", language="en"))
-        
+
         # With formatting
         await message.reply(_(
             group_id,
@@ -122,36 +180,38 @@ def _(group_id: Optional[int], key: str, language: Optional[str] = None, **kwarg
             by="Admin",
             reason="Spam"
         ))
-    
+
     Args:
         group_id: Group ID (used to determine language if language param not provided)
         key: Translation key
         language: Override language (optional)
         **kwargs: Format variables for string formatting
-    
+
     Returns:
         Translated and formatted string
     """
-    # If language not specified, use group language or default
+    # If language not specified, use the group's language known in memory.
+    # It is warmed by get_group_language() (e.g. from the i18n middleware).
     if language is None:
         if group_id:
-            # This is sync function, so we can't await
-            # In handlers, use get_group_language() async function instead
-            # Here we just use default
-            language = settings.DEFAULT_LANGUAGE
+            language = _group_languages.get(group_id, settings.DEFAULT_LANGUAGE)
         else:
             language = settings.DEFAULT_LANGUAGE
-    
+
     # Get translation
-    text = get_translation(key, language)
-    
+    template = _templates.get((language, key))
+    if template is None:
+        template = _resolve_missing(key, language)
+
+    text, has_placeholders = template
+
     # Format if kwargs provided
-    if kwargs:
+    if kwargs and has_placeholders:
         try:
             text = text.format(**kwargs)
         except KeyError as e:
-            logger.warning(f"⚠️  Missing format variable {e} for key: {key}")
-    
+            _warn_once(f"format:{key}", f"⚠️  Missing format variable {e} for key: {key}")
+
     return text
 
 
@@ -7,6 +7,7 @@ This is the main entry point for the Telegram bot service.
 Initializes all handlers, middlewares, schedulers, and starts the bot.
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -32,9 +33,19 @@ from middlewares import (
     logger_middleware,
     i18n_middleware
 )
-from routers.module_loader import load_modules
+from routers.module_loader import discover_modules, load_modules
+from routers.command_router import command_router
+from routers.panel_router import panel_router
 from services.scheduler import init_scheduler, shutdown_scheduler
+from services.group_service import start_group_cache_watcher, stop_group_cache_watcher
+from services.tracking_service import start_join_writer, stop_join_writer
+from services.raid_monitor import start_raid_monitor, stop_raid_monitor
+from services.outbound import stop_outbound
+from services.log_service import start_log_writer, stop_log_writer
+from services.stats_service import start_stats_writer, stop_stats_writer
+from services.bot_identity import set_bot_identity
 from i18n.loader import load_translations
+from utils.startup_profiler import StartupCProfile, StartupProfiler
 
 
 # Configure logger
@@ -66,58 +77,102 @@ app = Client(
 )
 
 
-async def startup():
-    """
-    Startup sequence:
-    1. Initialize database connection
-    2. Load translations (i18n)
-    3. Load modules from bot-modules
-    4. Register middlewares
-    5. Register handlers
-    6. Start scheduler
-    7. Log SUDO users and bot info
-    """
-    logger.info("🚀 Starting Enterprise Telegram Group Management Bot...")
-    
-    # 1. Initialize database
+async def _connect_database():
+    """Phase: connect to MongoDB, reconcile indexes, start DB-backed services."""
     logger.info("📊 Connecting to MongoDB...")
     await init_database()
+    start_group_cache_watcher()
+    start_join_writer()
+    start_log_writer()
+    start_stats_writer()
+    start_raid_monitor()
     logger.success("✅ Database connected")
-    
-    # 2. Load translations
+
+
+async def _load_translations():
+    """Phase: load translation files (file IO, runs in a worker thread)."""
     logger.info("🌐 Loading translations (fa/en)...")
-    load_translations()
+    await asyncio.to_thread(load_translations)
     logger.success(f"✅ Loaded translations: {settings.SUPPORTED_LANGUAGES}")
+
+
+async def _discover_modules():
+    """Phase: read module manifests (module code is imported lazily on first use)."""
+    manifests = await asyncio.to_thread(discover_modules)
+    logger.info(f"📦 Found {len(manifests)} module manifests")
+
+
+async def _start_scheduler():
+    """Phase: start scheduler (for daily reports, cleanup, etc.)."""
+    logger.info("⏰ Starting job scheduler...")
+    await init_scheduler(app)
+    logger.success("✅ Scheduler started")
+
+
+async def startup(profile: bool = False):
+    """
+    Startup sequence (independent phases run concurrently):
+    1. Database connection + index reconciliation | translations (i18n) | bot info
+       | module manifests
+    2. Register modules from bot-modules (lazy: imported on first use)
+    3. Register middlewares
+    4. Register handlers
+    5. Start scheduler | connect rate limiter backend
+    6. Log SUDO users, bot info and the startup timing table
+    
+    Args:
+        profile: Run under cProfile and dump a report to the logs directory
+    """
+    logger.info("🚀 Starting Enterprise Telegram Group Management Bot...")
+    
+    profiler = StartupProfiler()
+    cprofile = StartupCProfile(settings.LOGS_DIR) if profile else None
+    if cprofile:
+        cprofile.start()
     
-    # 3. Load modules
-    logger.info("📦 Loading feature modules...")
-    loaded_modules = load_modules(app)
-    logger.success(f"✅ Loaded {len(loaded_modules)} modules: {', '.join(loaded_modules)}")
+    # 1. Independent phases: database, translations, bot identity, module manifests
+    _, _, me, _ = await asyncio.gather(
+        profiler.run("database", _connect_database()),
+        profiler.run("translations", _load_translations()),
+        profiler.run("bot_identity", app.get_me()),
+        profiler.run("module_manifests", _discover_modules()),
+    )
+    set_bot_identity(me)
     
-    # 4. Register middlewares (order matters!)
+    # 2. Register modules (imported on first matching update or when enabled)
+    logger.info("📦 Registering feature modules...")
+    with profiler.measure("modules"):
+        loaded_modules = load_modules(app)
+    logger.success(f"✅ Registered {len(loaded_modules)} modules: {', '.join(loaded_modules)}")
+    
+    # 3. Register middlewares (order matters!)
     logger.info("🔧 Registering middlewares...")
-    app.add_handler(logger_middleware.LoggerMiddleware(), group=-1)
-    app.add_handler(i18n_middleware.I18nMiddleware(), group=-1)
-    app.add_handler(auth_middleware.AuthMiddleware(), group=-1)
-    app.add_handler(rate_limiter.RateLimiterMiddleware(), group=-1)
+    with profiler.measure("middlewares"):
+        app.add_handler(logger_middleware.LoggerMiddleware(), group=-1)
+        app.add_handler(i18n_middleware.I18nMiddleware(), group=-1)
+        app.add_handler(rate_limiter.RateLimiterMiddleware(), group=-1)
+        app.add_handler(auth_middleware.AuthMiddleware(), group=-1)
     logger.success("✅ Middlewares registered")
     
-    # 5. Register core handlers
+    # 4. Register core handlers
     logger.info("🎯 Registering event handlers...")
-    message_handler.register_handlers(app)
-    callback_handler.register_handlers(app)
-    join_handler.register_handlers(app)
-    leave_handler.register_handlers(app)
-    member_update_handler.register_handlers(app)
+    with profiler.measure("handlers"):
+        message_handler.register_handlers(app)
+        command_router.register_handlers(app)
+        panel_router.register_handlers(app)
+        callback_handler.register_handlers(app)
+        join_handler.register_handlers(app)
+        leave_handler.register_handlers(app)
+        member_update_handler.register_handlers(app)
     logger.success("✅ Event handlers registered")
     
-    # 6. Start scheduler (for daily reports, cleanup, etc.)
-    logger.info("⏰ Starting job scheduler...")
-    await init_scheduler(app)
-    logger.success("✅ Scheduler started")
+    # 5. Scheduler and rate limiter backend (both only need the database)
+    await asyncio.gather(
+        profiler.run("scheduler", _start_scheduler()),
+        profiler.run("rate_limiter", rate_limiter.init_rate_limiter()),
+    )
     
-    # 7. Log bot information
-    me = await app.get_me()
+    # 6. Log bot information
     logger.info(f"🤖 Bot Name: {me.first_name}")
     logger.info(f"🆔 Bot ID: {me.id}")
     logger.info(f"👤 Bot Username: @{me.username}")
@@ -128,6 +183,13 @@ async def startup():
     if settings.DEBUG:
         logger.warning("⚠️  DEBUG mode is enabled!")
     
+    profiler.log_summary()
+    
+    if cprofile:
+        report_path = cprofile.stop_and_dump()
+        logger.info(f"🔬 Startup profile written to {report_path} (and startup.prof)")
+        logger.info("🔬 For import timings run: python -X importtime main.py 2> importtime.log")
+    
     logger.success("✅ Bot started successfully and is now running!")
     logger.info("Press Ctrl+C to stop the bot.")
 
@@ -136,7 +198,7 @@ async def shutdown():
     """
     Shutdown sequence:
     1. Stop scheduler
-    2. Close database connection
+    2. Flush buffered writes, close database connection
     3. Log shutdown message
     """
     logger.info("🛑 Shutting down bot...")
@@ -145,14 +207,21 @@ async def shutdown():
     await shutdown_scheduler()
     logger.info("⏰ Scheduler stopped")
     
-    # 2. Close database
+    # 2. Send queued API calls, flush buffered writes, stop group cache watcher and close database
+    await stop_outbound()
+    await stop_raid_monitor()
+    await stop_stats_writer()
+    await stop_log_writer()
+    await stop_join_writer()
+    logger.info("📊 Join tracking writes flushed")
+    await stop_group_cache_watcher()
     await close_database()
     logger.info("📊 Database connection closed")
     
     logger.success("✅ Bot shut down gracefully. Goodbye! 👋")
 
 
-async def main():
+async def main(profile_startup: bool = False):
     """
     Main entry point:
     - Start the bot
@@ -164,7 +233,7 @@ async def main():
         await app.start()
         
         # Run startup tasks
-        await startup()
+        await startup(profile=profile_startup)
         
         # Keep bot running
         await idle()
@@ -190,8 +259,16 @@ if __name__ == "__main__":
             logger.error("❌ Python 3.10+ is required!")
             sys.exit(1)
         
+        parser = argparse.ArgumentParser(description="Telegram Group Management Bot")
+        parser.add_argument(
+            "--profile-startup",
+            action="store_true",
+            help="Profile startup with cProfile and write a report to the logs directory"
+        )
+        args = parser.parse_args()
+        
         # Run the bot
-        asyncio.run(main())
+        asyncio.run(main(profile_startup=args.profile_startup))
         
     except Exception as e:
         logger.exception(f"❌ Failed to start bot: {e}")
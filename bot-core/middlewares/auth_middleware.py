@@ -1,5 +1,115 @@
 """
-auth_middleware.py
+Auth Middleware
+Enforces the role/permission requirements of commands and panels.
+
+Modules declare requirements in their manifest ("permissions"); they are
+looked up by command key or callback prefix, and checked against the
+user's compiled grant (services.permission_service) and Telegram role
+(services.admin_roster). On cache hits the check is a few dict lookups
+and one AND, with no MongoDB or API call.
+
+Only commands registered with the command router are checked. Denied
+commands typed with a prefix ("/ban") and denied panels are answered and
+dropped (StopPropagation). Denied prefix-less text ("ban this spam") is
+never answered or dropped: it is marked as plain text (so the command
+router does not run it) and continues to the rule engine and module
+filters. Runs after the rate limiter, so denial replies are rate-limited
+too.
 """
 
-# TODO: Implement
+from typing import Optional, Tuple, Union
+
+from pyrogram import Client, ContinuePropagation, StopPropagation
+from pyrogram.enums import ChatType
+from pyrogram.handlers import CallbackQueryHandler, MessageHandler
+from pyrogram.types import CallbackQuery, Message
+from loguru import logger
+
+from i18n.loader import _
+from models.permission import PERMISSION_KEYS, Grant, Requirement, Role
+from routers.command_router import command_router
+from routers.panel_router import PanelRouter
+from services.admin_roster import get_chat_role
+from services.group_service import get_group_config
+from services.permission_service import get_requirement, permission_resolver
+from utils.filters import ignore_command, parse_command
+
+
+_GROUP_CHATS = (ChatType.GROUP, ChatType.SUPERGROUP)
+
+_ROLE_MESSAGES = {
+    Role.SUDO: "auth.sudo_only",
+    Role.OWNER: "auth.owner_only",
+}
+
+
+def denial_message(group_id: int, requirement: Requirement, grant: Grant) -> str:
+    """Translated reason a grant does not satisfy a requirement."""
+    if requirement.bits and grant.role >= Role.ADMIN:
+        labels = ", ".join(
+            _(group_id, f"permissions.{key}")
+            for permission, key in PERMISSION_KEYS.items()
+            if requirement.bits & permission.value
+        )
+        return _(group_id, "auth.permission_denied", permission=labels)
+    return _(group_id, _ROLE_MESSAGES.get(requirement.role, "auth.admin_only"))
+
+
+class AuthMiddleware(MessageHandler, CallbackQueryHandler):
+    """
+    Runs for messages and callback queries (handler group -1).
+    Only group commands and panels with a declared requirement are checked.
+    """
+
+    def __init__(self):
+        super().__init__(self._check)
+
+    @staticmethod
+    def _requirement_of(update: Union[Message, CallbackQuery]) -> Tuple[Optional[Requirement], bool]:
+        """(requirement, whether a denial may be answered)."""
+        if isinstance(update, CallbackQuery):
+            if not update.data:
+                return None, False
+            return get_requirement(PanelRouter.prefix_of(update.data)), True
+        parsed = parse_command(update)
+        if parsed is None or not command_router.has_command(parsed.key):
+            return None, False
+        return get_requirement(parsed.key), parsed.prefix != ""
+
+    async def _check(self, client: Client, update: Union[Message, CallbackQuery]):
+        chat = update.message.chat if isinstance(update, CallbackQuery) and update.message else getattr(update, "chat", None)
+        if chat is None or chat.type not in _GROUP_CHATS or not update.from_user:
+            raise ContinuePropagation
+
+        requirement, answerable = self._requirement_of(update)
+        if requirement is None:
+            raise ContinuePropagation
+
+        group_id, user_id = chat.id, update.from_user.id
+        config = await get_group_config(group_id)
+        chat_role = await get_chat_role(client, group_id, user_id)
+        grant = await permission_resolver.get(config, user_id, chat_role)
+        if grant.allows(requirement):
+            raise ContinuePropagation
+        if not answerable:
+            # Plain text that merely starts with a command word is not blocked
+            ignore_command(update)
+            raise ContinuePropagation
+
+        logger.debug(f"🔐 Denied {requirement.label}: user={user_id}, group={group_id}, role={grant.role.name}")
+        text = denial_message(group_id, requirement, grant)
+        try:
+            if isinstance(update, CallbackQuery):
+                await update.answer(text, show_alert=True)
+            else:
+                await update.reply(text)
+        except Exception as e:
+            logger.error(f"Failed to send permission denial: {e}")
+
+        raise StopPropagation
+
+
+__all__ = [
+    "AuthMiddleware",
+    "denial_message",
+]
@@ -1,5 +1,39 @@
 """
-i18n_middleware.py
+i18n Middleware
+Resolves the group's language before handlers run, so the sync _()
+translates in the group's language without a database query.
 """
 
-# TODO: Implement
+from pyrogram import Client, ContinuePropagation
+from pyrogram.enums import ChatType
+from pyrogram.handlers import CallbackQueryHandler, MessageHandler
+from pyrogram.types import CallbackQuery, Message
+from typing import Union
+
+from i18n.loader import get_group_language
+
+
+_GROUP_TYPES = (ChatType.GROUP, ChatType.SUPERGROUP)
+
+
+class I18nMiddleware(MessageHandler, CallbackQueryHandler):
+    """
+    Runs for messages and callback queries (handler group -1).
+    Never consumes the update.
+    """
+
+    def __init__(self):
+        super().__init__(self._warm_language)
+
+    async def _warm_language(self, client: Client, update: Union[Message, CallbackQuery]):
+        message = update.message if isinstance(update, CallbackQuery) else update
+        chat = message.chat if message else None
+
+        if chat is not None and chat.type in _GROUP_TYPES:
+            # Served from the group config cache on the hot path
+            await get_group_language(chat.id)
+
+        raise ContinuePropagation
+
+
+__all__ = ["I18nMiddleware"]
@@ -1,5 +1,151 @@
 """
-rate_limiter.py
+Rate Limiter Middleware
+Per-user token buckets for commands and panel interactions.
+
+Buckets are keyed by (user, group, kind):
+- "command": registered commands, RATE_LIMIT_COMMANDS_PER_MINUTE
+- "panel":   callback queries,    RATE_LIMIT_PANELS_PER_MINUTE
+
+State lives in sharded in-memory dicts. When REDIS_URL is set (and the
+optional `redis` package is installed) buckets are shared through Redis so
+several bot-core replicas enforce the same limits; if Redis is unreachable
+the limiter falls back to local buckets and retries Redis later.
 """
 
-# TODO: Implement
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from pyrogram import Client, ContinuePropagation, StopPropagation
+from pyrogram.handlers import CallbackQueryHandler, MessageHandler
+from pyrogram.types import CallbackQuery, Message
+from loguru import logger
+
+from config.settings import settings
+from i18n.loader import _
+from routers.command_router import command_router
+from utils.filters import parse_command
+from utils.token_bucket import RedisTokenBucket, TokenBucketLimiter
+
+
+# Seconds to stay on local buckets after a Redis error
+_REDIS_RETRY_AFTER = 30.0
+
+
+class RateLimiter:
+    """Token-bucket limiter with optional Redis backend and local fallback."""
+
+    def __init__(self, limits: Dict[str, int]):
+        # kind -> (capacity, refill per second); limits are per minute
+        self.limits: Dict[str, Tuple[float, float]] = {
+            kind: (float(per_minute), per_minute / 60.0)
+            for kind, per_minute in limits.items()
+        }
+        self.local = TokenBucketLimiter(idle_ttl=60.0)
+        self.redis: Optional[RedisTokenBucket] = None
+        self._redis_down_until = 0.0
+        self.stats = {"allowed": 0, "limited": 0, "redis_errors": 0}
+
+    async def connect_redis(self, url: str):
+        """Enable the shared Redis backend (optional dependency)."""
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            logger.warning("⚠️  REDIS_URL is set but the 'redis' package is not installed, using local rate limits")
+            return
+
+        try:
+            client = aioredis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            await client.ping()
+            self.redis = RedisTokenBucket(client)
+            logger.info("🚦 Rate limiter using shared Redis buckets")
+        except Exception as e:
+            logger.warning(f"⚠️  Redis unavailable ({e}), using local rate limits")
+
+    async def allow(self, user_id: int, group_id: int, kind: str) -> bool:
+        """Consume one token for (user, group, kind)."""
+        capacity, rate = self.limits[kind]
+
+        allowed = None
+        if self.redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                allowed = await self.redis.check(f"{kind}:{group_id}:{user_id}", capacity, rate)
+            except Exception as e:
+                self.stats["redis_errors"] += 1
+                self._redis_down_until = time.monotonic() + _REDIS_RETRY_AFTER
+                logger.warning(f"⚠️  Redis rate limit check failed, falling back to local: {e}")
+
+        if allowed is None:
+            allowed = self.local.check((user_id, group_id, kind), capacity, rate)
+
+        self.stats["allowed" if allowed else "limited"] += 1
+        return allowed
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            **self.local.get_stats(),
+            "backend": "redis" if self.redis is not None else "local",
+        }
+
+
+# ==================== Global Limiter ====================
+rate_limiter = RateLimiter({
+    "command": settings.RATE_LIMIT_COMMANDS_PER_MINUTE,
+    "panel": settings.RATE_LIMIT_PANELS_PER_MINUTE,
+})
+
+
+async def init_rate_limiter():
+    """Connect the optional Redis backend (call during startup)."""
+    if settings.RATE_LIMIT_ENABLED and settings.REDIS_URL:
+        await rate_limiter.connect_redis(settings.REDIS_URL)
+
+
+class RateLimiterMiddleware(MessageHandler, CallbackQueryHandler):
+    """
+    Runs for messages and callback queries (handler group -1).
+    Limited updates are dropped (StopPropagation), others continue.
+    """
+
+    def __init__(self):
+        super().__init__(self._check)
+
+    async def _check(self, client: Client, update: Union[Message, CallbackQuery]):
+        if not settings.RATE_LIMIT_ENABLED or not update.from_user:
+            raise ContinuePropagation
+
+        user_id = update.from_user.id
+        if user_id in settings.SUDO_USERS:
+            raise ContinuePropagation
+
+        if isinstance(update, CallbackQuery):
+            kind = "panel"
+            group_id = update.message.chat.id if update.message else 0
+        else:
+            parsed = parse_command(update)
+            if parsed is None or not command_router.has_command(parsed.key):
+                raise ContinuePropagation
+            kind = "command"
+            group_id = update.chat.id
+
+        if await rate_limiter.allow(user_id, group_id, kind):
+            raise ContinuePropagation
+
+        logger.debug(f"🚦 Rate limited {kind}: user={user_id}, group={group_id}")
+
+        if isinstance(update, CallbackQuery):
+            # Callback queries must be answered, tell the user to slow down
+            try:
+                await update.answer(_(group_id, "errors.rate_limit"))
+            except Exception as e:
+                logger.error(f"Failed to answer rate-limited callback: {e}")
+
+        raise StopPropagation
+
+
+__all__ = [
+    "RateLimiter",
+    "RateLimiterMiddleware",
+    "rate_limiter",
+    "init_rate_limiter",
+]
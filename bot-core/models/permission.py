@@ -1,5 +1,130 @@
 """
-permission.py
+Permission Model
+Roles, bot permission bits and their storage format.
+
+Role hierarchy: SUDO > OWNER > ADMIN > VIP > MEMBER. SUDO and OWNER hold
+every permission; an ADMIN holds the group's apanel template
+(`admin_defaults`) with their upanel overrides (`admin_overrides`) applied
+on top; VIP and MEMBER hold none.
+
+Permissions are stored as {"bot_ban": true, ...} (the keys of the
+`permissions.*` i18n labels) and compiled to an int bitset, so a check is
+one AND.
 """
 
-# TODO: Implement
+from enum import IntEnum, IntFlag
+from typing import Dict, NamedTuple, Tuple
+
+
+class Role(IntEnum):
+    MEMBER = 0
+    VIP = 1
+    ADMIN = 2
+    OWNER = 3
+    SUDO = 4
+
+
+class Permission(IntFlag):
+    NONE = 0
+    BAN = 1 << 0
+    KICK = 1 << 1
+    MUTE = 1 << 2
+    WARN = 1 << 3
+    PURGE = 1 << 4
+    LOCKS = 1 << 5
+    TAG = 1 << 6
+    REPORTS = 1 << 7
+    LOGS_VIEW = 1 << 8
+    SETTINGS_LIMITED = 1 << 9
+
+
+ALL_PERMISSIONS = 0
+for _permission in Permission:
+    ALL_PERMISSIONS |= _permission.value
+
+# Permission -> storage key (also the i18n label "permissions.<key>")
+PERMISSION_KEYS: Dict[Permission, str] = {
+    permission: f"bot_{permission.name.lower()}" for permission in Permission if permission.value
+}
+_BY_KEY: Dict[str, Permission] = {key: permission for permission, key in PERMISSION_KEYS.items()}
+
+# Template of admins in groups without an apanel document
+DEFAULT_ADMIN_PERMISSIONS = int(
+    Permission.BAN | Permission.KICK | Permission.MUTE | Permission.WARN
+    | Permission.PURGE | Permission.TAG | Permission.REPORTS | Permission.LOGS_VIEW
+)
+
+
+def compile_permissions(doc: Dict[str, bool]) -> Tuple[int, int]:
+    """
+    Compile a stored permissions document.
+
+    Returns:
+        (mask, value): bits the document sets, and which of them are granted
+    """
+    mask = value = 0
+    for key, granted in (doc or {}).items():
+        permission = _BY_KEY.get(key)
+        if permission is None:
+            continue
+        mask |= permission.value
+        if granted:
+            value |= permission.value
+    return mask, value
+
+
+def permissions_doc(bits: int) -> Dict[str, bool]:
+    """Storage document of a full bitset (every key present)."""
+    return {key: bool(bits & permission.value) for permission, key in PERMISSION_KEYS.items()}
+
+
+class Requirement(NamedTuple):
+    """What a command or panel needs: a minimum role and/or permission bits."""
+    role: Role = Role.MEMBER
+    bits: int = 0
+
+    @property
+    def label(self) -> str:
+        if self.bits:
+            return ", ".join(key for permission, key in PERMISSION_KEYS.items() if self.bits & permission.value)
+        return self.role.name.lower()
+
+
+class Grant(NamedTuple):
+    """Resolved role and permissions of a user in a group."""
+    role: Role
+    bits: int
+
+    def allows(self, requirement: Requirement) -> bool:
+        return self.role >= requirement.role and self.bits & requirement.bits == requirement.bits
+
+
+def parse_requirement(name: str) -> Requirement:
+    """
+    Requirement from a manifest value: a role ("admin", "owner", "sudo")
+    or a permission ("ban", "logs_view", ...).
+
+    Raises:
+        ValueError: Unknown name
+    """
+    key = name.lower()
+    if key.upper() in Role.__members__:
+        return Requirement(role=Role[key.upper()])
+    permission = _BY_KEY.get(key if key.startswith("bot_") else f"bot_{key}")
+    if permission is None:
+        raise ValueError(f"unknown role or permission '{name}'")
+    return Requirement(role=Role.ADMIN, bits=permission.value)
+
+
+__all__ = [
+    "Role",
+    "Permission",
+    "ALL_PERMISSIONS",
+    "PERMISSION_KEYS",
+    "DEFAULT_ADMIN_PERMISSIONS",
+    "compile_permissions",
+    "permissions_doc",
+    "Requirement",
+    "Grant",
+    "parse_requirement",
+]
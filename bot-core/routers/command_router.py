@@ -1,5 +1,167 @@
 """
-command_router.py
+Command Router
+Central command index: one parse per message, one dict lookup per command.
+
+Instead of registering one Pyrogram handler (and one filter scan) per command,
+features register their callbacks here. A single MessageHandler parses the
+first token of each message and dispatches only to the handlers registered
+for that command.
 """
 
-# TODO: Implement
+from pyrogram import Client, filters as pyro_filters
+from pyrogram.filters import Filter
+from pyrogram.handlers import MessageHandler
+from pyrogram.types import Message
+from loguru import logger
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from utils.filters import DEFAULT_PREFIXES, ParsedCommand, parse_command
+
+
+class CommandRoute:
+    """A single registered command callback."""
+
+    __slots__ = ("name", "callback", "handler", "case_sensitive")
+
+    def __init__(
+        self,
+        name: str,
+        callback: Callable,
+        filters: Optional[Filter] = None,
+        case_sensitive: bool = False
+    ):
+        self.name = name
+        self.callback = callback
+        # Reuse Pyrogram's handler to evaluate extra filters (sync or async)
+        self.handler = MessageHandler(callback, filters)
+        self.case_sensitive = case_sensitive
+
+    def matches(self, parsed: ParsedCommand) -> bool:
+        """Case-sensitive routes must match the command exactly as typed."""
+        return not self.case_sensitive or parsed.name == self.name
+
+
+class CommandRouter:
+    """
+    Command index mapping lowercased command names to their routes.
+
+    Usage:
+        @command_router.command("ban", filters=filters.group)
+        async def ban_user(client, message): ...
+
+        command_router.register_handlers(app)
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, List[CommandRoute]] = {}
+        # Commands whose handlers are registered on first use (lazy modules)
+        self._lazy: Dict[str, Callable[[], Awaitable[None]]] = {}
+
+    # ==================== Registration ====================
+
+    def add_command(
+        self,
+        commands: Union[str, List[str]],
+        callback: Callable,
+        filters: Optional[Filter] = None,
+        case_sensitive: bool = False
+    ):
+        """Register callback for one or more commands."""
+        if isinstance(commands, str):
+            commands = [commands]
+
+        for cmd in commands:
+            route = CommandRoute(cmd, callback, filters, case_sensitive)
+            self._routes.setdefault(cmd.lower(), []).append(route)
+
+    def command(
+        self,
+        commands: Union[str, List[str]],
+        filters: Optional[Filter] = None,
+        case_sensitive: bool = False
+    ):
+        """Decorator version of add_command()."""
+        def decorator(func: Callable) -> Callable:
+            self.add_command(commands, func, filters, case_sensitive)
+            return func
+        return decorator
+
+    def add_lazy(self, commands: List[str], loader: Callable[[], Awaitable[None]]):
+        """
+        Register commands whose handlers are added by loader() on first use
+        (used by the module loader to import feature modules lazily).
+        """
+        for cmd in commands:
+            self._lazy.setdefault(cmd.lower(), loader)
+
+    def discard_lazy(self, commands: List[str]):
+        """Forget lazy entries once their handlers are registered."""
+        for cmd in commands:
+            self._lazy.pop(cmd.lower(), None)
+
+    def has_command(self, key: str) -> bool:
+        """Check if a (lowercased) command is registered."""
+        return key in self._routes or key in self._lazy
+
+    @property
+    def commands(self) -> List[str]:
+        """All registered (lowercased) command names."""
+        return list(self._routes.keys() | self._lazy.keys())
+
+    # ==================== Dispatch ====================
+
+    def lookup(self, message: Message) -> Optional[ParsedCommand]:
+        """Parse message and return the parsed command if it is registered."""
+        parsed = parse_command(message, DEFAULT_PREFIXES)
+        if parsed is None or not self.has_command(parsed.key):
+            return None
+        return parsed
+
+    async def dispatch(self, client: Client, message: Message):
+        """
+        Run the first route registered for the command whose filters pass
+        (same semantics as handlers inside one Pyrogram group).
+        """
+        parsed = self.lookup(message)
+        if parsed is None:
+            return
+
+        loader = self._lazy.get(parsed.key)
+        if loader is not None:
+            # Idempotent: concurrent first uses wait for the same import
+            await loader()
+
+        for route in self._routes.get(parsed.key, ()):
+            if not route.matches(parsed):
+                continue
+            if not await route.handler.check(client, message):
+                continue
+
+            await route.callback(client, message)
+            return
+
+    def register_handlers(self, app: Client, group: int = 0):
+        """Register the single dispatching handler with Pyrogram."""
+        async def is_registered(flt, client, message: Message):
+            return self.lookup(message) is not None
+
+        app.add_handler(
+            MessageHandler(
+                self.dispatch,
+                pyro_filters.text & pyro_filters.create(is_registered, "CommandIndexFilter")
+            ),
+            group=group
+        )
+
+        logger.info(f"✅ Command router registered ({len(self.commands)} commands)")
+
+
+# ==================== Global Router ====================
+command_router = CommandRouter()
+
+
+__all__ = [
+    "CommandRoute",
+    "CommandRouter",
+    "command_router"
+]
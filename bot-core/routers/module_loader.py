@@ -1,5 +1,363 @@
 """
-module_loader.py
+Module Loader
+Manifest-driven, lazy loading of feature modules from bot-modules/.
+
+Each module ships a lightweight manifest.json:
+
+    {
+        "name": "locks",
+        "module_key": "locks",
+        "entrypoint": "commands",
+        "commands": ["lock", "unlock", "locks"],
+        "callback_prefixes": ["locks"],
+        "events": ["message"],
+        "permissions": {"lock": "locks", "unlock": "locks", "locks": "locks"},
+        "default_enabled": false,
+        "essential": false
+    }
+
+At startup only manifests are read. The module's code (its entrypoint) is
+imported the first time one of its commands or callback prefixes is used,
+when an event it subscribes to arrives in a group where it is enabled, or
+when a group enables it. The entrypoint exposes setup(module) and registers
+its handlers through the ModuleHandle it receives:
+
+    def setup(module):
+        @module.command("lock")
+        async def lock(client, message): ...
+
+        @module.on("message")
+        async def on_message(client, message): ...
+
+        @module.scheduled("daily_report")
+        async def daily_report(client, group_id): ...
+
+Supported events: message, new_chat_members, left_chat_member,
+chat_member_updated. While a group is in raid mode only modules marked
+"essential" receive events.
+
+"permissions" maps commands and callback prefixes to the role ("admin",
+"owner", "sudo") or bot permission ("ban", "locks", ...) they need; the
+AuthMiddleware enforces it before the module is even imported.
 """
 
-# TODO: Implement
+import asyncio
+import importlib
+import json
+import sys
+import time
+import types
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pyrogram import Client, filters
+from pyrogram.handlers import ChatMemberUpdatedHandler, MessageHandler
+from pyrogram.types import ChatMemberUpdated, Message
+from loguru import logger
+
+from config.database import get_settings_collection
+from config.settings import settings
+from routers.command_router import command_router
+from routers.panel_router import panel_router
+from models.permission import parse_requirement
+from services.group_service import GroupConfig, get_group_config, invalidate_group
+from services.permission_service import register_requirements
+from services.raid_monitor import in_raid
+from services.scheduler import register_group_task
+from utils.startup_profiler import current_rss_mb
+
+
+# bot-modules directory (/bot-modules inside the container)
+MODULES_DIR = settings.BASE_DIR.parent / "bot-modules"
+
+# Modules are imported as bot_modules.<name> to avoid clashing with top-level names
+_PACKAGE = "bot_modules"
+
+MESSAGE_EVENTS = ("message", "new_chat_members", "left_chat_member")
+EVENTS = MESSAGE_EVENTS + ("chat_member_updated",)
+
+# Handler group for module event handlers (core handlers use 0-2)
+EVENT_HANDLER_GROUP = 3
+
+
+class ModuleManifest:
+    """Parsed manifest.json of a module."""
+
+    __slots__ = (
+        "name", "module_key", "entrypoint", "commands",
+        "callback_prefixes", "events", "permissions", "default_enabled", "essential"
+    )
+
+    def __init__(self, data: Dict[str, Any]):
+        self.name: str = data["name"]
+        self.module_key: str = data.get("module_key", self.name)
+        self.entrypoint: str = data.get("entrypoint", "commands")
+        self.commands: List[str] = data.get("commands", [])
+        self.callback_prefixes: List[str] = data.get("callback_prefixes", [])
+        self.events: List[str] = data.get("events", [])
+        # command / callback prefix -> role or permission name
+        self.permissions: Dict[str, str] = data.get("permissions", {})
+        self.default_enabled: bool = data.get("default_enabled", False)
+        # Essential modules keep receiving events in raid mode
+        self.essential: bool = data.get("essential", False)
+
+        unknown = set(self.events) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"unknown events {sorted(unknown)}")
+        for name in self.permissions.values():
+            parse_requirement(name)
+
+
+class ModuleHandle:
+    """
+    A module known from its manifest. Imports the module on first use and
+    gives its setup() a registration API bound to the core routers.
+    """
+
+    def __init__(self, manifest: ModuleManifest):
+        self.manifest = manifest
+        self.loaded = False
+        self.import_ms: Optional[float] = None
+        self.rss_delta_mb: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self.event_handlers: Dict[str, List[Callable]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.manifest.name
+
+    # ==================== Registration API (used by setup()) ====================
+
+    def command(self, commands: Union[str, List[str]], **kwargs):
+        """Register a command handler (see CommandRouter.command)."""
+        return command_router.command(commands, **kwargs)
+
+    def callback(self, prefix: str):
+        """Register a panel callback handler for a data prefix."""
+        return panel_router.callback(prefix)
+
+    def scheduled(self, job_name: str):
+        """Register the per-group task of a scheduled job: callback(client, group_id)."""
+        def decorator(func: Callable) -> Callable:
+            register_group_task(job_name, func)
+            return func
+        return decorator
+
+    def on(self, event: str):
+        """Register an event handler: callback(client, update)."""
+        if event not in self.manifest.events:
+            raise ValueError(f"Module {self.name} must declare event '{event}' in its manifest")
+
+        def decorator(func: Callable) -> Callable:
+            self.event_handlers.setdefault(event, []).append(func)
+            return func
+        return decorator
+
+    # ==================== Loading ====================
+
+    async def ensure_loaded(self):
+        """Import the module and run its setup() (once)."""
+        if self.loaded:
+            return
+
+        async with self._lock:
+            if self.loaded:
+                return
+
+            started, rss_before = time.perf_counter(), current_rss_mb()
+            try:
+                # Import in a worker thread so the event loop keeps serving updates
+                module = await asyncio.to_thread(
+                    importlib.import_module,
+                    f"{_PACKAGE}.{self.name}.{self.manifest.entrypoint}"
+                )
+                setup = getattr(module, "setup", None)
+                if setup is None:
+                    logger.warning(f"⚠️  Module {self.name} has no setup(), nothing registered")
+                else:
+                    setup(self)
+            except Exception as e:
+                self.load_error = str(e)
+                logger.exception(f"❌ Failed to load module {self.name}: {e}")
+            finally:
+                self.loaded = True
+                self.import_ms = (time.perf_counter() - started) * 1000
+                self.rss_delta_mb = current_rss_mb() - rss_before
+                command_router.discard_lazy(self.manifest.commands)
+                panel_router.discard_lazy(self.manifest.callback_prefixes)
+
+            logger.info(
+                f"📦 Loaded module {self.name} in {self.import_ms:.1f} ms "
+                f"({self.rss_delta_mb:+.1f} MB)"
+            )
+
+    async def dispatch(self, event: str, client: Client, update: Any):
+        """Run this module's handlers for an event (errors are isolated)."""
+        for handler in self.event_handlers.get(event, ()):
+            try:
+                await handler(client, update)
+            except Exception as e:
+                logger.exception(f"❌ Module {self.name} failed on {event}: {e}")
+
+
+# ==================== Registry ====================
+_manifests: List[ModuleManifest] = []
+_modules: Dict[str, ModuleHandle] = {}
+_by_key: Dict[str, ModuleHandle] = {}
+_subscribers: Dict[str, List[ModuleHandle]] = {}
+
+
+def _ensure_package():
+    """Expose bot-modules/ as the bot_modules package."""
+    if _PACKAGE not in sys.modules:
+        package = types.ModuleType(_PACKAGE)
+        package.__path__ = [str(MODULES_DIR)]
+        sys.modules[_PACKAGE] = package
+
+
+def discover_modules() -> List[ModuleManifest]:
+    """
+    Read every bot-modules/*/manifest.json (no module code is imported).
+    Safe to run in a worker thread during startup.
+    """
+    _manifests.clear()
+
+    if not MODULES_DIR.is_dir():
+        logger.warning(f"⚠️  Modules directory not found: {MODULES_DIR}")
+        return _manifests
+
+    for manifest_path in sorted(MODULES_DIR.glob("*/manifest.json")):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                _manifests.append(ModuleManifest(json.load(f)))
+        except Exception as e:
+            logger.error(f"❌ Invalid module manifest {manifest_path}: {e}")
+
+    return _manifests
+
+
+def is_enabled_in(group_config: GroupConfig, module_key: str) -> bool:
+    """Check a module's `enabled` flag in an already fetched group config."""
+    handle = _by_key.get(module_key)
+    if handle is None:
+        return False
+    if settings.AUTH_MODE and not group_config.approved:
+        return False
+    return group_config.get_module(module_key).get("enabled", handle.manifest.default_enabled)
+
+
+async def is_module_enabled(group_id: int, module_key: str) -> bool:
+    """Check a module's `enabled` flag for a group (from the group config cache)."""
+    if module_key not in _by_key:
+        return False
+    return is_enabled_in(await get_group_config(group_id), module_key)
+
+
+async def set_module_enabled(group_id: int, module_key: str, enabled: bool):
+    """Enable/disable a module for a group. Enabling imports the module."""
+    await get_settings_collection().update_one(
+        {"group_id": group_id, "module_key": module_key},
+        {"$set": {"enabled": enabled, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    invalidate_group(group_id)
+
+    handle = _by_key.get(module_key)
+    if enabled and handle is not None:
+        await handle.ensure_loaded()
+
+
+async def _dispatch_event(event: str, client: Client, update: Any, group_id: int):
+    raiding = in_raid(group_id)
+    for handle in _subscribers.get(event, ()):
+        if raiding and not handle.manifest.essential:
+            continue
+        if not await is_module_enabled(group_id, handle.manifest.module_key):
+            continue
+        await handle.ensure_loaded()
+        await handle.dispatch(event, client, update)
+
+
+async def _on_message(client: Client, message: Message):
+    if message.new_chat_members:
+        event = "new_chat_members"
+    elif message.left_chat_member:
+        event = "left_chat_member"
+    else:
+        event = "message"
+    await _dispatch_event(event, client, message, message.chat.id)
+
+
+async def _on_chat_member_updated(client: Client, update: ChatMemberUpdated):
+    await _dispatch_event("chat_member_updated", client, update, update.chat.id)
+
+
+def load_modules(app: Client) -> List[str]:
+    """
+    Register every discovered module lazily:
+    - commands and callback prefixes import the module on first use
+    - one event handler per event type dispatches to subscribed modules
+
+    Returns:
+        Names of registered modules
+    """
+    if not _manifests:
+        discover_modules()
+
+    _ensure_package()
+    _modules.clear()
+    _by_key.clear()
+    _subscribers.clear()
+
+    for manifest in _manifests:
+        handle = ModuleHandle(manifest)
+        _modules[manifest.name] = handle
+        _by_key[manifest.module_key] = handle
+
+        command_router.add_lazy(manifest.commands, handle.ensure_loaded)
+        panel_router.add_lazy(manifest.callback_prefixes, handle.ensure_loaded)
+        register_requirements(manifest.permissions)
+        for event in manifest.events:
+            _subscribers.setdefault(event, []).append(handle)
+
+    if any(event in _subscribers for event in MESSAGE_EVENTS):
+        app.add_handler(MessageHandler(_on_message, filters.group), group=EVENT_HANDLER_GROUP)
+    if "chat_member_updated" in _subscribers:
+        app.add_handler(ChatMemberUpdatedHandler(_on_chat_member_updated), group=EVENT_HANDLER_GROUP)
+
+    return list(_modules)
+
+
+def get_module(name: str) -> Optional[ModuleHandle]:
+    """Get a module handle by name."""
+    return _modules.get(name)
+
+
+def get_module_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-module load state and import cost."""
+    return {
+        name: {
+            "loaded": handle.loaded,
+            "import_ms": round(handle.import_ms, 2) if handle.import_ms is not None else None,
+            "rss_delta_mb": round(handle.rss_delta_mb, 2) if handle.rss_delta_mb is not None else None,
+            "error": handle.load_error,
+            "events": handle.manifest.events,
+            "essential": handle.manifest.essential,
+        }
+        for name, handle in _modules.items()
+    }
+
+
+__all__ = [
+    "MODULES_DIR",
+    "ModuleManifest",
+    "ModuleHandle",
+    "discover_modules",
+    "load_modules",
+    "is_enabled_in",
+    "is_module_enabled",
+    "set_module_enabled",
+    "get_module",
+    "get_module_stats",
+]
@@ -1,5 +1,91 @@
 """
-panel_router.py
+Panel Router
+Routes inline-keyboard callback queries by the prefix of their data.
+
+Callback data has the form "<prefix>:<rest>" (e.g. "locks:toggle:photo").
+The prefix is looked up in a dict, so dispatch cost does not depend on the
+number of panels. Prefixes can be registered lazily (module loader).
 """
 
-# TODO: Implement
+from pyrogram import Client
+from pyrogram.handlers import CallbackQueryHandler
+from pyrogram.types import CallbackQuery
+from loguru import logger
+from typing import Awaitable, Callable, Dict, List
+
+
+class PanelRouter:
+    """
+    Callback prefix index.
+
+    Usage:
+        @panel_router.callback("locks")
+        async def locks_panel(client, query): ...
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, Callable] = {}
+        self._lazy: Dict[str, Callable[[], Awaitable[None]]] = {}
+
+    # ==================== Registration ====================
+
+    def add_callback(self, prefix: str, callback: Callable):
+        """Register callback for a data prefix."""
+        if prefix in self._routes:
+            logger.warning(f"⚠️  Callback prefix '{prefix}' registered twice, overriding")
+        self._routes[prefix] = callback
+
+    def callback(self, prefix: str):
+        """Decorator version of add_callback()."""
+        def decorator(func: Callable) -> Callable:
+            self.add_callback(prefix, func)
+            return func
+        return decorator
+
+    def add_lazy(self, prefixes: List[str], loader: Callable[[], Awaitable[None]]):
+        """Register prefixes whose callbacks are added by loader() on first use."""
+        for prefix in prefixes:
+            self._lazy.setdefault(prefix, loader)
+
+    def discard_lazy(self, prefixes: List[str]):
+        """Forget lazy entries once their callbacks are registered."""
+        for prefix in prefixes:
+            self._lazy.pop(prefix, None)
+
+    # ==================== Dispatch ====================
+
+    @staticmethod
+    def prefix_of(data: str) -> str:
+        return data.split(":", 1)[0]
+
+    async def dispatch(self, client: Client, query: CallbackQuery):
+        if not isinstance(query.data, str):
+            return
+
+        prefix = self.prefix_of(query.data)
+
+        loader = self._lazy.get(prefix)
+        if loader is not None:
+            await loader()
+
+        callback = self._routes.get(prefix)
+        if callback is None:
+            logger.debug(f"No panel registered for callback prefix '{prefix}'")
+            return
+
+        await callback(client, query)
+
+    def register_handlers(self, app: Client, group: int = 0):
+        """Register the single dispatching handler with Pyrogram."""
+        app.add_handler(CallbackQueryHandler(self.dispatch), group=group)
+        logger.info(f"✅ Panel router registered ({len(self._routes) + len(self._lazy)} prefixes)")
+
+
+# ==================== Global Router ====================
+panel_router = PanelRouter()
+
+
+__all__ = [
+    "PanelRouter",
+    "panel_router"
+]
@@ -0,0 +1,224 @@
+"""
+Admin Roster Service
+Per-group cache of the Telegram admin list (owner + administrators).
+
+Admin checks (admin_command/owner_command filters, module owner checks,
+the permission resolver) read the roster instead of calling
+get_chat_member for every command. A roster is:
+- filled lazily with one get_chat_members(ADMINISTRATORS) call per group
+- kept current from chat_member_updated events (promotions, demotions,
+  ownership transfers, admins leaving) by handlers/member_update_handler.py
+- reloaded after ADMIN_ROSTER_TTL seconds, as a fallback for missed updates
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pyrogram import Client
+from pyrogram.enums import ChatMemberStatus, ChatMembersFilter
+from pyrogram.errors import RPCError
+from pyrogram.types import ChatMemberUpdated, Message
+from loguru import logger
+
+from config.settings import settings
+from models.permission import Role
+
+
+# Seconds before a roster that could not be fetched is retried
+_FAILED_RETRY_AFTER = 30.0
+
+_ROLES = {
+    ChatMemberStatus.OWNER: Role.OWNER,
+    ChatMemberStatus.ADMINISTRATOR: Role.ADMIN,
+}
+
+
+class _Roster:
+    __slots__ = ("admins", "loaded_at")
+
+    def __init__(self, admins: Dict[int, Role], loaded_at: float):
+        self.admins = admins
+        self.loaded_at = loaded_at
+
+
+class AdminRosterCache:
+    """
+    Bounded LRU + TTL cache of {user_id: Role} per group.
+    Concurrent misses for the same group share a single API call.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, _Roster]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "updates": 0,
+            "evictions": 0,
+        }
+
+    # ==================== Reads ====================
+
+    def peek(self, group_id: int) -> Optional[Dict[int, Role]]:
+        """Cached roster without any API call (None if not cached/expired)."""
+        entry = self._entries.get(group_id)
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+            return None
+        return entry.admins
+
+    async def get(self, client: Client, group_id: int) -> Dict[int, Role]:
+        """Roster of a group, fetching it from Telegram on a miss."""
+        entry = self._entries.get(group_id)
+        if entry is not None and time.monotonic() - entry.loaded_at <= self.ttl:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(group_id)
+            return entry.admins
+
+        self.stats["misses"] += 1
+
+        # Single-flight: concurrent misses wait for the same call
+        future = self._inflight.get(group_id)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The loading task was cancelled, not this one: load again
+                return await self.get(client, group_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[group_id] = future
+        try:
+            admins = await self._load(client, group_id)
+            future.set_result(admins)
+            return admins
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so asyncio doesn't warn when nobody else awaited it
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(group_id) is future:
+                del self._inflight[group_id]
+            if not future.done():
+                # Cancelled mid-load: release the waiters instead of leaving them hanging
+                future.cancel()
+
+    async def _load(self, client: Client, group_id: int) -> Dict[int, Role]:
+        self.stats["loads"] += 1
+        loaded_at = time.monotonic()
+        admins: Dict[int, Role] = {}
+        try:
+            async for member in client.get_chat_members(group_id, filter=ChatMembersFilter.ADMINISTRATORS):
+                role = _ROLES.get(member.status)
+                if role is not None and member.user is not None:
+                    admins[member.user.id] = role
+        except RPCError as e:
+            # Nobody counts as admin until the retry; keeps failing groups off the API
+            self.stats["load_errors"] += 1
+            logger.warning(f"⚠️  Could not fetch admins of {group_id}: {e}")
+            admins = {}
+            loaded_at = loaded_at - self.ttl + _FAILED_RETRY_AFTER
+
+        self._entries[group_id] = _Roster(admins, loaded_at)
+        self._entries.move_to_end(group_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return admins
+
+    async def role_of(self, client: Client, group_id: int, user_id: int) -> Role:
+        """Telegram role of a user (MEMBER if not an admin)."""
+        return (await self.get(client, group_id)).get(user_id, Role.MEMBER)
+
+    # ==================== Updates ====================
+
+    def apply_update(self, update: ChatMemberUpdated) -> bool:
+        """
+        Apply a chat_member_updated event to a cached roster.
+
+        Returns:
+            True if the user's admin role changed
+        """
+        new = update.new_chat_member
+        user = (new.user if new else None) or (update.old_chat_member.user if update.old_chat_member else None)
+        admins = self.peek(update.chat.id)
+        if user is None or admins is None:
+            # Not cached: the next lazy load fetches the current list
+            return False
+
+        role = _ROLES.get(new.status) if new else None
+        if admins.get(user.id) == role:
+            return False
+
+        if role is None:
+            admins.pop(user.id, None)
+        else:
+            admins[user.id] = role
+        self.stats["updates"] += 1
+        return True
+
+    def forget(self, group_id: int):
+        """Drop a group's roster (bot removed, or to force a refetch)."""
+        self._entries.pop(group_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ==================== Global Roster Cache ====================
+admin_roster = AdminRosterCache(
+    max_size=settings.ADMIN_ROSTER_CACHE_MAX_SIZE,
+    ttl=settings.ADMIN_ROSTER_TTL
+)
+
+
+async def get_chat_role(client: Client, group_id: int, user_id: int) -> Role:
+    """Telegram role of a user in a group (SUDO for SUDO users)."""
+    if user_id in settings.SUDO_USERS:
+        return Role.SUDO
+    return await admin_roster.role_of(client, group_id, user_id)
+
+
+async def is_group_admin(client: Client, group_id: int, user_id: Optional[int]) -> bool:
+    """Admin, owner or SUDO user (local lookup once the roster is cached)."""
+    return user_id is not None and await get_chat_role(client, group_id, user_id) >= Role.ADMIN
+
+
+async def is_group_owner(client: Client, group_id: int, user_id: Optional[int]) -> bool:
+    """Owner or SUDO user (local lookup once the roster is cached)."""
+    return user_id is not None and await get_chat_role(client, group_id, user_id) >= Role.OWNER
+
+
+def is_anonymous_admin(message: Message) -> bool:
+    """Message sent by an anonymous admin (posting as the group itself)."""
+    return bool(message.sender_chat and message.chat and message.sender_chat.id == message.chat.id)
+
+
+def get_admin_roster_stats() -> Dict[str, Any]:
+    """Roster cache counters (hits, misses, API loads, ...)."""
+    return admin_roster.get_stats()
+
+
+__all__ = [
+    "AdminRosterCache",
+    "admin_roster",
+    "get_chat_role",
+    "is_group_admin",
+    "is_group_owner",
+    "is_anonymous_admin",
+    "get_admin_roster_stats",
+]
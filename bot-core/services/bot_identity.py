@@ -0,0 +1,80 @@
+"""
+Bot Identity Service
+Caches the bot's own Telegram identity (id, username, name).
+
+Filled once during startup from get_me() and refreshed only on explicit
+events, so hot paths (e.g. "was the bot added to this group?") are a local
+lookup instead of an API round trip.
+"""
+
+from pyrogram import Client
+from pyrogram.types import User
+from loguru import logger
+from typing import Optional
+
+
+_bot_id: Optional[int] = None
+_bot_username: Optional[str] = None
+_bot_name: Optional[str] = None
+
+
+def set_bot_identity(me: User):
+    """Store the bot identity (call with the result of get_me())."""
+    global _bot_id, _bot_username, _bot_name
+
+    _bot_id = me.id
+    _bot_username = (me.username or "").lower() or None
+    _bot_name = me.first_name
+
+
+async def refresh_bot_identity(client: Client) -> User:
+    """Fetch identity from Telegram (startup or explicit refresh only)."""
+    me = await client.get_me()
+    set_bot_identity(me)
+    logger.info(f"🤖 Bot identity cached: id={me.id} username=@{me.username}")
+    return me
+
+
+async def ensure_bot_identity(client: Client) -> int:
+    """
+    Get the bot id, filling the cache if an update arrives before startup
+    finished. Uses the client's own copy of get_me() when available.
+    """
+    if _bot_id is None:
+        if getattr(client, "me", None) is not None:
+            set_bot_identity(client.me)
+        else:
+            await refresh_bot_identity(client)
+    return _bot_id
+
+
+def get_bot_id() -> Optional[int]:
+    """Cached bot user id (None before startup)."""
+    return _bot_id
+
+
+def get_bot_username() -> Optional[str]:
+    """Cached bot username, lowercased, without @ (None before startup)."""
+    return _bot_username
+
+
+def get_bot_name() -> Optional[str]:
+    """Cached bot display name."""
+    return _bot_name
+
+
+def is_bot_self(user_id: int) -> bool:
+    """Check if a user id is the bot itself."""
+    return user_id == _bot_id
+
+
+# ==================== Export ====================
+__all__ = [
+    "set_bot_identity",
+    "refresh_bot_identity",
+    "ensure_bot_identity",
+    "get_bot_id",
+    "get_bot_username",
+    "get_bot_name",
+    "is_bot_self",
+]
@@ -1,5 +1,403 @@
 """
-group_service.py
+Group Service
+In-process cache of per-group configuration (activation gate, language,
+owner, admin permission template, group settings and per-module settings
+documents).
+
+Hot paths (joins, translated replies, module checks) read group config from
+here instead of querying MongoDB on every event. The cache is bounded (LRU)
+with a TTL, and is invalidated by:
+- MongoDB change streams on the groups/settings/admin_* collections
+- A polling fallback on `updated_at` for standalone mongod (no change streams)
+- Local writes (call invalidate_group() after writing a group/settings doc)
+
+A load still in flight when its group is invalidated is returned to its
+waiters but not cached, so it cannot overwrite the invalidation.
 """
 
-# TODO: Implement
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config.database import (
+    get_admin_defaults_collection,
+    get_database,
+    get_groups_collection,
+    get_settings_collection
+)
+from config.settings import settings
+from models.permission import DEFAULT_ADMIN_PERMISSIONS, compile_permissions
+
+
+# Collections whose changes invalidate cached group config
+# (admin_overrides changes also drop the group's cached permission grants)
+WATCHED_COLLECTIONS = ["groups", "settings", "admin_defaults", "admin_overrides"]
+
+# MongoDB error code: "$changeStream stage is only supported on replica sets"
+_CHANGE_STREAM_UNSUPPORTED = 40573
+
+# Monotonic version assigned to each loaded config (lets consumers detect reloads)
+_versions = itertools.count(1)
+
+
+class GroupConfig:
+    """Snapshot of a group's configuration as cached in memory."""
+
+    __slots__ = (
+        "group_id", "exists", "approved", "language", "owner_user_id",
+        "admin_permissions", "settings", "modules", "version", "loaded_at"
+    )
+
+    def __init__(
+        self,
+        group_id: int,
+        group_doc: Optional[Dict[str, Any]],
+        module_docs: List[Dict[str, Any]],
+        admin_defaults_doc: Optional[Dict[str, Any]] = None
+    ):
+        self.group_id = group_id
+        self.exists = group_doc is not None
+        self.approved = bool(group_doc.get("approved", False)) if group_doc else False
+        self.language = (group_doc or {}).get("language") or settings.DEFAULT_LANGUAGE
+        self.owner_user_id: Optional[int] = (group_doc or {}).get("owner_user_id")
+        # apanel template of admin permission bits (models.permission)
+        mask, value = compile_permissions((admin_defaults_doc or {}).get("default_bot_permissions"))
+        self.admin_permissions: int = (DEFAULT_ADMIN_PERMISSIONS & ~mask) | value
+        self.settings: Dict[str, Any] = (group_doc or {}).get("settings") or {}
+        self.modules: Dict[str, Dict[str, Any]] = {
+            doc["module_key"]: doc for doc in module_docs if "module_key" in doc
+        }
+        self.version = next(_versions)
+        self.loaded_at = time.monotonic()
+
+    def get_module(self, module_key: str) -> Dict[str, Any]:
+        """Get settings document of a module (empty dict if none)."""
+        return self.modules.get(module_key, {})
+
+
+class GroupConfigCache:
+    """
+    Bounded LRU + TTL cache of GroupConfig objects with hit/miss counters.
+    Concurrent misses for the same group share a single DB load.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, GroupConfig]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._listeners: List[Callable[[Optional[int]], None]] = []
+        # Bumped by invalidate()/clear(): a load that started before is not cached
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "stale_loads": 0,
+            "evictions": 0,
+            "expired": 0,
+            "invalidations": 0,
+        }
+
+    # ==================== Reads ====================
+
+    def peek(self, group_id: int) -> Optional[GroupConfig]:
+        """Return cached config without touching the DB (None if not cached/expired)."""
+        entry = self._entries.get(group_id)
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+            return None
+        return entry
+
+    async def get(self, group_id: int, refresh: bool = False) -> GroupConfig:
+        """Get group config, loading it from MongoDB on a miss."""
+        entry = self._entries.get(group_id)
+        if entry is not None and not refresh:
+            if time.monotonic() - entry.loaded_at <= self.ttl:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(group_id)
+                return entry
+            self.stats["expired"] += 1
+
+        self.stats["misses"] += 1
+
+        # Single-flight: concurrent misses wait for the same load
+        future = self._inflight.get(group_id)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The loading task was cancelled, not this one: load again
+                return await self.get(group_id, refresh)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[group_id] = future
+        generation = self._generation(group_id)
+        try:
+            entry = await self._load(group_id)
+            if self._generation(group_id) == generation:
+                self._store(entry)
+            else:
+                # Invalidated while loading: the document may predate the write
+                self.stats["stale_loads"] += 1
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so asyncio doesn't warn when nobody else awaited it
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(group_id) is future:
+                del self._inflight[group_id]
+            if not future.done():
+                # Cancelled mid-load: release the waiters instead of leaving them hanging
+                future.cancel()
+
+    def _generation(self, group_id: int) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(group_id, 0)
+
+    async def _load(self, group_id: int) -> GroupConfig:
+        """Load group doc, module settings docs and admin defaults concurrently."""
+        self.stats["loads"] += 1
+        group_doc, module_docs, admin_defaults_doc = await asyncio.gather(
+            get_groups_collection().find_one({"group_id": group_id}),
+            get_settings_collection().find({"group_id": group_id}).to_list(length=None),
+            get_admin_defaults_collection().find_one({"group_id": group_id})
+        )
+        return GroupConfig(group_id, group_doc, module_docs, admin_defaults_doc)
+
+    def _store(self, entry: GroupConfig):
+        self._entries[entry.group_id] = entry
+        self._entries.move_to_end(entry.group_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # ==================== Invalidation ====================
+
+    def add_listener(self, callback: Callable[[Optional[int]], None]):
+        """Register callback(group_id) fired on invalidation (None = everything)."""
+        self._listeners.append(callback)
+
+    def invalidate(self, group_id: int):
+        """Drop a group from the cache (loads in flight are not cached)."""
+        self._entries.pop(group_id, None)
+        self._generations[group_id] = self._generations.get(group_id, 0) + 1
+        # Later readers start a fresh load instead of joining the stale one
+        self._inflight.pop(group_id, None)
+        self.stats["invalidations"] += 1
+        self._notify(group_id)
+
+    def clear(self):
+        """Drop every cached group."""
+        self._entries.clear()
+        self._epoch += 1
+        self._generations.clear()
+        self._inflight.clear()
+        self.stats["invalidations"] += 1
+        self._notify(None)
+
+    def _notify(self, group_id: Optional[int]):
+        for callback in self._listeners:
+            try:
+                callback(group_id)
+            except Exception as e:
+                logger.error(f"Group cache listener failed: {e}")
+
+    def cached_group_ids(self) -> List[int]:
+        return list(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ==================== Change Watcher ====================
+
+class GroupCacheWatcher:
+    """
+    Invalidates cached groups when their documents change.
+    Uses change streams when available, otherwise polls `updated_at`.
+    """
+
+    def __init__(self, cache: GroupConfigCache, poll_interval: float):
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.mode: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        try:
+            await self._watch_change_streams()
+        except OperationFailure as e:
+            if e.code != _CHANGE_STREAM_UNSUPPORTED:
+                logger.error(f"Group cache change stream failed: {e}")
+            logger.warning("⚠️  Change streams unavailable, polling for group config changes")
+            await self._poll()
+
+    async def _watch_change_streams(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}}]
+        resume_token = None
+
+        while True:
+            try:
+                async with get_database().watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=resume_token
+                ) as stream:
+                    self.mode = "change_stream"
+                    logger.info("👀 Watching group config changes (change streams)")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._apply_change(change)
+            except OperationFailure:
+                if self.mode is None:
+                    raise
+                # Resume token may be gone (oplog rolled over) - start fresh
+                logger.warning("⚠️  Group cache change stream lost, restarting")
+                resume_token = None
+                self.cache.clear()
+            except PyMongoError as e:
+                logger.error(f"Group cache change stream error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def _apply_change(self, change: Dict[str, Any]):
+        group_id = (change.get("fullDocument") or {}).get("group_id")
+        if group_id is None:
+            # Deletes only carry _id; drop everything to stay correct
+            self.cache.clear()
+        else:
+            self.cache.invalidate(group_id)
+
+    async def _poll(self):
+        self.mode = "polling"
+        db = get_database()
+        since = datetime.now(timezone.utc)
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                started = datetime.now(timezone.utc)
+                for name in WATCHED_COLLECTIONS:
+                    cursor = db[name].find(
+                        {"updated_at": {"$gt": since}},
+                        {"group_id": 1, "_id": 0}
+                    )
+                    async for doc in cursor:
+                        if "group_id" in doc:
+                            self.cache.invalidate(doc["group_id"])
+                since = started
+            except PyMongoError as e:
+                logger.error(f"Group cache polling error: {e}")
+
+
+# ==================== Global Cache Instance ====================
+_cache = GroupConfigCache(
+    max_size=settings.GROUP_CACHE_MAX_SIZE,
+    ttl=settings.GROUP_CACHE_TTL
+)
+_watcher = GroupCacheWatcher(_cache, poll_interval=settings.GROUP_CACHE_POLL_INTERVAL)
+
+
+async def get_group_config(group_id: int, refresh: bool = False) -> GroupConfig:
+    """
+    Get cached configuration of a group.
+
+    Args:
+        group_id: Telegram group ID
+        refresh: Bypass the cache and reload from MongoDB
+
+    Returns:
+        GroupConfig (config.exists is False if the group has no document)
+    """
+    return await _cache.get(group_id, refresh=refresh)
+
+
+def peek_group_config(group_id: int) -> Optional[GroupConfig]:
+    """Get cached group config without any DB access (None on miss)."""
+    return _cache.peek(group_id)
+
+
+async def get_module_settings(group_id: int, module_key: str) -> Dict[str, Any]:
+    """Get the settings document of a module for a group (empty dict if none)."""
+    config = await _cache.get(group_id)
+    return config.get_module(module_key)
+
+
+async def update_module_settings(group_id: int, module_key: str, fields: Dict[str, Any]):
+    """Set fields of a module's settings document and invalidate the group."""
+    await get_settings_collection().update_one(
+        {"group_id": group_id, "module_key": module_key},
+        {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    invalidate_group(group_id)
+
+
+def invalidate_group(group_id: int):
+    """Invalidate a group after writing its groups/settings documents."""
+    _cache.invalidate(group_id)
+
+
+def add_invalidation_listener(callback: Callable[[Optional[int]], None]):
+    """Register callback(group_id) for cache invalidations (None = all groups)."""
+    _cache.add_listener(callback)
+
+
+def get_group_cache_stats() -> Dict[str, Any]:
+    """Cache counters (hits, misses, evictions, ...) and watcher mode."""
+    return {**_cache.get_stats(), "watcher": _watcher.mode}
+
+
+def start_group_cache_watcher():
+    """Start invalidation watcher (call after init_database())."""
+    _watcher.start()
+
+
+async def stop_group_cache_watcher():
+    """Stop invalidation watcher."""
+    await _watcher.stop()
+
+
+# ==================== Export ====================
+__all__ = [
+    "GroupConfig",
+    "GroupConfigCache",
+    "get_group_config",
+    "peek_group_config",
+    "get_module_settings",
+    "update_module_settings",
+    "invalidate_group",
+    "add_invalidation_listener",
+    "get_group_cache_stats",
+    "start_group_cache_watcher",
+    "stop_group_cache_watcher",
+]
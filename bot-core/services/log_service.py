@@ -0,0 +1,317 @@
+"""
+Log Service
+Buffered writer and reader for the bucketed event log (`logs_buckets`).
+
+Events are buffered in memory and flushed with bulk_write(ordered=False):
+one upsert per (group, type, LOG_BUCKET_MINUTES bucket) pushes all of its
+buffered events at once (layout: database-migrations/log_buckets.py).
+
+A flush runs when LOG_WRITER_BATCH_SIZE events are buffered or every
+LOG_WRITER_FLUSH_INTERVAL seconds; at LOG_WRITER_MAX_PENDING producers wait
+for a flush (backpressure). A flush that fails with a transient error is
+retried with the next one (at-least-once). Call stop_log_writer() on
+shutdown to flush what is left.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from config.database import get_logs_buckets_collection
+from config.settings import settings
+from log_buckets import bucket_start, bucket_updates, expand_event
+
+
+LogEvent = Tuple[int, str, datetime, Optional[int], Optional[int], Optional[Dict[str, Any]]]
+
+
+class LogWriter:
+    """Buffers log events and writes them into time buckets."""
+
+    def __init__(
+        self,
+        bucket_minutes: int,
+        max_bucket_events: int,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int
+    ):
+        self.bucket_minutes = bucket_minutes
+        self.max_bucket_events = max_bucket_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._events: List[LogEvent] = []
+
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "events": 0,
+            "flushes": 0,
+            "events_written": 0,
+            "bucket_ops": 0,
+            "flush_errors": 0,
+            "backpressure_waits": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._events)
+
+    # ==================== Producers ====================
+
+    async def log(
+        self,
+        group_id: int,
+        event_type: str,
+        actor_id: Optional[int] = None,
+        target_id: Optional[int] = None,
+        data: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None
+    ):
+        """Queue a log event."""
+        self._events.append((
+            group_id,
+            event_type,
+            timestamp or datetime.now(timezone.utc),
+            actor_id,
+            target_id,
+            data,
+        ))
+        self.stats["events"] += 1
+
+        pending = len(self._events)
+        if pending >= self.max_pending:
+            # Backpressure: producer waits for the buffer to be written
+            self.stats["backpressure_waits"] += 1
+            await self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    # ==================== Flushing ====================
+
+    async def flush(self):
+        """Write all buffered events."""
+        async with self._flush_lock:
+            if not self._events:
+                return
+
+            events, self._events = self._events, []
+            operations = bucket_updates(events, self.bucket_minutes, self.max_bucket_events)
+
+            started = time.perf_counter()
+            try:
+                await get_logs_buckets_collection().bulk_write(operations, ordered=False)
+                self.stats["events_written"] += len(events)
+            except BulkWriteError as e:
+                # Unordered: the other buckets were still written
+                errors = e.details.get("writeErrors", [])
+                self.stats["flush_errors"] += 1
+                logger.error(f"Log bulk write had {len(errors)} errors: {errors[:3]}")
+            except PyMongoError as e:
+                # Transient failure: retry these events with the next flush
+                self.stats["flush_errors"] += 1
+                logger.error(f"Log flush failed, requeueing {len(events)} events: {e}")
+                self._events[:0] = events
+                return
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["flushes"] += 1
+            self.stats["bucket_ops"] += len(operations)
+            self.stats["last_flush_ms"] = round(elapsed_ms, 2)
+            self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed_ms), 2)
+            self.stats["total_flush_ms"] += elapsed_ms
+
+            logger.debug(f"📝 Flushed {len(events)} log events into {len(operations)} buckets in {elapsed_ms:.1f} ms")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Log writer error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop background flushing and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        flushes = self.stats["flushes"]
+        return {
+            **self.stats,
+            "pending": self.pending,
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 2) if flushes else 0.0,
+        }
+
+
+# ==================== Reader ====================
+
+def _bucket_query(
+    group_id: int,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    types: Optional[Sequence[str]]
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"group_id": group_id}
+    if types:
+        query["type"] = types[0] if len(types) == 1 else {"$in": list(types)}
+
+    bucket_range = {}
+    if since is not None:
+        bucket_range["$gte"] = bucket_start(since, settings.LOG_BUCKET_MINUTES)
+    if until is not None:
+        bucket_range["$lte"] = until
+    if bucket_range:
+        query["bucket_start"] = bucket_range
+    return query
+
+
+async def query_logs(
+    group_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    types: Optional[Sequence[str]] = None,
+    actor_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Read log entries of a group, newest first.
+
+    Buckets are read newest first and expanded until `limit` matching events
+    are found, so the cost is proportional to the buckets in the range, not to
+    the number of events in the collection.
+
+    Returns:
+        Entries: {group_id, type, timestamp, actor_id, target_id, data}
+    """
+    cursor = get_logs_buckets_collection().find(
+        _bucket_query(group_id, since, until, types)
+    ).sort([("bucket_start", DESCENDING), ("_id", DESCENDING)])
+
+    entries: List[Dict[str, Any]] = []
+    pending_bucket_start = None
+    batch: List[Dict[str, Any]] = []
+
+    def drain():
+        # Buckets of different types share a start time: merge them before emitting
+        batch.sort(key=lambda entry: entry["timestamp"], reverse=True)
+        entries.extend(batch[:limit - len(entries)])
+        batch.clear()
+
+    async for bucket in cursor:
+        if pending_bucket_start is not None and bucket["bucket_start"] != pending_bucket_start:
+            drain()
+            if len(entries) >= limit:
+                break
+        pending_bucket_start = bucket["bucket_start"]
+
+        for event in bucket.get("events", ()):
+            if actor_id is not None and event.get("a") != actor_id:
+                continue
+            if target_id is not None and event.get("t") != target_id:
+                continue
+            entry = expand_event(bucket, event)
+            if since is not None and entry["timestamp"] < since:
+                continue
+            if until is not None and entry["timestamp"] > until:
+                continue
+            batch.append(entry)
+    else:
+        drain()
+
+    return entries[:limit]
+
+
+async def count_logs(
+    group_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    types: Optional[Sequence[str]] = None
+) -> Dict[str, int]:
+    """Event counts per type (bucket granularity: whole buckets overlapping the range)."""
+    pipeline = [
+        {"$match": _bucket_query(group_id, since, until, types)},
+        {"$group": {"_id": "$type", "count": {"$sum": "$count"}}},
+    ]
+    counts = {}
+    async for row in get_logs_buckets_collection().aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+
+# ==================== Global Writer Instance ====================
+log_writer = LogWriter(
+    bucket_minutes=settings.LOG_BUCKET_MINUTES,
+    max_bucket_events=settings.LOG_BUCKET_MAX_EVENTS,
+    batch_size=settings.LOG_WRITER_BATCH_SIZE,
+    flush_interval=settings.LOG_WRITER_FLUSH_INTERVAL,
+    max_pending=settings.LOG_WRITER_MAX_PENDING
+)
+
+
+async def log_event(
+    group_id: int,
+    event_type: str,
+    actor_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    data: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[datetime] = None
+):
+    """Queue a log event (written in buckets by log_writer)."""
+    await log_writer.log(group_id, event_type, actor_id, target_id, data, timestamp)
+
+
+def start_log_writer():
+    """Start background flushing (call after init_database())."""
+    log_writer.start()
+
+
+async def stop_log_writer():
+    """Flush pending log events (call before close_database())."""
+    await log_writer.stop()
+
+
+def get_log_writer_stats() -> Dict[str, Any]:
+    """Flush timings, buffered events and bucket operations."""
+    return log_writer.get_stats()
+
+
+# ==================== Export ====================
+__all__ = [
+    "LogWriter",
+    "log_writer",
+    "log_event",
+    "query_logs",
+    "count_logs",
+    "start_log_writer",
+    "stop_log_writer",
+    "get_log_writer_stats",
+]
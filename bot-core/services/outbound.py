@@ -0,0 +1,474 @@
+"""
+Outbound Scheduler
+Paced, prioritized queue for outgoing Telegram API calls.
+
+Handlers submit calls instead of awaiting them inline, so a FloodWait
+pauses one chat's queue instead of the handler (and the message is retried
+instead of lost). Calls are queued per chat in three priority lanes:
+
+    MODERATION  bans, restrictions, deletions, leaving unauthorized groups
+    REPLY       command replies
+    INFO        welcomes, notices, alerts
+
+Limits follow Telegram's bot limits:
+- global: OUTBOUND_GLOBAL_PER_SECOND calls per second across all chats
+- per chat: OUTBOUND_CHAT_PER_MINUTE messages (burst OUTBOUND_CHAT_BURST);
+  moderation calls are only paced globally
+- FloodWait: the chat is paused for the requested time and the call is
+  retried (up to OUTBOUND_MAX_RETRIES times)
+
+Calls run one at a time per chat (in lane order, FIFO within a lane) and up
+to OUTBOUND_MAX_CONCURRENCY chats at once. A call submitted with a `key`
+replaces a queued call with the same key in that chat (e.g. several
+welcome messages in a burst become the latest one).
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+from loguru import logger
+
+from config.settings import settings
+
+
+class Priority(IntEnum):
+    MODERATION = 0
+    REPLY = 1
+    INFO = 2
+
+
+_LANES = len(Priority)
+
+# Chat slot states (lanes 0.._LANES-1 mean "ready in that lane")
+_IDLE = -1
+_WAITING = -2
+
+# Recent queue waits kept for the wait-time metrics
+_WAIT_SAMPLES = 1024
+
+# Seconds between sweeps of idle chat state
+_SWEEP_INTERVAL = 60.0
+
+
+class _Job:
+    __slots__ = ("call", "priority", "key", "label", "future", "enqueued_at", "attempts")
+
+    def __init__(self, call, priority: Priority, key: Optional[Hashable], label: str, future: asyncio.Future):
+        self.call = call
+        self.priority = priority
+        self.key = key
+        self.label = label
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+class _Chat:
+    __slots__ = ("chat_id", "lanes", "keys", "tokens", "refilled_at", "ready_at", "busy", "slot", "ticket")
+
+    def __init__(self, chat_id: int, burst: float, now: float):
+        self.chat_id = chat_id
+        self.lanes: Tuple[Deque[_Job], ...] = tuple(deque() for _ in range(_LANES))
+        self.keys: Dict[Hashable, _Job] = {}
+        self.tokens = burst
+        self.refilled_at = now
+        self.ready_at = 0.0
+        self.busy = False
+        self.slot = _IDLE
+        self.ticket = 0
+
+    def head_lane(self) -> Optional[int]:
+        for lane, jobs in enumerate(self.lanes):
+            if jobs:
+                return lane
+        return None
+
+
+class OutboundScheduler:
+    """Per-chat priority queues drained under global and per-chat limits."""
+
+    def __init__(
+        self,
+        global_per_second: float,
+        chat_per_minute: float,
+        chat_burst: int,
+        max_concurrency: int,
+        max_retries: int,
+        max_pending: int
+    ):
+        self.global_rate = global_per_second
+        self.chat_rate = chat_per_minute / 60.0
+        self.chat_burst = float(chat_burst)
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+
+        self._chats: Dict[int, _Chat] = {}
+        self._ready: Tuple[Deque[Tuple[int, int]], ...] = tuple(deque() for _ in range(_LANES))
+        self._waiting: List[Tuple[float, int, int]] = []
+        self._tickets = itertools.count(1)
+        self._global_tokens = float(global_per_second)
+        self._global_at = time.monotonic()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._next_sweep = 0.0
+
+        self._pending = 0
+        self._queued = [0] * _LANES
+        self._in_flight = 0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.stats = {
+            "submitted": 0,
+            "sent": 0,
+            "failed": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "retried": 0,
+            "flood_waits": 0,
+        }
+
+    # ==================== Submission ====================
+
+    def submit(
+        self,
+        chat_id: int,
+        call: Callable[[], Awaitable[Any]],
+        priority: Priority = Priority.REPLY,
+        key: Optional[Hashable] = None,
+        label: str = "call"
+    ) -> asyncio.Future:
+        """
+        Queue an API call for a chat.
+
+        Args:
+            chat_id: Chat the call targets (its queue and limits)
+            call: Zero-argument coroutine factory, e.g. lambda: message.reply(text)
+            priority: Lane of the call
+            key: Coalescing key; replaces a queued call with the same key
+            label: Name used in logs
+
+        Returns:
+            Future with the call's result. Failures are logged here, so the
+            future may be ignored (fire and forget).
+        """
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _Chat(chat_id, self.chat_burst, now)
+
+        if key is not None:
+            queued = chat.keys.get(key)
+            if queued is not None:
+                queued.call = call
+                self.stats["coalesced"] += 1
+                return queued.future
+
+        future = loop.create_future()
+        if self._pending >= self.max_pending and priority == Priority.INFO:
+            # Informational calls are shed first when the queue is full
+            self.stats["dropped"] += 1
+            future.set_result(None)
+            return future
+
+        job = _Job(call, priority, key, label, future)
+        self._enqueue(chat, job)
+        self.stats["submitted"] += 1
+
+        if chat.slot >= 0 and priority < chat.slot:
+            # Already ready in a lower lane: move it up (old entry goes stale)
+            self._make_ready(chat, priority)
+        elif chat.slot == _WAITING and priority == Priority.MODERATION and chat.ready_at <= now:
+            # Only waiting for a message token, which moderation does not need
+            self._make_ready(chat, priority)
+        else:
+            self._schedule(chat, now)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return future
+
+    def _enqueue(self, chat: _Chat, job: _Job, front: bool = False):
+        lane = chat.lanes[job.priority]
+        if front:
+            lane.appendleft(job)
+        else:
+            lane.append(job)
+        if job.key is not None:
+            chat.keys[job.key] = job
+        self._pending += 1
+        self._queued[job.priority] += 1
+
+    def _dequeue(self, chat: _Chat, lane: int) -> _Job:
+        job = chat.lanes[lane].popleft()
+        if job.key is not None and chat.keys.get(job.key) is job:
+            del chat.keys[job.key]
+        self._pending -= 1
+        self._queued[lane] -= 1
+        return job
+
+    # ==================== Scheduling ====================
+
+    def _schedule(self, chat: _Chat, now: float):
+        """Put an idle chat with queued calls in a ready lane or the waiting heap."""
+        if chat.busy or chat.slot != _IDLE:
+            return
+        lane = chat.head_lane()
+        if lane is None:
+            return
+
+        ready_at = chat.ready_at
+        if lane != Priority.MODERATION:
+            ready_at = max(ready_at, self._chat_token_at(chat, now))
+
+        if ready_at > now:
+            chat.slot = _WAITING
+            chat.ticket = next(self._tickets)
+            heapq.heappush(self._waiting, (ready_at, chat.ticket, chat.chat_id))
+        else:
+            self._make_ready(chat, lane)
+        self._wake.set()
+
+    def _make_ready(self, chat: _Chat, lane: int):
+        chat.slot = lane
+        chat.ticket = next(self._tickets)
+        self._ready[lane].append((chat.ticket, chat.chat_id))
+        self._wake.set()
+
+    def _chat_token_at(self, chat: _Chat, now: float) -> float:
+        """When the chat's message bucket has a token."""
+        tokens = min(self.chat_burst, chat.tokens + (now - chat.refilled_at) * self.chat_rate)
+        return now if tokens >= 1.0 else now + (1.0 - tokens) / self.chat_rate
+
+    def _take_chat_token(self, chat: _Chat, now: float):
+        chat.tokens = min(self.chat_burst, chat.tokens + (now - chat.refilled_at) * self.chat_rate) - 1.0
+        chat.refilled_at = now
+
+    def _take_global_token(self, now: float) -> float:
+        """Reserve a global token; returns the seconds to wait for it."""
+        self._global_tokens = min(self.global_rate, self._global_tokens + (now - self._global_at) * self.global_rate)
+        self._global_at = now
+        self._global_tokens -= 1.0
+        return 0.0 if self._global_tokens >= 0.0 else -self._global_tokens / self.global_rate
+
+    def _promote(self, now: float):
+        """Move chats whose wait is over from the waiting heap to their lane."""
+        while self._waiting and self._waiting[0][0] <= now:
+            _, ticket, chat_id = heapq.heappop(self._waiting)
+            chat = self._chats.get(chat_id)
+            if chat is None or chat.ticket != ticket or chat.slot != _WAITING:
+                continue
+            chat.slot = _IDLE
+            self._schedule(chat, now)
+
+    def _next_ready(self) -> Optional[Tuple[_Chat, int]]:
+        for lane, entries in enumerate(self._ready):
+            while entries:
+                ticket, chat_id = entries.popleft()
+                chat = self._chats.get(chat_id)
+                if chat is not None and chat.ticket == ticket and chat.slot == lane:
+                    chat.slot = _IDLE
+                    return chat, lane
+        return None
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            self._promote(now)
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            picked = self._next_ready()
+            if picked is None:
+                timeout = self._waiting[0][0] - now if self._waiting else None
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            chat, lane = picked
+            chat.busy = True
+            await self._slots.acquire()
+            delay = self._take_global_token(time.monotonic())
+            if delay:
+                await asyncio.sleep(delay)
+
+            job = self._dequeue(chat, lane)
+            if lane != Priority.MODERATION:
+                self._take_chat_token(chat, time.monotonic())
+            self._in_flight += 1
+            asyncio.create_task(self._execute(chat, job))
+
+    async def _execute(self, chat: _Chat, job: _Job):
+        started = time.monotonic()
+        self._waits.append(started - job.enqueued_at)
+        try:
+            result = await job.call()
+        except FloodWait as e:
+            self.stats["flood_waits"] += 1
+            chat.ready_at = time.monotonic() + float(e.value)
+            logger.warning(f"📤 FloodWait {e.value}s in {chat.chat_id} ({job.label}), pausing chat")
+            self._retry(chat, job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self.stats["sent"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            chat.busy = False
+            self._slots.release()
+            self._schedule(chat, time.monotonic())
+
+    def _retry(self, chat: _Chat, job: _Job, error: Exception):
+        if job.key is not None and job.key in chat.keys:
+            # A newer call with the same key is queued and supersedes this one
+            self.stats["coalesced"] += 1
+            job.future.set_result(None)
+            return
+        if job.attempts >= self.max_retries:
+            self._fail(job, error)
+            return
+        job.attempts += 1
+        self.stats["retried"] += 1
+        self._enqueue(chat, job, front=True)
+
+    def _fail(self, job: _Job, error: Exception):
+        self.stats["failed"] += 1
+        logger.error(f"📤 Outbound {job.label} failed: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+            # Mark retrieved so asyncio doesn't warn for fire-and-forget calls
+            job.future.exception()
+
+    def _sweep(self, now: float):
+        """Drop state of idle chats whose message bucket is full again."""
+        self._next_sweep = now + _SWEEP_INTERVAL
+        refill = self.chat_burst / self.chat_rate
+        idle = [
+            chat_id for chat_id, chat in self._chats.items()
+            if not chat.busy and chat.slot == _IDLE and chat.head_lane() is None
+            and chat.ready_at <= now and now - chat.refilled_at >= refill
+        ]
+        for chat_id in idle:
+            del self._chats[chat_id]
+
+    # ==================== Lifecycle / Metrics ====================
+
+    async def stop(self, timeout: float = 5.0):
+        """Give queued calls `timeout` seconds to go out, then cancel the rest."""
+        if self._task is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        for chat in self._chats.values():
+            for lane in range(_LANES):
+                while chat.lanes[lane]:
+                    self._dequeue(chat, lane).future.cancel()
+        self._chats.clear()
+        self._waiting.clear()
+        for entries in self._ready:
+            entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            **self.stats,
+            "pending": self._pending,
+            "queued": {lane.name.lower(): self._queued[lane] for lane in Priority},
+            "in_flight": self._in_flight,
+            "chats": len(self._chats),
+            "paused_chats": len(self._waiting),
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            },
+        }
+
+
+# ==================== Global Scheduler ====================
+outbound = OutboundScheduler(
+    global_per_second=settings.OUTBOUND_GLOBAL_PER_SECOND,
+    chat_per_minute=settings.OUTBOUND_CHAT_PER_MINUTE,
+    chat_burst=settings.OUTBOUND_CHAT_BURST,
+    max_concurrency=settings.OUTBOUND_MAX_CONCURRENCY,
+    max_retries=settings.OUTBOUND_MAX_RETRIES,
+    max_pending=settings.OUTBOUND_MAX_PENDING
+)
+
+
+def submit(
+    chat_id: int,
+    call: Callable[[], Awaitable[Any]],
+    priority: Priority = Priority.REPLY,
+    key: Optional[Hashable] = None,
+    label: str = "call"
+) -> asyncio.Future:
+    """Queue an API call for a chat (see OutboundScheduler.submit)."""
+    return outbound.submit(chat_id, call, priority, key, label)
+
+
+def send_message(
+    client: Client,
+    chat_id: int,
+    text: str,
+    priority: Priority = Priority.REPLY,
+    key: Optional[Hashable] = None,
+    **kwargs
+) -> asyncio.Future:
+    """Queue client.send_message."""
+    return outbound.submit(chat_id, lambda: client.send_message(chat_id, text, **kwargs), priority, key, "send_message")
+
+
+def reply(
+    message: Message,
+    text: str,
+    priority: Priority = Priority.REPLY,
+    key: Optional[Hashable] = None,
+    **kwargs
+) -> asyncio.Future:
+    """Queue message.reply."""
+    return outbound.submit(message.chat.id, lambda: message.reply(text, **kwargs), priority, key, "reply")
+
+
+async def stop_outbound():
+    """Flush queued calls (bounded wait) and stop the scheduler."""
+    await outbound.stop()
+
+
+def get_outbound_stats() -> Dict[str, Any]:
+    """Queue depths per lane, wait times, FloodWaits, ..."""
+    return outbound.get_stats()
+
+
+__all__ = [
+    "Priority",
+    "OutboundScheduler",
+    "outbound",
+    "submit",
+    "send_message",
+    "reply",
+    "stop_outbound",
+    "get_outbound_stats",
+]
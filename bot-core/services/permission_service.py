@@ -1,5 +1,299 @@
 """
-permission_service.py
+Permission Service
+Compiled per-(group, user) permission grants with a bounded cache.
+
+A grant is the user's role plus an int bitset of bot permissions
+(models.permission). The role is the higher of the stored one
+(group_users.role / is_vip) and the Telegram one from the admin roster
+(services/admin_roster.py). For admins the bits are the group's apanel
+template (`admin_defaults`, compiled once per GroupConfig) with the user's
+upanel overrides (`admin_overrides`) applied:
+bits = (template & ~mask) | value.
+
+The cache keeps the user-specific parts (role, override mask/value) and the
+grant compiled from them. A grant remembers the GroupConfig version and
+Telegram role it was built from, so an apanel change or a promotion only
+recompiles grants lazily (two bitwise ops) instead of reloading them.
+Checks on a hit are O(1) and never touch MongoDB. Entries are dropped when:
+- the group is invalidated (change streams or polling on admin_defaults,
+  admin_overrides and groups, i.e. apanel/upanel edits from any writer)
+- they expire (PERMISSION_CACHE_TTL) or are evicted (LRU)
+
+Commands and callback prefixes declare what they need in their manifest
+("permissions": {"clean_execute": "admin", "rantibetra": "owner"}); the
+AuthMiddleware looks the requirement up and checks it before any handler
+runs.
 """
 
-# TODO: Implement
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config.database import get_admin_overrides_collection, get_group_users_collection
+from config.settings import settings
+from models.permission import (
+    ALL_PERMISSIONS,
+    Grant,
+    Requirement,
+    Role,
+    compile_permissions,
+    parse_requirement
+)
+from services.group_service import GroupConfig, add_invalidation_listener
+
+
+SUDO_GRANT = Grant(Role.SUDO, ALL_PERMISSIONS)
+OWNER_GRANT = Grant(Role.OWNER, ALL_PERMISSIONS)
+
+_ROLES = {"member": Role.MEMBER, "admin": Role.ADMIN, "owner": Role.OWNER}
+
+
+class _Entry:
+    __slots__ = ("role", "mask", "value", "grant", "version", "loaded_at")
+
+    def __init__(self, role: Role, mask: int, value: int):
+        self.role = role
+        self.mask = mask
+        self.value = value
+        self.grant: Optional[Grant] = None
+        self.version: Tuple[int, Role] = (0, Role.MEMBER)
+        self.loaded_at = time.monotonic()
+
+
+class PermissionResolver:
+    """
+    Bounded LRU + TTL cache of compiled grants per (group, user).
+    Concurrent misses for the same key share a single DB load.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[int, int], _Entry]" = OrderedDict()
+        self._by_group: Dict[int, set] = {}
+        self._inflight: Dict[Tuple[int, int], asyncio.Future] = {}
+        # Bumped by invalidate(): a load that started before is not cached
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "stale_loads": 0,
+            "compiles": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    # ==================== Reads ====================
+
+    def lookup(self, config: GroupConfig, user_id: int, chat_role: Role = Role.MEMBER) -> Optional[Grant]:
+        """Cached grant without any DB access (None on miss)."""
+        if chat_role == Role.SUDO or user_id in settings.SUDO_USERS:
+            return SUDO_GRANT
+        if chat_role == Role.OWNER or user_id == config.owner_user_id:
+            return OWNER_GRANT
+
+        key = (config.group_id, user_id)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+            return None
+
+        self.stats["hits"] += 1
+        self._entries.move_to_end(key)
+        return self._grant(config, entry, chat_role)
+
+    async def get(self, config: GroupConfig, user_id: int, chat_role: Role = Role.MEMBER) -> Grant:
+        """
+        Grant of a user in a group, loading it from MongoDB on a miss.
+
+        Args:
+            config: Cached config of the group
+            user_id: Telegram user ID
+            chat_role: Telegram role from the admin roster
+        """
+        grant = self.lookup(config, user_id, chat_role)
+        if grant is not None:
+            return grant
+
+        self.stats["misses"] += 1
+        key = (config.group_id, user_id)
+
+        # Single-flight: concurrent misses wait for the same load
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            generation = self._generation(config.group_id)
+            try:
+                entry = await self._load(config.group_id, user_id)
+                if self._generation(config.group_id) == generation:
+                    self._store(key, entry)
+                else:
+                    # Invalidated while loading: the documents may predate the write
+                    self.stats["stale_loads"] += 1
+                future.set_result(entry)
+            except Exception as e:
+                future.set_exception(e)
+                # Mark retrieved so asyncio doesn't warn when nobody else awaited it
+                future.exception()
+                raise
+            finally:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+                if not future.done():
+                    # Cancelled mid-load: release the waiters instead of leaving them hanging
+                    future.cancel()
+        else:
+            try:
+                entry = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The loading task was cancelled, not this one: load again
+                return await self.get(config, user_id, chat_role)
+
+        return self._grant(config, entry, chat_role)
+
+    def _grant(self, config: GroupConfig, entry: _Entry, chat_role: Role) -> Grant:
+        version = (config.version, chat_role)
+        if entry.version != version:
+            entry.grant = self._compile(config, entry, chat_role)
+            entry.version = version
+        return entry.grant
+
+    def _compile(self, config: GroupConfig, entry: _Entry, chat_role: Role) -> Grant:
+        self.stats["compiles"] += 1
+        role = max(entry.role, chat_role)
+        if role == Role.OWNER:
+            return OWNER_GRANT
+        if role == Role.ADMIN:
+            return Grant(Role.ADMIN, (config.admin_permissions & ~entry.mask) | entry.value)
+        return Grant(role, 0)
+
+    async def _load(self, group_id: int, user_id: int) -> _Entry:
+        """Load the member document and upanel overrides concurrently."""
+        self.stats["loads"] += 1
+        member, override = await asyncio.gather(
+            get_group_users_collection().find_one(
+                {"group_id": group_id, "user_id": user_id},
+                {"role": 1, "is_vip": 1, "_id": 0}
+            ),
+            get_admin_overrides_collection().find_one(
+                {"group_id": group_id, "admin_user_id": user_id},
+                {"bot_permissions": 1, "_id": 0}
+            )
+        )
+        member = member or {}
+        role = _ROLES.get(member.get("role"), Role.MEMBER)
+        if role == Role.MEMBER and member.get("is_vip"):
+            role = Role.VIP
+        mask, value = compile_permissions((override or {}).get("bot_permissions"))
+        return _Entry(role, mask, value)
+
+    def _generation(self, group_id: int) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(group_id, 0)
+
+    def _store(self, key: Tuple[int, int], entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._by_group.setdefault(key[0], set()).add(key[1])
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Tuple[int, int]):
+        self._entries.pop(key, None)
+        users = self._by_group.get(key[0])
+        if users is not None:
+            users.discard(key[1])
+            if not users:
+                del self._by_group[key[0]]
+
+    # ==================== Invalidation ====================
+
+    def invalidate(self, group_id: Optional[int], user_id: Optional[int] = None):
+        """
+        Drop one user's grant, a whole group (user_id None) or everything
+        (group_id None). Loads in flight for the group are not cached.
+        """
+        self.stats["invalidations"] += 1
+        if group_id is None:
+            self._entries.clear()
+            self._by_group.clear()
+            self._epoch += 1
+            self._generations.clear()
+            self._inflight.clear()
+            return
+
+        self._generations[group_id] = self._generations.get(group_id, 0) + 1
+        if user_id is not None:
+            self._remove((group_id, user_id))
+            self._inflight.pop((group_id, user_id), None)
+        else:
+            for cached_user in list(self._by_group.get(group_id, ())):
+                self._remove((group_id, cached_user))
+            # Later readers start a fresh load instead of joining a stale one
+            for key in [key for key in self._inflight if key[0] == group_id]:
+                del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ==================== Global Resolver ====================
+permission_resolver = PermissionResolver(
+    max_size=settings.PERMISSION_CACHE_MAX_SIZE,
+    ttl=settings.PERMISSION_CACHE_TTL
+)
+
+# Group invalidations (local writes, change streams, polling) drop its grants
+add_invalidation_listener(permission_resolver.invalidate)
+
+# Command key / callback prefix -> requirement (from module manifests)
+_requirements: Dict[str, Requirement] = {}
+
+
+def register_requirements(permissions: Dict[str, str]):
+    """
+    Register what commands and callback prefixes need.
+
+    Raises:
+        ValueError: Unknown role or permission name
+    """
+    for key, name in permissions.items():
+        _requirements[key.lower()] = parse_requirement(name)
+
+
+def get_requirement(key: str) -> Optional[Requirement]:
+    """Requirement of a command key or callback prefix (None = unrestricted)."""
+    return _requirements.get(key)
+
+
+def invalidate_permissions(group_id: int, user_id: Optional[int] = None):
+    """Drop cached grants after a role change (user_id None = whole group)."""
+    permission_resolver.invalidate(group_id, user_id)
+
+
+def get_permission_cache_stats() -> Dict[str, Any]:
+    """Resolver counters (hits, misses, compiles, ...)."""
+    return {**permission_resolver.get_stats(), "requirements": len(_requirements)}
+
+
+__all__ = [
+    "PermissionResolver",
+    "permission_resolver",
+    "SUDO_GRANT",
+    "OWNER_GRANT",
+    "register_requirements",
+    "get_requirement",
+    "invalidate_permissions",
+    "get_permission_cache_stats",
+]
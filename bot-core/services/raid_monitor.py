@@ -0,0 +1,326 @@
+"""
+Raid Monitor
+Per-group join-rate tracking and raid mode.
+
+Join velocity is tracked with an exponentially decayed counter per group
+(O(1) memory and time per join). When the rate crosses RAID_ENTER_JOINS_PER_MIN
+the group enters raid mode; it leaves once the rate falls below
+RAID_EXIT_JOINS_PER_MIN and at least RAID_MIN_DURATION has passed
+(hysteresis, so the group does not flap around one threshold).
+
+While a group is in raid mode:
+- join_handler skips per-join DB work (join tracking writes, invite lookups)
+- new members are queued and restricted by one background worker
+  (groups with anti_raid enabled in the anti_spam module settings)
+- the module loader sheds non-essential module event handlers
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait, RPCError
+from pyrogram.types import ChatPermissions
+from loguru import logger
+
+from config.settings import settings
+from services.outbound import Priority, submit
+from services.stats_service import record_action
+
+
+class _JoinRate:
+    """Exponentially decayed join counter of one group."""
+
+    __slots__ = ("value", "updated", "raid_since")
+
+    def __init__(self, now: float):
+        self.value = 0.0
+        self.updated = now
+        self.raid_since: Optional[float] = None
+
+    def decayed(self, now: float, tau: float) -> float:
+        return self.value * math.exp(-(now - self.updated) / tau)
+
+    def add(self, count: int, now: float, tau: float):
+        self.value = self.decayed(now, tau) + count
+        self.updated = now
+
+
+class RaidMonitor:
+    """
+    Join-rate tracker with hysteresis.
+
+    With a decay constant tau, a steady arrival rate of r joins/second keeps
+    the counter at r * tau, so joins per minute = counter / tau * 60.
+    """
+
+    def __init__(
+        self,
+        enter_per_min: float,
+        exit_per_min: float,
+        min_duration: float,
+        tau: float = 20.0,
+        bulk_add_size: int = 10,
+        idle_ttl: float = 3600.0
+    ):
+        self.enter_per_min = enter_per_min
+        self.exit_per_min = exit_per_min
+        self.min_duration = min_duration
+        self.tau = tau
+        self.bulk_add_size = bulk_add_size
+        self.idle_ttl = idle_ttl
+        self._rates: Dict[int, _JoinRate] = {}
+        self._raiding: Set[int] = set()
+        self._listeners: List[Callable[[int, bool], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"joins": 0, "raids": 0, "bulk_adds": 0, "skipped_joins": 0}
+
+    # ==================== Tracking ====================
+
+    def rate_per_min(self, group_id: int, now: Optional[float] = None) -> float:
+        """Current decayed join rate of a group (joins per minute)."""
+        rate = self._rates.get(group_id)
+        if rate is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return rate.decayed(now, self.tau) / self.tau * 60
+
+    def record_joins(self, group_id: int, count: int = 1, now: Optional[float] = None) -> bool:
+        """
+        Record joins of a group.
+
+        Returns:
+            True if the group is in raid mode (after this update)
+        """
+        now = time.monotonic() if now is None else now
+        self._stats["joins"] += count
+
+        rate = self._rates.get(group_id)
+        if rate is None:
+            rate = self._rates[group_id] = _JoinRate(now)
+        rate.add(count, now, self.tau)
+
+        if count >= self.bulk_add_size:
+            # One user adding many accounts at once counts as a raid by itself
+            self._stats["bulk_adds"] += 1
+            if group_id not in self._raiding:
+                logger.warning(f"🚨 Bulk add of {count} members in group {group_id}")
+                self._enter(group_id, rate, now)
+            return True
+
+        if group_id not in self._raiding and rate.value / self.tau * 60 >= self.enter_per_min:
+            self._enter(group_id, rate, now)
+
+        return group_id in self._raiding
+
+    def in_raid(self, group_id: int, now: Optional[float] = None) -> bool:
+        """O(1) check used on hot paths; leaves raid mode lazily when the rate dropped."""
+        if group_id not in self._raiding:
+            return False
+        now = time.monotonic() if now is None else now
+        self._maybe_exit(group_id, now)
+        return group_id in self._raiding
+
+    def count_skipped(self, count: int = 1):
+        self._stats["skipped_joins"] += count
+
+    def _enter(self, group_id: int, rate: _JoinRate, now: float):
+        rate.raid_since = now
+        self._raiding.add(group_id)
+        self._stats["raids"] += 1
+        logger.warning(
+            f"🚨 Raid mode ON in group {group_id} "
+            f"({rate.value / self.tau * 60:.0f} joins/min)"
+        )
+        self._notify(group_id, True)
+
+    def _maybe_exit(self, group_id: int, now: float):
+        rate = self._rates.get(group_id)
+        if rate is not None:
+            if now - rate.raid_since < self.min_duration:
+                return
+            if rate.decayed(now, self.tau) / self.tau * 60 >= self.exit_per_min:
+                return
+            rate.raid_since = None
+
+        self._raiding.discard(group_id)
+        logger.info(f"✅ Raid mode OFF in group {group_id}")
+        self._notify(group_id, False)
+
+    # ==================== Listeners ====================
+
+    def add_listener(self, callback: Callable[[int, bool], Any]):
+        """Register callback(group_id, raid_on) for raid mode changes."""
+        self._listeners.append(callback)
+
+    def _notify(self, group_id: int, raid_on: bool):
+        for callback in self._listeners:
+            try:
+                result = callback(group_id, raid_on)
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                logger.error(f"Raid listener failed: {e}")
+
+    # ==================== Background ====================
+
+    def start(self, interval: float = 5.0):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float):
+        """Leave raid mode in quiet groups and drop idle counters."""
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+
+            for group_id in list(self._raiding):
+                self._maybe_exit(group_id, now)
+
+            idle = [
+                group_id for group_id, rate in self._rates.items()
+                if group_id not in self._raiding and now - rate.updated > self.idle_ttl
+            ]
+            for group_id in idle:
+                del self._rates[group_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "tracked_groups": len(self._rates), "raiding": sorted(self._raiding)}
+
+
+class RestrictionQueue:
+    """
+    Restricts members that joined during a raid from one worker task instead
+    of one API call per join handler: requests are queued, drained in order
+    and sent in the outbound scheduler's moderation lane (services/outbound.py),
+    which paces them and waits out FloodWaits.
+    """
+
+    def __init__(self, restrict_seconds: int, max_pending: int = 50_000):
+        self.restrict_seconds = restrict_seconds
+        self.max_pending = max_pending
+        self._queue: deque = deque()
+        self._queued: Set[tuple] = set()
+        self._event = asyncio.Event()
+        self._client: Optional[Client] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"restricted": 0, "failed": 0, "flood_waits": 0, "dropped": 0}
+
+    def enqueue(self, client: Client, group_id: int, user_ids: List[int]):
+        self._client = client
+        for user_id in user_ids:
+            key = (group_id, user_id)
+            if len(self._queue) >= self.max_pending:
+                self._stats["dropped"] += 1
+                continue
+            if key not in self._queued:
+                self._queued.add(key)
+                self._queue.append(key)
+        self._event.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            await self._drain()
+        finally:
+            # Let the next enqueue() start a fresh worker
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def _drain(self):
+        while True:
+            if not self._queue:
+                self._event.clear()
+                await self._event.wait()
+                continue
+
+            group_id, user_id = self._queue.popleft()
+            self._queued.discard((group_id, user_id))
+            try:
+                await submit(group_id, lambda: self._client.restrict_chat_member(
+                    group_id, user_id, ChatPermissions(),
+                    until_date=datetime.now(timezone.utc) + timedelta(seconds=self.restrict_seconds)
+                ), Priority.MODERATION, label="raid_restrict")
+                self._stats["restricted"] += 1
+                record_action(group_id, "mute")
+            except FloodWait:
+                # Still flooded after the scheduler's retries; it keeps the chat paused
+                self._stats["flood_waits"] += 1
+                self._queue.appendleft((group_id, user_id))
+                self._queued.add((group_id, user_id))
+            except RPCError as e:
+                self._stats["failed"] += 1
+                logger.debug(f"Could not restrict {user_id} in {group_id}: {e}")
+            except Exception as e:
+                # One bad request must not stop restrictions for every raid
+                self._stats["failed"] += 1
+                logger.error(f"Restriction of {user_id} in {group_id} failed: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": len(self._queue)}
+
+
+# ==================== Global Instances ====================
+raid_monitor = RaidMonitor(
+    enter_per_min=settings.RAID_ENTER_JOINS_PER_MIN,
+    exit_per_min=settings.RAID_EXIT_JOINS_PER_MIN,
+    min_duration=settings.RAID_MIN_DURATION,
+    bulk_add_size=settings.RAID_BULK_ADD_SIZE
+)
+restriction_queue = RestrictionQueue(restrict_seconds=settings.RAID_RESTRICT_SECONDS)
+
+
+def in_raid(group_id: int) -> bool:
+    """Check if a group is in raid mode."""
+    return raid_monitor.in_raid(group_id)
+
+
+def start_raid_monitor():
+    """Start the raid monitor background task."""
+    raid_monitor.start()
+
+
+async def stop_raid_monitor():
+    """Stop the raid monitor and the restriction worker."""
+    await raid_monitor.stop()
+    await restriction_queue.stop()
+
+
+def get_raid_stats() -> Dict[str, Any]:
+    return {**raid_monitor.get_stats(), "restrictions": restriction_queue.get_stats()}
+
+
+# ==================== Export ====================
+__all__ = [
+    "RaidMonitor",
+    "RestrictionQueue",
+    "raid_monitor",
+    "restriction_queue",
+    "in_raid",
+    "start_raid_monitor",
+    "stop_raid_monitor",
+    "get_raid_stats",
+]
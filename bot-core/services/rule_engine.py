@@ -0,0 +1,577 @@
+"""
+Rule Engine
+Per-group compiled moderation rules for the locks and anti_spam modules.
+
+Each group's enabled locks and filters are compiled into one RulePlan:
+- Content locks: a bitmask test against the message's content bits
+- Word and domain lists: one Aho-Corasick automaton, one pass over the text
+- Regex filters: one combined alternation
+- Link rules (antilink, telegram/shortener/external links): a host check on
+  URL entities only when the message has links
+
+Plans are cached per group and recompiled only when the group's locks or
+anti_spam settings documents change (GroupConfig reloads with identical
+documents reuse the existing plan).
+
+Settings documents (collection `settings`):
+    {"module_key": "locks", "enabled": true, "action": "delete",
+     "locks": {"photo": true, "url": true, ...}}
+
+    {"module_key": "anti_spam", "enabled": true, "filter_action": "delete",
+     "antilink": true, "antiforward": false, "anti_channel": false,
+     "blacklist_words": [...], "whitelist_words": [...],
+     "blacklist_domains": [...], "whitelist_domains": [...],
+     "regex_filters": [...], "case_sensitive_filters": false,
+     "whole_word_match": true, "url_shortener_block": false,
+     "telegram_link_block": false, "external_link_block": false,
+     "poll_block": false, "contact_block": false, ...}
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from pyrogram.enums import ChatType, MessageEntityType, MessageMediaType, PollType
+from pyrogram.types import Message
+from loguru import logger
+
+from config.settings import settings
+from services.group_service import GroupConfig
+from utils.aho_corasick import AhoCorasick
+
+
+# ==================== Content Bits ====================
+PHOTO = 1 << 0
+VIDEO = 1 << 1
+GIF = 1 << 2
+STICKER = 1 << 3
+VOICE = 1 << 4
+AUDIO = 1 << 5
+DOCUMENT = 1 << 6
+VIDEO_NOTE = 1 << 7
+POLL = 1 << 8
+QUIZ = 1 << 9
+LOCATION = 1 << 10
+VENUE = 1 << 11
+CONTACT = 1 << 12
+GAME = 1 << 13
+DICE = 1 << 14
+FORWARD = 1 << 15
+FORWARD_CHANNEL = 1 << 16
+CHANNEL_SENDER = 1 << 17
+INLINE = 1 << 18
+NEW_BOT = 1 << 19
+SERVICE = 1 << 20
+VIDEO_CHAT = 1 << 21
+URL = 1 << 22
+MENTION = 1 << 23
+HASHTAG = 1 << 24
+CASHTAG = 1 << 25
+EMAIL = 1 << 26
+PHONE = 1 << 27
+COMMAND = 1 << 28
+
+ALL_MEDIA = PHOTO | VIDEO | GIF | STICKER | VOICE | AUDIO | DOCUMENT | VIDEO_NOTE
+
+_MEDIA_BITS = {
+    MessageMediaType.PHOTO: PHOTO,
+    MessageMediaType.VIDEO: VIDEO,
+    MessageMediaType.ANIMATION: GIF,
+    MessageMediaType.STICKER: STICKER,
+    MessageMediaType.VOICE: VOICE,
+    MessageMediaType.AUDIO: AUDIO,
+    MessageMediaType.DOCUMENT: DOCUMENT,
+    MessageMediaType.VIDEO_NOTE: VIDEO_NOTE,
+    MessageMediaType.POLL: POLL,
+    MessageMediaType.LOCATION: LOCATION,
+    MessageMediaType.VENUE: VENUE,
+    MessageMediaType.CONTACT: CONTACT,
+    MessageMediaType.GAME: GAME,
+    MessageMediaType.DICE: DICE,
+}
+
+_ENTITY_BITS = {
+    MessageEntityType.URL: URL,
+    MessageEntityType.TEXT_LINK: URL,
+    MessageEntityType.MENTION: MENTION,
+    MessageEntityType.TEXT_MENTION: MENTION,
+    MessageEntityType.HASHTAG: HASHTAG,
+    MessageEntityType.CASHTAG: CASHTAG,
+    MessageEntityType.EMAIL: EMAIL,
+    MessageEntityType.PHONE_NUMBER: PHONE,
+    MessageEntityType.BOT_COMMAND: COMMAND,
+}
+
+# locks module: lock name -> content bits
+LOCK_BITS: Dict[str, int] = {
+    "photo": PHOTO,
+    "video": VIDEO,
+    "gif": GIF,
+    "animation": GIF,
+    "sticker": STICKER,
+    "voice": VOICE | VIDEO_NOTE,
+    "audio": AUDIO,
+    "document": DOCUMENT,
+    "poll": POLL | QUIZ,
+    "location": LOCATION | VENUE,
+    "contact": CONTACT,
+    "forward": FORWARD,
+    "bot": NEW_BOT,
+    "url": URL,
+    "mention": MENTION,
+    "hashtag": HASHTAG,
+    "cashtag": CASHTAG,
+    "email": EMAIL,
+    "phone": PHONE,
+    "command": COMMAND,
+    "inline": INLINE,
+    "game": GAME,
+    "dice": DICE,
+    "service": SERVICE,
+    "all_media": ALL_MEDIA,
+}
+
+# anti_spam module: toggle -> content bits
+FILTER_BITS: Dict[str, int] = {
+    "antiforward": FORWARD,
+    "anti_channel": FORWARD_CHANNEL | CHANNEL_SENDER,
+    "anti_bot": NEW_BOT,
+    "inline_bot_block": INLINE,
+    "voice_call_block": VIDEO_CHAT,
+    "contact_block": CONTACT,
+    "location_block": LOCATION,
+    "live_location_block": LOCATION,  # Pyrogram does not tell live locations apart
+    "game_block": GAME,
+    "dice_block": DICE,
+    "poll_block": POLL,
+    "quiz_block": QUIZ,
+    "venue_block": VENUE,
+}
+
+TELEGRAM_DOMAINS = frozenset({"t.me", "telegram.me", "telegram.dog", "telegram.org"})
+SHORTENER_DOMAINS = frozenset({
+    "bit.ly", "tinyurl.com", "goo.gl", "t.co", "ow.ly", "is.gd", "buff.ly",
+    "cutt.ly", "rebrand.ly", "shorturl.at", "tiny.cc", "rb.gy", "s.id",
+})
+
+DEFAULT_ACTION = "delete"
+
+# Characters that continue a word / a domain name (for boundary checks)
+_DOMAIN_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+
+
+def content_bits(message: Message) -> int:
+    """Content-type bitmask of a message (media, forwards, service, entities)."""
+    bits = 0
+
+    media = message.media
+    if media is not None:
+        bits |= _MEDIA_BITS.get(media, 0)
+        if media is MessageMediaType.POLL and message.poll and message.poll.type is PollType.QUIZ:
+            bits |= QUIZ
+
+    if message.forward_date:
+        bits |= FORWARD
+        if message.forward_from_chat and message.forward_from_chat.type is ChatType.CHANNEL:
+            bits |= FORWARD_CHANNEL
+
+    if message.sender_chat and message.sender_chat.type is ChatType.CHANNEL:
+        if not message.chat or message.sender_chat.id != message.chat.id:
+            bits |= CHANNEL_SENDER
+
+    if message.via_bot:
+        bits |= INLINE
+
+    if message.service:
+        bits |= SERVICE
+        if message.new_chat_members and any(user.is_bot for user in message.new_chat_members):
+            bits |= NEW_BOT
+        if message.video_chat_started or message.video_chat_scheduled:
+            bits |= VIDEO_CHAT
+
+    for entity in message.entities or message.caption_entities or ():
+        bits |= _ENTITY_BITS.get(entity.type, 0)
+
+    return bits
+
+
+def _entity_text(text: str, offset: int, length: int) -> str:
+    """Slice text by entity offsets (Telegram counts UTF-16 code units)."""
+    if text.isascii():
+        return text[offset:offset + length]
+    encoded = text.encode("utf-16-le")
+    return encoded[offset * 2:(offset + length) * 2].decode("utf-16-le", errors="ignore")
+
+
+def _link_hosts(message: Message, text: str) -> List[str]:
+    """Hostnames of URL / text-link entities."""
+    hosts = []
+    for entity in message.entities or message.caption_entities or ():
+        if entity.type is MessageEntityType.TEXT_LINK:
+            url = entity.url or ""
+        elif entity.type is MessageEntityType.URL:
+            url = _entity_text(text, entity.offset, entity.length)
+        else:
+            continue
+
+        if "://" not in url:
+            url = "http://" + url
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            continue
+        if host:
+            hosts.append(host.rstrip("."))
+    return hosts
+
+
+def _host_in(host: str, domains: Iterable[str]) -> bool:
+    """Match host against a domain set, including subdomains (a.b.example.com)."""
+    while True:
+        if host in domains:
+            return True
+        dot = host.find(".")
+        if dot < 0:
+            return False
+        host = host[dot + 1:]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class Violation(NamedTuple):
+    module_key: str   # "locks" / "anti_spam"
+    rule: str         # e.g. "photo", "blacklist_words", "regex_filters"
+    action: str       # delete / warn / mute / kick / ban
+    detail: str = ""  # matched word, domain or pattern
+
+
+class RulePlan:
+    """Compiled rules of one group. Immutable once built; evaluate() is synchronous."""
+
+    __slots__ = (
+        "source", "config_version",
+        "lock_mask", "lock_action", "filter_mask", "filter_action",
+        "case_sensitive", "whole_word", "automaton", "has_whitelist_words",
+        "regex", "regex_rules", "link_rules", "whitelist_domains",
+        "blacklist_domains", "empty"
+    )
+
+    def __init__(self, source: Tuple, config_version: int):
+        self.source = source
+        self.config_version = config_version
+        self.lock_mask = 0
+        self.lock_action = DEFAULT_ACTION
+        self.filter_mask = 0
+        self.filter_action = DEFAULT_ACTION
+        self.case_sensitive = False
+        self.whole_word = False
+        self.automaton: Optional[AhoCorasick] = None
+        self.has_whitelist_words = False
+        self.regex: Optional[re.Pattern] = None
+        self.regex_rules: List[re.Pattern] = []
+        self.link_rules: Tuple[str, ...] = ()
+        self.whitelist_domains: frozenset = frozenset()
+        self.blacklist_domains: frozenset = frozenset()
+        self.empty = True
+
+    # ==================== Compilation ====================
+
+    @classmethod
+    def compile(
+        cls,
+        config_version: int,
+        locks_doc: Optional[Dict[str, Any]],
+        anti_spam_doc: Optional[Dict[str, Any]]
+    ) -> "RulePlan":
+        plan = cls((locks_doc, anti_spam_doc), config_version)
+
+        if locks_doc:
+            for name, enabled in (locks_doc.get("locks") or {}).items():
+                bits = LOCK_BITS.get(name.removeprefix("lock_"))
+                if enabled and bits:
+                    plan.lock_mask |= bits
+            plan.lock_action = locks_doc.get("action", DEFAULT_ACTION)
+
+        if anti_spam_doc:
+            plan._compile_filters(anti_spam_doc)
+
+        plan.empty = not (
+            plan.lock_mask or plan.filter_mask or plan.automaton
+            or plan.regex_rules or plan.link_rules
+        )
+        return plan
+
+    def _compile_filters(self, doc: Dict[str, Any]):
+        self.filter_action = doc.get("filter_action", DEFAULT_ACTION)
+        self.case_sensitive = bool(doc.get("case_sensitive_filters", False))
+        self.whole_word = bool(doc.get("whole_word_match", False))
+
+        for name, bits in FILTER_BITS.items():
+            if doc.get(name):
+                self.filter_mask |= bits
+
+        # Words and domains share one automaton over the lowercased text
+        automaton = AhoCorasick()
+        blacklisted = 0
+        for word in doc.get("blacklist_words") or ():
+            automaton.add(word.lower(), ("word", word))
+            blacklisted += 1
+        for word in doc.get("whitelist_words") or ():
+            automaton.add(word.lower(), ("allow", word))
+            self.has_whitelist_words = True
+        blacklist_domains = {domain.lower().strip(".") for domain in doc.get("blacklist_domains") or () if domain}
+        for domain in blacklist_domains:
+            automaton.add(domain, ("domain", domain))
+        if blacklisted or blacklist_domains:
+            self.automaton = automaton.build()
+        self.blacklist_domains = frozenset(blacklist_domains)
+        self.whitelist_domains = frozenset(
+            domain.lower().strip(".") for domain in doc.get("whitelist_domains") or () if domain
+        )
+
+        self._compile_regex(doc.get("regex_filters") or ())
+
+        self.link_rules = tuple(
+            rule for rule in ("antilink", "telegram_link_block", "url_shortener_block", "external_link_block")
+            if doc.get(rule)
+        )
+
+    def _compile_regex(self, patterns: Iterable[str]):
+        """
+        Combine patterns into one non-capturing alternation (capturing groups
+        would disable the regex engine's prefix optimisations). The individual
+        patterns are kept to name the rule once the combined regex matched,
+        and are matched one by one if the combination fails to compile.
+        """
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        parts: List[str] = []
+
+        for pattern in patterns:
+            try:
+                # Validated as it will be combined: inline global flags such
+                # as "(?i)" are only allowed at the start of the whole regex
+                re.compile(f"(?:{pattern})", flags)
+                compiled = re.compile(pattern, flags)
+            except re.error as e:
+                logger.warning(f"⚠️  Skipping invalid regex filter {pattern!r}: {e}")
+                continue
+            # Named groups / backreferences would clash once patterns are combined
+            if compiled.groupindex or re.search(r"\\\d|\(\?P=", pattern):
+                logger.warning(f"⚠️  Skipping regex filter with named groups/backreferences: {pattern!r}")
+                continue
+
+            parts.append(f"(?:{pattern})")
+            self.regex_rules.append(compiled)
+
+        if parts:
+            try:
+                self.regex = re.compile("|".join(parts), flags)
+            except (re.error, RecursionError, OverflowError) as e:
+                logger.warning(f"⚠️  Could not combine {len(parts)} regex filters, matching them one by one: {e}")
+                self.regex = None
+
+    def _regex_rule(self, text: str, position: int) -> str:
+        for compiled in self.regex_rules:
+            if compiled.match(text, position):
+                return compiled.pattern
+        return ""
+
+    # ==================== Evaluation ====================
+
+    def evaluate(self, message: Message, bits: Optional[int] = None) -> Optional[Violation]:
+        """Return the first violated rule, or None."""
+        if self.empty:
+            return None
+
+        if bits is None:
+            bits = content_bits(message)
+
+        if bits & self.lock_mask:
+            return Violation("locks", self._lock_name(bits & self.lock_mask), self.lock_action)
+
+        if bits & self.filter_mask:
+            return Violation("anti_spam", self._filter_name(bits & self.filter_mask), self.filter_action)
+
+        text = message.text or message.caption
+        if not text:
+            return None
+
+        if self.link_rules and bits & URL:
+            violation = self._check_links(message, text)
+            if violation:
+                return violation
+
+        if self.automaton is not None:
+            violation = self._check_lists(text)
+            if violation:
+                return violation
+
+        if self.regex is not None:
+            match = self.regex.search(text)
+            if match:
+                return Violation("anti_spam", "regex_filters", self.filter_action,
+                                 self._regex_rule(text, match.start()))
+        else:
+            for compiled in self.regex_rules:
+                if compiled.search(text):
+                    return Violation("anti_spam", "regex_filters", self.filter_action, compiled.pattern)
+
+        return None
+
+    def _check_links(self, message: Message, text: str) -> Optional[Violation]:
+        for host in _link_hosts(message, text):
+            if self.whitelist_domains and _host_in(host, self.whitelist_domains):
+                continue
+            if self.blacklist_domains and _host_in(host, self.blacklist_domains):
+                return Violation("anti_spam", "blacklist_domains", self.filter_action, host)
+
+            is_telegram = _host_in(host, TELEGRAM_DOMAINS)
+            for rule in self.link_rules:
+                if (rule == "antilink"
+                        or (rule == "telegram_link_block" and is_telegram)
+                        or (rule == "external_link_block" and not is_telegram)
+                        or (rule == "url_shortener_block" and _host_in(host, SHORTENER_DOMAINS))):
+                    return Violation("anti_spam", rule, self.filter_action, host)
+        return None
+
+    def _check_lists(self, text: str) -> Optional[Violation]:
+        haystack = text.lower()
+        # Case-sensitive words are verified on the original text (when lower() kept offsets)
+        verify_case = self.case_sensitive and len(haystack) == len(text)
+
+        hits: List[Tuple[int, int, str]] = []
+        allowed: List[Tuple[int, int]] = []
+
+        for start, end, (kind, pattern) in self.automaton.iter_matches(haystack):
+            if kind == "domain":
+                if self._is_domain_match(haystack, start, end):
+                    return Violation("anti_spam", "blacklist_domains", self.filter_action, pattern)
+                continue
+
+            if verify_case and text[start:end] != pattern:
+                continue
+            if self.whole_word and not self._is_whole_word(haystack, start, end):
+                continue
+
+            if kind == "allow":
+                allowed.append((start, end))
+            elif not self.has_whitelist_words:
+                return Violation("anti_spam", "blacklist_words", self.filter_action, pattern)
+            else:
+                hits.append((start, end, pattern))
+
+        for start, end, pattern in hits:
+            # A blacklisted word inside a whitelisted one ("ass" in "class") is allowed
+            if not any(a_start <= start and end <= a_end for a_start, a_end in allowed):
+                return Violation("anti_spam", "blacklist_words", self.filter_action, pattern)
+        return None
+
+    @staticmethod
+    def _is_whole_word(text: str, start: int, end: int) -> bool:
+        return ((start == 0 or not _is_word_char(text[start - 1]))
+                and (end == len(text) or not _is_word_char(text[end])))
+
+    @staticmethod
+    def _is_domain_match(text: str, start: int, end: int) -> bool:
+        # "example.com" matches "sub.example.com" but not "badexample.com" / "example.community"
+        return ((start == 0 or text[start - 1] not in _DOMAIN_CHARS)
+                and (end == len(text) or text[end] not in _DOMAIN_CHARS))
+
+    @staticmethod
+    def _lock_name(bits: int) -> str:
+        for name, lock_bits in LOCK_BITS.items():
+            if bits & lock_bits:
+                return name
+        return "unknown"
+
+    @staticmethod
+    def _filter_name(bits: int) -> str:
+        for name, filter_bits in FILTER_BITS.items():
+            if bits & filter_bits:
+                return name
+        return "unknown"
+
+
+class RuleEngine:
+    """
+    Bounded LRU of compiled plans, keyed by group.
+    A plan is reused while the group's locks/anti_spam documents are unchanged.
+    """
+
+    MODULE_KEYS = ("locks", "anti_spam")
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._plans: "OrderedDict[int, RulePlan]" = OrderedDict()
+        self._stats = {"compiles": 0, "reused": 0, "evaluations": 0, "violations": 0}
+
+    def get_plan(self, config: GroupConfig, enabled: Set[str]) -> RulePlan:
+        """
+        Get the compiled plan of a group.
+
+        Args:
+            config: Cached group config
+            enabled: Module keys enabled for the group (subset of MODULE_KEYS)
+        """
+        plan = self._plans.get(config.group_id)
+        if plan is not None and plan.config_version == config.version:
+            self._plans.move_to_end(config.group_id)
+            return plan
+
+        source = tuple(
+            config.get_module(key) if key in enabled else None
+            for key in self.MODULE_KEYS
+        )
+
+        if plan is not None and plan.source == source:
+            # Config reloaded (TTL, other module changed) but our documents are the same
+            plan.config_version = config.version
+            self._plans.move_to_end(config.group_id)
+            self._stats["reused"] += 1
+            return plan
+
+        plan = RulePlan.compile(config.version, *source)
+        self._stats["compiles"] += 1
+        self._plans[config.group_id] = plan
+        self._plans.move_to_end(config.group_id)
+        while len(self._plans) > self.max_size:
+            self._plans.popitem(last=False)
+        return plan
+
+    def evaluate(self, config: GroupConfig, enabled: Set[str], message: Message) -> Optional[Violation]:
+        """Evaluate a message against the group's plan."""
+        plan = self.get_plan(config, enabled)
+        self._stats["evaluations"] += 1
+        violation = plan.evaluate(message)
+        if violation:
+            self._stats["violations"] += 1
+        return violation
+
+    def forget(self, group_id: Optional[int]):
+        """Drop the plan of a group (None = all groups)."""
+        if group_id is None:
+            self._plans.clear()
+        else:
+            self._plans.pop(group_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "plans": len(self._plans)}
+
+
+# ==================== Global Engine ====================
+rule_engine = RuleEngine(max_size=settings.GROUP_CACHE_MAX_SIZE)
+
+
+# ==================== Export ====================
+__all__ = [
+    "LOCK_BITS",
+    "FILTER_BITS",
+    "content_bits",
+    "Violation",
+    "RulePlan",
+    "RuleEngine",
+    "rule_engine",
+]
@@ -1,5 +1,463 @@
 """
-scheduler.py
+Scheduler
+APScheduler-based job scheduler with a MongoDB job store, leader election
+and sharded per-group jobs.
+
+Global jobs (stats rollups, backups) run once per deployment: replicas
+compete for a lease document in `scheduler_leases`, and only the lease
+holder starts the scheduler. Its jobs live in `scheduler_jobs`, so next run
+times survive restarts and fail over to the next leader.
+
+Per-group jobs (daily reports, cleanup) are not one job per group and do not
+all fire at the scheduled instant: each is split into SCHEDULER_SHARDS jobs
+spread evenly across SCHEDULER_GROUP_WINDOW seconds after the schedule.
+A group always belongs to the same shard (|group_id| mod SCHEDULER_SHARDS,
+selected in the query itself), so its run time is deterministic from day to
+day. Shards run their groups with
+at most SCHEDULER_MAX_CONCURRENCY tasks at once across all jobs.
+
+Tasks are registered by name (register_group_task / register_global_task);
+persisted jobs only store names, never callables.
 """
 
-# TODO: Implement
+import asyncio
+import os
+import socket
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from apscheduler.jobstores.mongodb import MongoDBJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from loguru import logger
+
+from config.database import get_database, get_groups_collection
+from config.settings import settings
+
+
+GroupTask = Callable[[Client, int], Awaitable[Any]]
+GlobalTask = Callable[[], Awaitable[Any]]
+
+LEASE_ID = "scheduler"
+JOBS_COLLECTION = "scheduler_jobs"
+LEASES_COLLECTION = "scheduler_leases"
+
+# Global jobs are spread over this many seconds after their schedule
+GLOBAL_JITTER_SECONDS = 300
+
+
+# ==================== Deterministic Jitter ====================
+
+def stable_hash(*parts: Any) -> int:
+    """Process-independent hash (Python's hash() is salted per process)."""
+    return zlib.crc32(":".join(str(part) for part in parts).encode())
+
+
+def shard_of(group_id: int, shards: int) -> int:
+    """Shard of a group: |group_id| mod shards (see shard_query)."""
+    return abs(group_id) % shards
+
+
+def shard_query(shard: int, shards: int) -> Dict[str, Any]:
+    """
+    Filter for the approved groups of a shard, matching shard_of().
+
+    MongoDB's $mod keeps the sign of the dividend (-7 mod 3 == -1), and group
+    IDs are negative, so a shard matches remainder +shard or -shard.
+    """
+    if shard == 0:
+        return {"approved": True, "group_id": {"$mod": [shards, 0]}}
+    return {
+        "approved": True,
+        "$or": [
+            {"group_id": {"$mod": [shards, shard]}},
+            {"group_id": {"$mod": [shards, -shard]}},
+        ],
+    }
+
+
+class OffsetTrigger(BaseTrigger):
+    """Fires a fixed number of seconds after each fire time of another trigger."""
+
+    def __init__(self, trigger: BaseTrigger, offset: float):
+        self.trigger = trigger
+        self.offset = timedelta(seconds=offset)
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        previous = previous_fire_time - self.offset if previous_fire_time else None
+        next_time = self.trigger.get_next_fire_time(previous, now - self.offset)
+        return next_time + self.offset if next_time else None
+
+    def __str__(self):
+        return f"{self.trigger} +{int(self.offset.total_seconds())}s"
+
+
+def daily_trigger(hh_mm: str) -> CronTrigger:
+    hour, minute = (int(part) for part in hh_mm.split(":"))
+    return CronTrigger(hour=hour, minute=minute, timezone=timezone.utc)
+
+
+def cron_trigger(expression: str) -> CronTrigger:
+    return CronTrigger.from_crontab(expression, timezone=timezone.utc)
+
+
+# ==================== Task Registry ====================
+
+@dataclass
+class JobSpec:
+    name: str
+    trigger: BaseTrigger
+    per_group: bool
+    module: Optional[str] = None     # module providing the task (loaded on first run)
+
+
+_group_tasks: Dict[str, GroupTask] = {}
+_global_tasks: Dict[str, GlobalTask] = {}
+
+
+def register_group_task(name: str, func: GroupTask):
+    """Register the per-group callback of a sharded job: func(client, group_id)."""
+    _group_tasks[name] = func
+
+
+def register_global_task(name: str, func: GlobalTask):
+    """Register the callback of a global (leader-only) job."""
+    _global_tasks[name] = func
+
+
+async def _run_backup():
+    """Run the backup script (database-migrations/backups/backup.sh)."""
+    script = settings.BASE_DIR.parent / "database-migrations" / "backups" / "backup.sh"
+    process = await asyncio.create_subprocess_exec(
+        "bash", str(script),
+        env={
+            **os.environ,
+            "BACKUP_PATH": settings.BACKUP_PATH,
+            "MONGODB_URI": settings.MONGODB_URI,
+            "DATABASE_NAME": settings.DATABASE_NAME,
+            "BACKUP_RETENTION_DAYS": str(settings.BACKUP_RETENTION_DAYS),
+        },
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT
+    )
+    output, _ = await process.communicate()
+    if process.returncode:
+        logger.error(f"❌ Backup failed ({process.returncode}): {output.decode(errors='replace')[-500:]}")
+    else:
+        logger.info("💾 Backup finished")
+
+
+def _job_specs() -> List[JobSpec]:
+    """Jobs of this deployment (from settings)."""
+    from services.stats_service import run_rollups
+    register_global_task("stats_rollup", run_rollups)
+    register_global_task("backup", _run_backup)
+
+    specs = [JobSpec("stats_rollup", CronTrigger(hour=0, minute=5, timezone=timezone.utc), per_group=False)]
+    if settings.BACKUP_ENABLED:
+        specs.append(JobSpec("backup", cron_trigger(settings.BACKUP_SCHEDULE), per_group=False))
+    if settings.ENABLE_DAILY_REPORTS:
+        specs.append(JobSpec("daily_report", daily_trigger(settings.DAILY_REPORT_TIME), per_group=True, module="reports"))
+    specs.append(JobSpec("cleanup", cron_trigger(settings.CLEANUP_SCHEDULE), per_group=True, module="cleanup"))
+    return specs
+
+
+# ==================== Leader Lease ====================
+
+class LeaderLease:
+    """
+    Lease document {_id, owner, expires_at} in `scheduler_leases`.
+
+    Holders renew every ttl/3 seconds; a replica takes over once a lease is
+    expired. Acquisition is a single conditional upsert, so two replicas can
+    never both hold it (the loser gets a duplicate key error).
+    """
+
+    def __init__(self, ttl: float, on_change: Callable[[bool], Awaitable[None]]):
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._on_change = on_change
+        self._task: Optional[asyncio.Task] = None
+
+    async def try_acquire(self) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            await get_database()[LEASES_COLLECTION].find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.ttl), "renewed_at": now}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def release(self):
+        try:
+            await get_database()[LEASES_COLLECTION].delete_one({"_id": LEASE_ID, "owner": self.owner})
+        except PyMongoError as e:
+            logger.warning(f"⚠️  Could not release scheduler lease: {e}")
+
+    async def _set_leader(self, is_leader: bool):
+        """Switch leadership; is_leader only reports True once the scheduler runs."""
+        if is_leader == self.is_leader:
+            return
+        try:
+            await self._on_change(is_leader)
+        except Exception as e:
+            logger.exception(f"❌ Scheduler {'start' if is_leader else 'stop'} failed: {e}")
+            if is_leader:
+                # Undo the partial start and let another replica (or the next round) take over
+                try:
+                    await self._on_change(False)
+                except Exception as cleanup_error:
+                    logger.error(f"Scheduler cleanup failed: {cleanup_error}")
+                await self.release()
+            self.is_leader = False
+            return
+        self.is_leader = is_leader
+
+    async def _run(self):
+        while True:
+            try:
+                acquired = await self.try_acquire()
+            except PyMongoError as e:
+                logger.warning(f"⚠️  Scheduler lease check failed: {e}")
+                acquired = False
+            try:
+                await self._set_leader(acquired)
+            except Exception as e:
+                # Never let the lease loop die: this replica would stop competing for good
+                logger.exception(f"❌ Scheduler lease loop error: {e}")
+            await asyncio.sleep(self.ttl / 3)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self._set_leader(False)
+            await self.release()
+
+
+# ==================== Job Runners ====================
+# Module-level coroutines: the job store persists them by reference.
+
+_client: Optional[Client] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_specs: Dict[str, JobSpec] = {}
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _job_stats(name: str) -> Dict[str, Any]:
+    return _stats.setdefault(name, {"runs": 0, "groups": 0, "errors": 0, "flood_waits": 0, "last_ms": 0.0})
+
+
+async def run_global_job(name: str):
+    task = _global_tasks.get(name)
+    if task is None:
+        logger.warning(f"⚠️  No task registered for global job {name}")
+        return
+
+    stats = _job_stats(name)
+    started = time.perf_counter()
+    try:
+        await task()
+    except Exception as e:
+        stats["errors"] += 1
+        logger.exception(f"❌ Global job {name} failed: {e}")
+    stats["runs"] += 1
+    stats["last_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _shard_groups(shard: int, shards: int, module: Optional[str]) -> List[int]:
+    from routers.module_loader import is_module_enabled
+
+    group_ids = []
+    async for doc in get_groups_collection().find(shard_query(shard, shards), {"group_id": 1, "_id": 0}):
+        group_id = doc["group_id"]
+        if module and not await is_module_enabled(group_id, module):
+            continue
+        group_ids.append(group_id)
+    return group_ids
+
+
+async def _run_group(name: str, task: GroupTask, group_id: int, stats: Dict[str, Any]):
+    async with _semaphore:
+        for attempt in range(2):
+            try:
+                await task(_client, group_id)
+                stats["groups"] += 1
+                return
+            except FloodWait as e:
+                # Telegram asks us to slow down: hold the slot, retry once
+                stats["flood_waits"] += 1
+                await asyncio.sleep(e.value)
+            except Exception as e:
+                stats["errors"] += 1
+                logger.exception(f"❌ Job {name} failed for group {group_id}: {e}")
+                return
+
+
+async def run_group_shard(name: str, shard: int, shards: int):
+    spec = _specs.get(name)
+    module = spec.module if spec else None
+
+    if name not in _group_tasks and module:
+        from routers.module_loader import get_module
+        handle = get_module(module)
+        if handle is not None:
+            await handle.ensure_loaded()
+
+    task = _group_tasks.get(name)
+    if task is None:
+        logger.debug(f"No task registered for group job {name}, shard {shard} skipped")
+        return
+
+    stats = _job_stats(name)
+    started = time.perf_counter()
+    group_ids = await _shard_groups(shard, shards, module)
+    await asyncio.gather(*(_run_group(name, task, group_id, stats) for group_id in group_ids))
+
+    stats["runs"] += 1
+    stats["last_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"⏰ Job {name} shard {shard + 1}/{shards}: {len(group_ids)} groups in {stats['last_ms']:.0f} ms")
+
+
+# ==================== Scheduler ====================
+
+class Scheduler:
+    """Leader-only APScheduler with the persistent job set of this deployment."""
+
+    def __init__(self):
+        self._scheduler: Optional[AsyncIOScheduler] = None
+        self._mongo: Optional[MongoClient] = None
+        self.lease = LeaderLease(settings.SCHEDULER_LEASE_TTL, self._on_leadership)
+
+    def _build(self) -> AsyncIOScheduler:
+        """Create the scheduler and its job store (blocking, run in a worker thread)."""
+        # The job store is synchronous (pymongo); it is only touched on job changes and wakeups
+        self._mongo = MongoClient(settings.MONGODB_URI, serverSelectionTimeoutMS=5000)
+        # Select a server and create the job store index here, so start() on the loop is quick
+        self._mongo[settings.DATABASE_NAME][JOBS_COLLECTION].create_index("next_run_time", sparse=True)
+        return AsyncIOScheduler(
+            jobstores={"default": MongoDBJobStore(
+                database=settings.DATABASE_NAME, collection=JOBS_COLLECTION, client=self._mongo
+            )},
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE,
+            },
+            timezone=timezone.utc
+        )
+
+    def _sync_jobs(self, specs: List[JobSpec]):
+        """Add/replace the configured jobs and remove jobs no longer configured."""
+        shards = settings.SCHEDULER_SHARDS
+        wanted = set()
+
+        for spec in specs:
+            if spec.per_group:
+                step = settings.SCHEDULER_GROUP_WINDOW / shards
+                for shard in range(shards):
+                    job_id = f"{spec.name}:{shard}"
+                    wanted.add(job_id)
+                    self._scheduler.add_job(
+                        run_group_shard, OffsetTrigger(spec.trigger, shard * step),
+                        args=(spec.name, shard, shards), id=job_id, name=job_id, replace_existing=True
+                    )
+            else:
+                wanted.add(spec.name)
+                self._scheduler.add_job(
+                    run_global_job, OffsetTrigger(spec.trigger, stable_hash(spec.name) % GLOBAL_JITTER_SECONDS),
+                    args=(spec.name,), id=spec.name, name=spec.name, replace_existing=True
+                )
+
+        for job in self._scheduler.get_jobs():
+            if job.id not in wanted:
+                job.remove()
+
+    async def _on_leadership(self, is_leader: bool):
+        if is_leader:
+            logger.info(f"👑 Scheduler leadership acquired ({self.lease.owner})")
+            self._scheduler = await asyncio.to_thread(self._build)
+            self._scheduler.start()
+            # add_job() writes to the synchronous job store; APScheduler is thread-safe
+            await asyncio.to_thread(self._sync_jobs, list(_specs.values()))
+        else:
+            logger.warning(f"⏰ Scheduler leadership lost ({self.lease.owner})")
+            if self._scheduler is not None:
+                if self._scheduler.running:
+                    self._scheduler.shutdown(wait=False)
+                self._scheduler = None
+            if self._mongo is not None:
+                self._mongo.close()
+                self._mongo = None
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        if self._scheduler is None:
+            return []
+        return [
+            {"id": job.id, "next_run_time": job.next_run_time, "trigger": str(job.trigger)}
+            for job in self._scheduler.get_jobs()
+        ]
+
+
+scheduler = Scheduler()
+
+
+async def init_scheduler(app: Client):
+    """Register jobs and start competing for scheduler leadership."""
+    global _client, _semaphore, _specs
+    _client = app
+    _semaphore = asyncio.Semaphore(settings.SCHEDULER_MAX_CONCURRENCY)
+    _specs = {spec.name: spec for spec in _job_specs()}
+    scheduler.lease.start()
+
+
+async def shutdown_scheduler():
+    """Stop jobs and release leadership so another replica takes over at once."""
+    await scheduler.lease.stop()
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    return {
+        "leader": scheduler.lease.is_leader,
+        "owner": scheduler.lease.owner,
+        "jobs": scheduler.get_jobs(),
+        "runs": _stats,
+    }
+
+
+# ==================== Export ====================
+__all__ = [
+    "OffsetTrigger",
+    "stable_hash",
+    "shard_of",
+    "shard_query",
+    "register_group_task",
+    "register_global_task",
+    "run_global_job",
+    "run_group_shard",
+    "init_scheduler",
+    "shutdown_scheduler",
+    "get_scheduler_stats",
+]
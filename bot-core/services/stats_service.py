@@ -0,0 +1,267 @@
+"""
+Stats Service
+Incremental per-group statistics (layout: database-migrations/stats_rollups.py).
+
+Counters (messages, joins, leaves, moderation actions, message kinds) and a
+top-K sketch of senders are kept in memory per (group, UTC hour) and
+flushed every STATS_FLUSH_INTERVAL seconds as one $inc upsert per group and
+hour into `stats_hourly`. The scheduler merges hours into `stats_daily`
+and days into `stats_monthly`; reports read those instead of scanning logs
+or group_users.
+
+Each process writes its sketch under its own writer id, so replicas and
+restarts within an hour never overwrite each other's top senders.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from pyrogram.types import Message
+from loguru import logger
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from config.database import get_database
+from config.settings import settings
+from stats_rollups import (
+    STATS_HOURLY_COLLECTION,
+    SpaceSaving,
+    hour_start,
+    hourly_updates,
+    load_stats,
+    rollup_day,
+    rollup_month,
+)
+
+
+class _HourStats:
+    """Counters of one group for one hour (deltas since the last flush)."""
+
+    __slots__ = ("increments", "sketch", "sketch_dirty")
+
+    def __init__(self, k: int):
+        self.increments: Dict[str, int] = {}
+        self.sketch = SpaceSaving(k)
+        self.sketch_dirty = False
+
+    def inc(self, field: str, count: int = 1):
+        self.increments[field] = self.increments.get(field, 0) + count
+
+
+class StatsAggregator:
+    """In-memory hourly counters with periodic bulk flushes."""
+
+    def __init__(self, flush_interval: float, top_k: int):
+        self.flush_interval = flush_interval
+        self.top_k = top_k
+        self.writer_id = uuid.uuid4().hex[:12]
+
+        # (group_id, hour start) -> counters
+        self._hours: Dict[Tuple[int, datetime], _HourStats] = {}
+        # Hours before this were flushed and dropped; late events only count
+        self._closed_before: Optional[datetime] = None
+
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "events": 0,
+            "flushes": 0,
+            "hour_ops": 0,
+            "flush_errors": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    def _hour(self, group_id: int, start: datetime) -> _HourStats:
+        key = (group_id, start)
+        hour = self._hours.get(key)
+        if hour is None:
+            hour = self._hours[key] = _HourStats(self.top_k)
+        return hour
+
+    # ==================== Recording ====================
+
+    def record_message(self, group_id: int, user_id: Optional[int], kind: str, ts: Optional[datetime] = None):
+        start = hour_start(ts or datetime.now(timezone.utc))
+        hour = self._hour(group_id, start)
+        hour.inc("messages")
+        hour.inc(f"media.{kind}")
+        # A fresh sketch for a closed hour would overwrite the one already written
+        if user_id is not None and (self._closed_before is None or start >= self._closed_before):
+            hour.sketch.add(user_id)
+            hour.sketch_dirty = True
+        self.stats["events"] += 1
+
+    def record(self, group_id: int, field: str, count: int = 1, ts: Optional[datetime] = None):
+        """Increment a counter (joins, leaves) or counter map entry (actions.ban)."""
+        self._hour(group_id, hour_start(ts or datetime.now(timezone.utc))).inc(field, count)
+        self.stats["events"] += 1
+
+    # ==================== Flushing ====================
+
+    async def flush(self):
+        """Write counter deltas; drop finished hours once written."""
+        async with self._flush_lock:
+            if not self._hours:
+                return
+
+            current = hour_start(datetime.now(timezone.utc))
+            rows = []
+            finished = []
+            for (group_id, hour), counters in self._hours.items():
+                sketch = None
+                if counters.sketch_dirty:
+                    sketch = (self.writer_id, counters.sketch.to_doc())
+                rows.append((group_id, hour, counters.increments, sketch))
+                if hour < current:
+                    finished.append((group_id, hour))
+
+            operations = hourly_updates(rows)
+            # Deltas are handed over; new events start from zero
+            for counters in self._hours.values():
+                counters.increments = {}
+                counters.sketch_dirty = False
+            for key in finished:
+                del self._hours[key]
+            self._closed_before = current
+
+            if not operations:
+                return
+
+            started = time.perf_counter()
+            try:
+                await get_database()[STATS_HOURLY_COLLECTION].bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                self.stats["flush_errors"] += 1
+                logger.error(f"Stats bulk write had {len(errors)} errors: {errors[:3]}")
+            except PyMongoError as e:
+                # Stats are best effort: a failed flush loses one interval of counts
+                self.stats["flush_errors"] += 1
+                logger.error(f"Stats flush failed ({len(operations)} hours dropped): {e}")
+                return
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["flushes"] += 1
+            self.stats["hour_ops"] += len(operations)
+            self.stats["last_flush_ms"] = round(elapsed_ms, 2)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Stats writer error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "open_hours": len(self._hours), "writer_id": self.writer_id}
+
+
+# ==================== Global Instance ====================
+stats_aggregator = StatsAggregator(
+    flush_interval=settings.STATS_FLUSH_INTERVAL,
+    top_k=settings.STATS_TOP_K
+)
+
+
+def message_kind(message: Message) -> str:
+    """Kind of a message for media stats (text, photo, sticker, ...)."""
+    if message.media:
+        return message.media.value
+    return "text"
+
+
+def record_message(message: Message):
+    """
+    Count a group message (left_chat_member service messages count as leaves).
+
+    Counted at arrival time (UTC): Pyrogram's message.date is naive local time.
+    """
+    if message.service:
+        if message.left_chat_member:
+            stats_aggregator.record(message.chat.id, "leaves")
+        return
+    user_id = message.from_user.id if message.from_user else None
+    stats_aggregator.record_message(message.chat.id, user_id, message_kind(message))
+
+
+def record_joins(group_id: int, count: int):
+    stats_aggregator.record(group_id, "joins", count)
+
+
+def record_action(group_id: int, action: str):
+    """Count a moderation action (delete, warn, mute, kick, ban)."""
+    stats_aggregator.record(group_id, f"actions.{action}")
+
+
+async def get_group_stats(group_id: int, since: datetime, until: Optional[datetime] = None) -> Dict[str, Any]:
+    """Merged statistics of a group for [since, until) (see stats_rollups.load_stats)."""
+    until = until or datetime.now(timezone.utc)
+    return await load_stats(get_database(), group_id, since, until, settings.STATS_TOP_K)
+
+
+async def run_rollups(now: Optional[datetime] = None):
+    """
+    Roll up yesterday into stats_daily and, on the first day of a month, the
+    previous month into stats_monthly (scheduled daily after midnight UTC).
+    """
+    now = now or datetime.now(timezone.utc)
+    yesterday = now - timedelta(days=1)
+    db = get_database()
+
+    started = time.perf_counter()
+    days = await rollup_day(db, yesterday, settings.STATS_TOP_K)
+    months = 0
+    if yesterday.month != now.month:
+        months = await rollup_month(db, yesterday, settings.STATS_TOP_K)
+    logger.info(
+        f"📈 Stats rollup for {yesterday:%Y-%m-%d}: {days} daily, {months} monthly docs "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+
+def start_stats_writer():
+    """Start periodic stats flushes (call after init_database())."""
+    stats_aggregator.start()
+
+
+async def stop_stats_writer():
+    """Flush pending stats (call before close_database())."""
+    await stats_aggregator.stop()
+
+
+def get_stats_writer_stats() -> Dict[str, Any]:
+    return stats_aggregator.get_stats()
+
+
+# ==================== Export ====================
+__all__ = [
+    "StatsAggregator",
+    "stats_aggregator",
+    "message_kind",
+    "record_message",
+    "record_joins",
+    "record_action",
+    "get_group_stats",
+    "run_rollups",
+    "start_stats_writer",
+    "stop_stats_writer",
+    "get_stats_writer_stats",
+]
@@ -1,5 +1,584 @@
 """
-tracking_service.py
+Tracking Service
+Batched write pipeline and event dedup for join tracking.
+
+Join events are buffered in memory and flushed with bulk_write(ordered=False):
+- group_users upserts, coalesced per (group, user)
+- invite_links join_count increments, summed per (group, link)
+
+A flush runs when the buffer reaches JOIN_WRITER_BATCH_SIZE or every
+JOIN_WRITER_FLUSH_INTERVAL seconds. When JOIN_WRITER_MAX_PENDING is reached,
+producers wait for a flush (backpressure). Call stop_join_writer() on
+shutdown to flush what is left.
+
+Member activity (`last_seen`) is written behind by LastSeenTracker: touches
+are coalesced in memory and flushed with $max upserts, at most once per
+member per LAST_SEEN_GRANULARITY seconds.
+
+Telegram reports most joins twice (a new_chat_members service message and a
+chat_member_updated update). JoinEventDeduper recognises the second report
+and returns only the information it adds, so one join is one write.
 """
 
-# TODO: Implement
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from config.database import get_group_users_collection, get_invite_links_collection
+from config.settings import settings
+
+
+# Defaults for rows created by a join upsert
+JOIN_DEFAULTS = {
+    "role": "member",
+    "is_vip": False,
+    "warns": 0
+}
+
+
+class JoinTrackingWriter:
+    """Buffers join-tracking writes and flushes them in bulk."""
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._joins: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._invites: Dict[Tuple[int, str], int] = {}
+
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "events": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "ops_written": 0,
+            "flush_errors": 0,
+            "backpressure_waits": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._joins) + len(self._invites)
+
+    # ==================== Producers ====================
+
+    async def record_join(self, group_id: int, user_id: int, fields: Dict[str, Any]):
+        """Queue a group_users upsert ($set fields). Later events win per field."""
+        key = (group_id, user_id)
+        self.stats["events"] += 1
+
+        existing = self._joins.get(key)
+        if existing is not None:
+            existing.update(fields)
+            self.stats["coalesced"] += 1
+        else:
+            self._joins[key] = dict(fields)
+
+        await self._after_enqueue()
+
+    async def record_invite_join(self, group_id: int, link_id: str, count: int = 1):
+        """Queue a join_count increment for an invite link."""
+        key = (group_id, link_id)
+        self.stats["events"] += 1
+
+        if key in self._invites:
+            self.stats["coalesced"] += 1
+        self._invites[key] = self._invites.get(key, 0) + count
+
+        await self._after_enqueue()
+
+    def peek_join(self, group_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """Return buffered (not yet flushed) join fields for a user, if any."""
+        return self._joins.get((group_id, user_id))
+
+    async def _after_enqueue(self):
+        pending = self.pending
+        if pending >= self.max_pending:
+            # Backpressure: producer waits for the buffer to be written
+            self.stats["backpressure_waits"] += 1
+            await self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    # ==================== Flushing ====================
+
+    async def flush(self):
+        """Write all buffered operations."""
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            joins, self._joins = self._joins, {}
+            invites, self._invites = self._invites, {}
+
+            started = time.perf_counter()
+            written = 0
+
+            writes = {}
+            if joins:
+                writes["joins"] = self._write(
+                    get_group_users_collection(),
+                    [
+                        UpdateOne(
+                            {"group_id": group_id, "user_id": user_id},
+                            {
+                                "$set": fields,
+                                "$setOnInsert": JOIN_DEFAULTS,
+                                # A member who rejoins after a cleanup is a candidate again
+                                "$unset": {"removed_at": "", "removed_by": ""}
+                            },
+                            upsert=True
+                        )
+                        for (group_id, user_id), fields in joins.items()
+                    ]
+                )
+            if invites:
+                writes["invites"] = self._write(
+                    get_invite_links_collection(),
+                    [
+                        UpdateOne(
+                            {"group_id": group_id, "link_id": link_id},
+                            {"$inc": {"join_count": count}}
+                        )
+                        for (group_id, link_id), count in invites.items()
+                    ]
+                )
+
+            results = await asyncio.gather(*writes.values(), return_exceptions=True)
+
+            for kind, result in zip(writes, results):
+                if not isinstance(result, Exception):
+                    written += result
+                    continue
+
+                self.stats["flush_errors"] += 1
+                if isinstance(result, PyMongoError):
+                    # Transient failure: put operations back (newer events win)
+                    logger.error(f"Join tracking flush failed ({kind}), requeueing: {result}")
+                    if kind == "joins":
+                        self._requeue_joins(joins)
+                    else:
+                        self._requeue_invites(invites)
+                else:
+                    logger.error(f"Join tracking flush failed ({kind}): {result}")
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["flushes"] += 1
+            self.stats["ops_written"] += written
+            self.stats["last_flush_ms"] = round(elapsed_ms, 2)
+            self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed_ms), 2)
+            self.stats["total_flush_ms"] += elapsed_ms
+
+            logger.debug(f"📊 Flushed {written} join-tracking ops in {elapsed_ms:.1f} ms")
+
+    async def _write(self, collection, operations) -> int:
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: the other operations were still applied
+            errors = e.details.get("writeErrors", [])
+            self.stats["flush_errors"] += 1
+            logger.error(f"Join tracking bulk write had {len(errors)} errors: {errors[:3]}")
+            return len(operations) - len(errors)
+        return len(operations)
+
+    def _requeue_joins(self, joins: Dict):
+        for key, fields in joins.items():
+            newer = self._joins.get(key)
+            self._joins[key] = {**fields, **newer} if newer else fields
+
+    def _requeue_invites(self, invites: Dict):
+        for key, count in invites.items():
+            self._invites[key] = self._invites.get(key, 0) + count
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Join tracking writer error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop background flushing and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        flushes = self.stats["flushes"]
+        return {
+            **self.stats,
+            "pending": self.pending,
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 2) if flushes else 0.0,
+        }
+
+
+# ==================== Join Event Dedup ====================
+
+class JoinEventDeduper:
+    """
+    Short-TTL cache of recent joins keyed by (group, user, join time bucket).
+
+    observe() returns whether the event is the first report of a join and
+    which of its fields are new (not known from an earlier report). Empty or
+    "unknown" values never replace known ones.
+    """
+
+    def __init__(self, ttl: float = 60.0, bucket_seconds: int = 30, max_size: int = 100_000):
+        self.ttl = ttl
+        self.bucket_seconds = bucket_seconds
+        self.max_size = max_size
+        # Insertion order == expiry order, so expired entries are popped from the front
+        self._seen: "OrderedDict[Tuple[int, int, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"events": 0, "first": 0, "merged": 0, "suppressed": 0}
+
+    @staticmethod
+    def _known(value: Any) -> bool:
+        return value is not None and value != "unknown"
+
+    def _find(self, group_id: int, user_id: int, bucket: int) -> Optional[Tuple[int, int, int]]:
+        # Reports of one join can straddle a bucket boundary
+        for candidate in (bucket, bucket - 1, bucket + 1):
+            key = (group_id, user_id, candidate)
+            if key in self._seen:
+                return key
+        return None
+
+    def _evict(self, now: float):
+        seen = self._seen
+        while seen:
+            expires, _ = next(iter(seen.values()))
+            if expires > now and len(seen) <= self.max_size:
+                break
+            seen.popitem(last=False)
+
+    def observe(
+        self,
+        group_id: int,
+        user_id: int,
+        join_time: Optional[datetime],
+        fields: Dict[str, Any]
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Record a join report.
+
+        Returns:
+            (is_first, new_fields): new_fields is every known field for the
+            first report, and only the added information for later reports
+        """
+        now = time.monotonic()
+        self._evict(now)
+        self.stats["events"] += 1
+
+        timestamp = join_time.timestamp() if join_time else time.time()
+        bucket = int(timestamp // self.bucket_seconds)
+
+        key = self._find(group_id, user_id, bucket)
+        if key is None:
+            known = {name: value for name, value in fields.items() if self._known(value)}
+            self._seen[(group_id, user_id, bucket)] = (now + self.ttl, known)
+            self.stats["first"] += 1
+            return True, dict(fields)
+
+        _, known = self._seen[key]
+        added = {
+            name: value for name, value in fields.items()
+            if self._known(value) and not self._known(known.get(name))
+        }
+        if added:
+            known.update(added)
+            self.stats["merged"] += 1
+        else:
+            self.stats["suppressed"] += 1
+        return False, added
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "tracked": len(self._seen)}
+
+
+# ==================== Last Seen ====================
+
+class _Seen:
+    __slots__ = ("latest", "stored")
+
+    def __init__(self, latest: float):
+        self.latest = latest
+        self.stored: Optional[float] = None
+
+
+class LastSeenTracker:
+    """
+    Write-behind `last_seen` for group_users.
+
+    touch() only updates memory. A (group, user) is written when its newest
+    activity is at least `granularity` seconds newer than the value last
+    written, so an active member costs one write per granularity period
+    instead of one per message. Writes use $max, so a late flush never moves
+    last_seen backwards.
+
+    Readers that need exact values (cleanup, activity reports) overlay
+    peek()/fresh() on what they read from MongoDB.
+    """
+
+    def __init__(self, granularity: float, flush_interval: float, max_tracked: int):
+        self.granularity = granularity
+        self.flush_interval = flush_interval
+        self.max_tracked = max_tracked
+
+        self._seen: "OrderedDict[Tuple[int, int], _Seen]" = OrderedDict()
+        self._dirty: set = set()
+
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "touches": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "ops_written": 0,
+            "flush_errors": 0,
+            "evicted": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    # ==================== Producers ====================
+
+    def touch(self, group_id: int, user_id: int, now: Optional[float] = None):
+        """Record activity of a member (O(1), no I/O)."""
+        now = time.time() if now is None else now
+        key = (group_id, user_id)
+        self.stats["touches"] += 1
+
+        entry = self._seen.get(key)
+        if entry is None:
+            self._seen[key] = _Seen(now)
+            self._dirty.add(key)
+            return
+
+        if now > entry.latest:
+            entry.latest = now
+        self._seen.move_to_end(key)
+        if key in self._dirty:
+            self.stats["coalesced"] += 1
+        elif entry.stored is None or entry.latest - entry.stored >= self.granularity:
+            self._dirty.add(key)
+        else:
+            self.stats["coalesced"] += 1
+
+    # ==================== Readers ====================
+
+    def peek(self, group_id: int, user_id: int) -> Optional[datetime]:
+        """Newest activity known in memory (possibly not written yet)."""
+        entry = self._seen.get((group_id, user_id))
+        if entry is None:
+            return None
+        return datetime.fromtimestamp(entry.latest, timezone.utc)
+
+    def fresh(self, group_id: int, user_id: int, stored: Optional[datetime]) -> Optional[datetime]:
+        """Newer of a value read from MongoDB and the in-memory one."""
+        latest = self.peek(group_id, user_id)
+        if stored is not None and stored.tzinfo is None:
+            stored = stored.replace(tzinfo=timezone.utc)
+        if latest is None or (stored is not None and stored >= latest):
+            return stored
+        return latest
+
+    # ==================== Flushing ====================
+
+    async def flush(self):
+        """Write members whose activity moved past the granularity."""
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, set()
+            written = {key: self._seen[key].latest for key in dirty if key in self._seen}
+            if not written:
+                return
+
+            operations = [
+                UpdateOne(
+                    {"group_id": group_id, "user_id": user_id},
+                    {
+                        "$max": {"last_seen": datetime.fromtimestamp(latest, timezone.utc)},
+                        "$setOnInsert": JOIN_DEFAULTS
+                    },
+                    upsert=True
+                )
+                for (group_id, user_id), latest in written.items()
+            ]
+
+            started = time.perf_counter()
+            try:
+                await get_group_users_collection().bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                self.stats["flush_errors"] += 1
+                logger.error(f"Last seen bulk write had {len(errors)} errors: {errors[:3]}")
+            except PyMongoError as e:
+                # Transient failure: retry with the next flush
+                self.stats["flush_errors"] += 1
+                logger.error(f"Last seen flush failed, requeueing {len(written)} members: {e}")
+                self._dirty |= written.keys()
+                return
+
+            for key, latest in written.items():
+                entry = self._seen.get(key)
+                if entry is not None:
+                    entry.stored = latest
+
+            self._evict()
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["flushes"] += 1
+            self.stats["ops_written"] += len(operations)
+            self.stats["last_flush_ms"] = round(elapsed_ms, 2)
+
+    def _evict(self):
+        """Drop least recently active members (unwritten ones are kept)."""
+        for _ in range(len(self._seen) - self.max_tracked):
+            key, entry = self._seen.popitem(last=False)
+            if key in self._dirty:
+                self._seen[key] = entry
+            else:
+                self.stats["evicted"] += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Last seen tracker error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop background flushing and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "tracked": len(self._seen), "pending": len(self._dirty)}
+
+
+# ==================== Invite Link Tags ====================
+_LINK_TAG_TTL = 300
+_LINK_TAG_MAX = 10000
+_link_tags: "OrderedDict[Tuple[int, str], Tuple[Optional[str], float]]" = OrderedDict()
+
+
+async def get_invite_link_tag(group_id: int, link_id: str) -> Optional[str]:
+    """Get the tag of an invite link (cached, None if untagged/unknown)."""
+    key = (group_id, link_id)
+    cached = _link_tags.get(key)
+    now = time.monotonic()
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    link_doc = await get_invite_links_collection().find_one(
+        {"group_id": group_id, "link_id": link_id},
+        {"tag": 1}
+    )
+    tag = link_doc.get("tag") if link_doc else None
+
+    _link_tags[key] = (tag, now + _LINK_TAG_TTL)
+    _link_tags.move_to_end(key)
+    if len(_link_tags) > _LINK_TAG_MAX:
+        _link_tags.popitem(last=False)
+    return tag
+
+
+def forget_invite_link_tag(group_id: int, link_id: str):
+    """Call after changing a link's tag."""
+    _link_tags.pop((group_id, link_id), None)
+
+
+# ==================== Global Writer Instance ====================
+join_writer = JoinTrackingWriter(
+    batch_size=settings.JOIN_WRITER_BATCH_SIZE,
+    flush_interval=settings.JOIN_WRITER_FLUSH_INTERVAL,
+    max_pending=settings.JOIN_WRITER_MAX_PENDING
+)
+join_dedup = JoinEventDeduper()
+last_seen_tracker = LastSeenTracker(
+    granularity=settings.LAST_SEEN_GRANULARITY,
+    flush_interval=settings.LAST_SEEN_FLUSH_INTERVAL,
+    max_tracked=settings.LAST_SEEN_MAX_TRACKED
+)
+
+
+def touch_last_seen(group_id: int, user_id: int):
+    """Record member activity (written behind by last_seen_tracker)."""
+    last_seen_tracker.touch(group_id, user_id)
+
+
+def start_join_writer():
+    """Start background flushing (call after init_database())."""
+    join_writer.start()
+    last_seen_tracker.start()
+
+
+async def stop_join_writer():
+    """Flush pending join-tracking and last seen writes (call before close_database())."""
+    await join_writer.stop()
+    await last_seen_tracker.stop()
+
+
+def get_join_writer_stats() -> Dict[str, Any]:
+    """Flush timings, coalesced events, queue size, join dedup and last seen counters."""
+    return {
+        **join_writer.get_stats(),
+        "dedup": join_dedup.get_stats(),
+        "last_seen": last_seen_tracker.get_stats(),
+    }
+
+
+# ==================== Export ====================
+__all__ = [
+    "JOIN_DEFAULTS",
+    "JoinTrackingWriter",
+    "join_writer",
+    "JoinEventDeduper",
+    "join_dedup",
+    "LastSeenTracker",
+    "last_seen_tracker",
+    "touch_last_seen",
+    "get_invite_link_tag",
+    "forget_invite_link_tag",
+    "start_join_writer",
+    "stop_join_writer",
+    "get_join_writer_stats",
+]
@@ -0,0 +1,163 @@
+"""
+Welcome Service
+Greets new members with one combined message per burst of joins.
+
+A join in a quiet group is greeted right away with a per-user message.
+Joins arriving within WELCOME_WINDOW seconds of the last greeting are
+collected and greeted together when the window ends, with at most
+WELCOME_MAX_MENTIONS mentions ("and N more" for the rest). A burst of 200
+joins therefore costs one message per window instead of 200 (and no
+FloodWait); groups in raid mode are not greeted at all (see join_handler).
+
+Per-group settings (groups.settings):
+- welcome          greet new members (default off)
+- welcome_text     custom text; placeholders {mentions}, {count}, {group}
+- welcome_clean    delete the previous greeting when sending a new one
+
+Messages go through the outbound scheduler (INFO lane).
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from pyrogram import Client
+from pyrogram.types import User
+
+from config.settings import settings
+from i18n.loader import _
+from services.group_service import GroupConfig
+from services.outbound import Priority, send_message, submit
+
+
+class _GroupState:
+    __slots__ = ("last_at", "message_id", "pending", "flush")
+
+    def __init__(self):
+        self.last_at = 0.0
+        self.message_id: Optional[int] = None
+        self.pending: Dict[int, str] = {}
+        self.flush: Optional[asyncio.TimerHandle] = None
+
+
+class WelcomeAggregator:
+    """Coalesces join greetings per group over a short window."""
+
+    def __init__(self, window: float, max_mentions: int):
+        self.window = window
+        self.max_mentions = max_mentions
+        self._groups: Dict[int, _GroupState] = {}
+        self._next_sweep = 0.0
+        self.stats = {"joins": 0, "messages": 0, "deleted": 0}
+
+    def add(self, client: Client, config: GroupConfig, title: str, users: List[User]):
+        """Greet users that joined a group (now, or with the current burst)."""
+        if not users or not config.settings.get("welcome", False):
+            return
+
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        state = self._groups.get(config.group_id)
+        if state is None:
+            state = self._groups[config.group_id] = _GroupState()
+
+        self.stats["joins"] += len(users)
+        for user in users:
+            state.pending[user.id] = user.mention
+
+        if state.flush is not None:
+            return
+        delay = state.last_at + self.window - now
+        if delay <= 0:
+            self._flush(client, config, title)
+        else:
+            state.flush = asyncio.get_running_loop().call_later(delay, self._flush, client, config, title)
+
+    def _flush(self, client: Client, config: GroupConfig, title: str):
+        state = self._groups.get(config.group_id)
+        if state is None or not state.pending:
+            return
+        mentions = list(state.pending.values())
+        state.pending = {}
+        state.flush = None
+        state.last_at = time.monotonic()
+
+        group_id = config.group_id
+        if state.message_id is not None:
+            # Same lane as the new greeting, so it is deleted first
+            previous, state.message_id = state.message_id, None
+            submit(group_id, lambda: client.delete_messages(group_id, previous), Priority.INFO, label="delete_welcome")
+            self.stats["deleted"] += 1
+
+        sent = send_message(client, group_id, self.render(config, title, mentions), Priority.INFO)
+        if config.settings.get("welcome_clean", False):
+            sent.add_done_callback(lambda future: self._sent(group_id, future))
+        self.stats["messages"] += 1
+
+    def _sent(self, group_id: int, future: asyncio.Future):
+        """Remember the greeting so the next one can delete it (welcome_clean)."""
+        state = self._groups.get(group_id)
+        if state is None or future.cancelled() or future.exception() is not None or future.result() is None:
+            return
+        state.message_id = future.result().id
+
+    def render(self, config: GroupConfig, title: str, mentions: List[str]) -> str:
+        """Greeting text for a batch of mentions."""
+        group_id, language = config.group_id, config.language
+        shown = mentions[:self.max_mentions]
+        text = ", ".join(shown)
+        if len(mentions) > len(shown):
+            text += " " + _(group_id, "welcome.more", language, count=len(mentions) - len(shown))
+
+        custom = config.settings.get("welcome_text")
+        if custom:
+            try:
+                return custom.format(mentions=text, count=len(mentions), group=title)
+            except (KeyError, IndexError, ValueError):
+                pass
+        if len(mentions) == 1:
+            return _(group_id, "welcome.single", language, mention=text, group=title)
+        return _(group_id, "welcome.multiple", language, mentions=text, group=title)
+
+    def _sweep(self, now: float):
+        """Forget quiet groups (keeping greetings that are still to be deleted)."""
+        self._next_sweep = now + max(self.window, 60.0)
+        idle = [
+            group_id for group_id, state in self._groups.items()
+            if state.flush is None and state.message_id is None and now - state.last_at >= self.window
+        ]
+        for group_id in idle:
+            del self._groups[group_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "groups": len(self._groups),
+            "pending": sum(len(state.pending) for state in self._groups.values()),
+        }
+
+
+# ==================== Global Aggregator ====================
+welcome_aggregator = WelcomeAggregator(
+    window=settings.WELCOME_WINDOW,
+    max_mentions=settings.WELCOME_MAX_MENTIONS
+)
+
+
+def welcome_users(client: Client, config: GroupConfig, title: str, users: List[User]):
+    """Queue greetings for new members (no-op unless the group enabled welcome)."""
+    welcome_aggregator.add(client, config, title, users)
+
+
+def get_welcome_stats() -> Dict[str, Any]:
+    return welcome_aggregator.get_stats()
+
+
+__all__ = [
+    "WelcomeAggregator",
+    "welcome_aggregator",
+    "welcome_users",
+    "get_welcome_stats",
+]
@@ -0,0 +1,32 @@
+"""
+Test Configuration
+Import paths and placeholder settings for the unit tests.
+
+Run from bot-core/:
+    python -m pytest -q tests
+
+The tests cover pure, in-memory components (no Telegram or MongoDB
+connection); credentials only need to be present for config.settings.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# bot-core packages, shared storage layouts and bot-modules (plain directory of packages)
+sys.path.insert(0, str(ROOT / "bot-core"))
+sys.path.append(str(ROOT / "database-migrations"))
+sys.path.append(str(ROOT / "bot-modules"))
+
+for name, value in {
+    "API_ID": "1",
+    "API_HASH": "test",
+    "BOT_TOKEN": "test",
+    "BOT_USERNAME": "testbot",
+    "SUPPORT_USERNAME": "support",
+    "API_SECRET_KEY": "test",
+    "SUDO_USERS": "[1]",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,33 @@
+"""
+Admin Roster Tests
+Cached Telegram admin lists (services/admin_roster.py).
+"""
+
+import asyncio
+
+from models.permission import Role
+from services.admin_roster import AdminRosterCache
+
+
+def test_waiters_survive_a_cancelled_load():
+    async def scenario():
+        roster, loads = AdminRosterCache(max_size=10, ttl=60), []
+
+        async def load(client, group_id):
+            loads.append(group_id)
+            await asyncio.sleep(0.05)
+            return {7: Role.OWNER}
+
+        roster._load = load
+        loader = asyncio.create_task(roster.get(None, 1))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(roster.get(None, 1))
+        await asyncio.sleep(0)
+
+        loader.cancel()
+        admins = await asyncio.wait_for(waiter, timeout=1)
+        return admins, loads
+
+    admins, loads = asyncio.run(scenario())
+    assert admins == {7: Role.OWNER}
+    assert loads == [1, 1]
@@ -0,0 +1,65 @@
+"""
+Aho-Corasick Tests
+Multi-pattern matching (utils/aho_corasick.py).
+"""
+
+import pytest
+
+from utils.aho_corasick import AhoCorasick
+
+
+def _matches(automaton, text):
+    return sorted(automaton.iter_matches(text))
+
+
+def test_overlapping_matches():
+    automaton = AhoCorasick()
+    for word in ("he", "she", "his", "hers"):
+        automaton.add(word)
+    automaton.build()
+
+    assert _matches(automaton, "ushers") == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_values_are_returned():
+    automaton = AhoCorasick()
+    automaton.add("spam", ("word", "Spam"))
+    automaton.add("example.com", ("domain", "example.com"))
+    automaton.build()
+
+    values = [value for _, _, value in automaton.iter_matches("buy spam at example.com")]
+    assert values == [("word", "Spam"), ("domain", "example.com")]
+
+
+def test_no_match_and_empty_pattern():
+    automaton = AhoCorasick()
+    automaton.add("")
+    automaton.add("abc")
+    automaton.build()
+
+    assert len(automaton) == 1
+    assert _matches(automaton, "ababab") == []
+    assert _matches(automaton, "xxabcabc") == [(2, 5, "abc"), (5, 8, "abc")]
+
+
+def test_add_after_build_fails():
+    automaton = AhoCorasick().build()
+    with pytest.raises(RuntimeError):
+        automaton.add("late")
+
+
+def test_matches_brute_force():
+    patterns = ["a", "ab", "bab", "bc", "bca", "c", "caa"]
+    automaton = AhoCorasick()
+    for pattern in patterns:
+        automaton.add(pattern)
+    automaton.build()
+
+    text = "abccab" * 3 + "bcaab"
+    expected = sorted(
+        (start, start + len(pattern), pattern)
+        for pattern in patterns
+        for start in range(len(text))
+        if text.startswith(pattern, start)
+    )
+    assert _matches(automaton, text) == expected
@@ -0,0 +1,79 @@
+"""
+Admin Action Monitor Tests
+Sliding windows of admin moderation actions (bot-modules/antibetra/monitor.py).
+"""
+
+from antibetra.monitor import BAN, DEMOTE, KICK, ActionLimits, AdminActionMonitor
+
+
+LIMITS = ActionLimits(window=60.0, max_removals=3, max_demotions=2)
+
+
+def test_removals_trip_on_the_limit():
+    monitor = AdminActionMonitor()
+    assert monitor.record(1, 10, BAN, LIMITS, now=0.0) is None
+    assert monitor.record(1, 10, KICK, LIMITS, now=1.0) is None
+
+    trip = monitor.record(1, 10, BAN, LIMITS, now=2.0)
+    assert tuple(trip) == ("removals", 3, 3)
+    assert monitor.get_stats()["trips"] == 1
+
+
+def test_demotions_have_their_own_limit():
+    monitor = AdminActionMonitor()
+    monitor.record(1, 10, BAN, LIMITS, now=0.0)
+    monitor.record(1, 10, BAN, LIMITS, now=0.0)
+    assert monitor.record(1, 10, DEMOTE, LIMITS, now=1.0) is None
+    assert monitor.record(1, 10, DEMOTE, LIMITS, now=2.0).kind == "demotions"
+
+
+def test_actions_leave_the_window():
+    monitor = AdminActionMonitor()
+    monitor.record(1, 10, BAN, LIMITS, now=0.0)
+    monitor.record(1, 10, BAN, LIMITS, now=10.0)
+    assert monitor.record(1, 10, BAN, LIMITS, now=61.0) is None
+    assert monitor.record(1, 10, BAN, LIMITS, now=62.0) is not None
+
+
+def test_admins_and_groups_are_separate_and_limit_zero_is_off():
+    monitor = AdminActionMonitor()
+    for admin_id in (10, 11):
+        for _ in range(2):
+            assert monitor.record(1, admin_id, BAN, LIMITS, now=0.0) is None
+    assert monitor.record(2, 10, BAN, LIMITS, now=0.0) is None
+
+    off = ActionLimits(window=60.0, max_removals=0, max_demotions=0)
+    assert all(monitor.record(3, 10, BAN, off, now=0.0) is None for _ in range(10))
+
+
+def test_forget_resets_the_window():
+    monitor = AdminActionMonitor()
+    monitor.record(1, 10, BAN, LIMITS, now=0.0)
+    monitor.record(1, 10, BAN, LIMITS, now=0.0)
+    monitor.forget(1, 10)
+    assert monitor.record(1, 10, BAN, LIMITS, now=1.0) is None
+
+
+def test_snapshot_restore_round_trip():
+    monitor = AdminActionMonitor()
+    monitor.record(1, 10, BAN, LIMITS, now=100.0)
+    monitor.record(1, 10, DEMOTE, LIMITS, now=101.0)
+    monitor.record(1, 11, KICK, LIMITS, now=10.0)
+    assert sorted(monitor.take_dirty()) == [1]
+
+    snapshot = monitor.snapshot(1, now=120.0)
+    # Admin 11's kick expired
+    assert snapshot == {"10": {"window": 60.0, BAN: [100.0], DEMOTE: [101.0]}}
+
+    restored = AdminActionMonitor()
+    restored.restore(1, snapshot, now=120.0)
+    restored.record(1, 10, BAN, LIMITS, now=121.0)
+    assert tuple(restored.record(1, 10, KICK, LIMITS, now=122.0)) == ("removals", 3, 3)
+
+
+def test_tracked_admins_are_bounded():
+    monitor = AdminActionMonitor(max_keys=2)
+    for admin_id in (10, 11, 12):
+        monitor.record(1, admin_id, BAN, LIMITS, now=0.0)
+    assert monitor.get_stats()["tracked"] == 2
+    assert monitor.get_stats()["evicted"] == 1
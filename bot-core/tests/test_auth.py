@@ -1,5 +1,176 @@
 """
-test_auth.py
+Auth Tests
+Manifest requirements, compiled grants and their enforcement in the
+AuthMiddleware (services/permission_service.py, middlewares/auth_middleware.py).
 """
 
-# TODO: Implement
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pyrogram import ContinuePropagation, StopPropagation
+from pyrogram.enums import ChatType
+
+import middlewares.auth_middleware as auth_middleware
+from models.permission import Permission, Role, compile_permissions, parse_requirement
+from routers.command_router import command_router
+from routers.module_loader import ModuleManifest
+from services.group_service import GroupConfig
+from services.permission_service import PermissionResolver, _Entry, register_requirements
+from utils.filters import parse_command
+
+
+MODULES_DIR = Path(__file__).resolve().parents[2] / "bot-modules"
+GROUP_ID = -100123
+
+
+def test_manifest_requirements_parse():
+    declared = {}
+    for path in sorted(MODULES_DIR.glob("*/manifest.json")):
+        manifest = ModuleManifest(json.loads(path.read_text(encoding="utf-8")))
+        for key, name in manifest.permissions.items():
+            assert key in manifest.commands or key in manifest.callback_prefixes
+            declared[key] = parse_requirement(name)
+
+    assert declared["clean_execute"].role == Role.ADMIN
+    assert declared["cleanup"].role == Role.ADMIN
+    assert declared["rantibetra"].role == Role.OWNER
+    assert declared["stats"].bits == Permission.REPORTS.value
+
+
+def test_admin_grant_applies_template_and_overrides():
+    config = GroupConfig(GROUP_ID, {"group_id": GROUP_ID, "owner_user_id": 2}, [], {
+        "default_bot_permissions": {"bot_ban": True, "bot_kick": True, "bot_reports": False},
+    })
+    resolver = PermissionResolver(max_size=10, ttl=60)
+    mask, value = compile_permissions({"bot_kick": False, "bot_reports": True})
+    resolver._store((GROUP_ID, 5), _Entry(Role.ADMIN, mask, value))
+
+    grant = resolver.lookup(config, 5)
+    assert grant.role == Role.ADMIN
+    assert grant.allows(parse_requirement("ban"))
+    assert grant.allows(parse_requirement("reports"))
+    assert not grant.allows(parse_requirement("kick"))
+    assert not grant.allows(parse_requirement("owner"))
+
+    assert resolver.lookup(config, 2).role == Role.OWNER
+    # Telegram admins without a stored role still get the template
+    resolver._store((GROUP_ID, 6), _Entry(Role.MEMBER, 0, 0))
+    assert resolver.lookup(config, 6, Role.ADMIN).allows(parse_requirement("kick"))
+    assert resolver.lookup(config, 6).role == Role.MEMBER
+
+
+def test_grant_waiters_survive_a_cancelled_load():
+    config = GroupConfig(GROUP_ID, {"group_id": GROUP_ID}, [], None)
+
+    async def scenario():
+        resolver, loads = PermissionResolver(max_size=10, ttl=60), []
+
+        async def load(group_id, user_id):
+            loads.append(user_id)
+            await asyncio.sleep(0.05)
+            return _Entry(Role.MEMBER, 0, 0)
+
+        resolver._load = load
+        loader = asyncio.create_task(resolver.get(config, 5))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(resolver.get(config, 5))
+        await asyncio.sleep(0)
+
+        loader.cancel()
+        grant = await asyncio.wait_for(waiter, timeout=1)
+        return grant, loads
+
+    grant, loads = asyncio.run(scenario())
+    assert grant.role == Role.MEMBER
+    assert loads == [5, 5]
+
+
+# ==================== Middleware ====================
+
+@pytest.fixture
+def auth(monkeypatch):
+    """AuthMiddleware with clean_execute registered (admin only) and a fixed role per user."""
+    roles = {}
+
+    async def get_group_config(group_id):
+        return GroupConfig(group_id, {"group_id": group_id}, [], None)
+
+    async def get_chat_role(client, group_id, user_id):
+        return roles.get(user_id, Role.MEMBER)
+
+    async def get_grant(config, user_id, chat_role):
+        return PermissionResolver(max_size=1, ttl=60)._compile(config, _Entry(Role.MEMBER, 0, 0), chat_role)
+
+    monkeypatch.setattr(auth_middleware, "get_group_config", get_group_config)
+    monkeypatch.setattr(auth_middleware, "get_chat_role", get_chat_role)
+    monkeypatch.setattr(auth_middleware.permission_resolver, "get", get_grant)
+    monkeypatch.setattr(auth_middleware, "denial_message", lambda *args: "denied")
+
+    async def loader():
+        pass
+
+    command_router.add_lazy(["clean_execute"], loader)
+    register_requirements({"clean_execute": "admin"})
+    yield auth_middleware.AuthMiddleware(), roles
+    command_router.discard_lazy(["clean_execute"])
+
+
+def _message(text, user_id=5):
+    replies = []
+
+    async def reply(text):
+        replies.append(text)
+
+    message = SimpleNamespace(
+        text=text,
+        command=None,
+        chat=SimpleNamespace(id=GROUP_ID, type=ChatType.SUPERGROUP),
+        from_user=SimpleNamespace(id=user_id),
+        reply=reply,
+    )
+    return message, replies
+
+
+def _check(middleware, message):
+    try:
+        asyncio.run(middleware._check(None, message))
+    except ContinuePropagation:
+        return "continue"
+    except StopPropagation:
+        return "stop"
+
+
+def test_denied_command_is_answered_and_dropped(auth):
+    middleware, _ = auth
+    message, replies = _message("/clean_execute inactive")
+    assert _check(middleware, message) == "stop"
+    assert replies == ["denied"]
+
+
+def test_allowed_command_continues(auth):
+    middleware, roles = auth
+    roles[5] = Role.ADMIN
+    message, replies = _message("/clean_execute inactive")
+    assert _check(middleware, message) == "continue"
+    assert replies == []
+    assert parse_command(message).key == "clean_execute"
+
+
+def test_denied_prefixless_text_continues_as_plain_text(auth):
+    middleware, _ = auth
+    message, replies = _message("clean_execute is what admins do")
+    assert _check(middleware, message) == "continue"
+    assert replies == []
+    # The command router no longer sees a command in it
+    assert parse_command(message) is None
+    assert message.command is None
+
+
+def test_unrestricted_text_continues(auth):
+    middleware, _ = auth
+    message, replies = _message("hello there")
+    assert _check(middleware, message) == "continue"
+    assert replies == []
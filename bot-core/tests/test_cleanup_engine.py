@@ -0,0 +1,59 @@
+"""
+Cleanup Engine Tests
+Member removal of the cleanup module (bot-modules/cleanup/engine.py).
+"""
+
+import asyncio
+
+from pyrogram.errors import BadRequest, UserNotParticipant
+
+import cleanup.engine as engine
+from cleanup.engine import UNBAN_ATTEMPTS, CleanupEngine, KickPacer
+
+
+class _Client:
+    def __init__(self, ban_error=None, unban_errors=()):
+        self.ban_error = ban_error
+        self.unban_errors = list(unban_errors)
+        self.calls = []
+
+    async def ban_chat_member(self, group_id, user_id):
+        self.calls.append("ban")
+        if self.ban_error:
+            raise self.ban_error
+
+    async def unban_chat_member(self, group_id, user_id):
+        self.calls.append("unban")
+        if self.unban_errors:
+            raise self.unban_errors.pop(0)
+
+
+def _kick(monkeypatch, client):
+    async def submit(chat_id, call, priority, label):
+        return await call()
+
+    monkeypatch.setattr(engine, "submit", submit)
+    return asyncio.run(CleanupEngine()._kick(client, 1, 2, KickPacer(per_minute=60_000)))
+
+
+def test_kick_is_ban_and_unban(monkeypatch):
+    client = _Client()
+    assert _kick(monkeypatch, client) == "kicked"
+    assert client.calls == ["ban", "unban"]
+
+
+def test_failed_unban_is_retried_without_banning_again(monkeypatch):
+    client = _Client(unban_errors=[BadRequest("temporary")])
+    assert _kick(monkeypatch, client) == "kicked"
+    assert client.calls == ["ban", "unban", "unban"]
+
+
+def test_member_left_banned_when_unban_keeps_failing(monkeypatch):
+    client = _Client(unban_errors=[BadRequest("broken")] * UNBAN_ATTEMPTS)
+    assert _kick(monkeypatch, client) == "banned"
+    assert client.calls == ["ban"] + ["unban"] * UNBAN_ATTEMPTS
+
+
+def test_ban_outcomes(monkeypatch):
+    assert _kick(monkeypatch, _Client(ban_error=UserNotParticipant())) == "gone"
+    assert _kick(monkeypatch, _Client(ban_error=BadRequest("nope"))) == "failed"
@@ -0,0 +1,50 @@
+"""
+Command Parsing Tests
+First-token parsing of commands (utils/filters.py).
+"""
+
+from utils.filters import _BOT_USERNAME, _normalize_prefixes, _parse
+
+
+PREFIXES = _normalize_prefixes(["/", "!", ""])
+
+
+def test_prefixes_longest_first_empty_last():
+    prefixes = _normalize_prefixes(["", "/", "!!", "!", "/"])
+    assert prefixes[0] == "!!"
+    assert prefixes[-1] == ""
+    assert sorted(prefixes) == ["", "!", "!!", "/"]
+    assert _normalize_prefixes("/") == ("/",)
+
+
+def test_slash_command_with_args():
+    parsed = _parse("/Ban @spammer 2d", PREFIXES)
+    assert parsed.prefix == "/"
+    assert parsed.name == "Ban"
+    assert parsed.key == "ban"
+    assert parsed.mention is None
+    assert parsed.args == "@spammer 2d"
+
+
+def test_prefixless_command():
+    parsed = _parse("ban this spam", PREFIXES)
+    assert parsed.prefix == ""
+    assert parsed.key == "ban"
+    assert parsed.args == "this spam"
+
+
+def test_mention_of_this_bot():
+    parsed = _parse(f"/stats@{_BOT_USERNAME.upper()}", PREFIXES)
+    assert parsed.key == "stats"
+    assert parsed.mention == _BOT_USERNAME.upper()
+
+
+def test_mention_of_another_bot_is_ignored():
+    assert _parse("/stats@otherbot", PREFIXES) is None
+
+
+def test_not_a_command():
+    assert _parse("", PREFIXES) is None
+    assert _parse("   ", PREFIXES) is None
+    assert _parse("/", PREFIXES) is None
+    assert _parse("hello", ("/",)) is None
@@ -0,0 +1,101 @@
+"""
+Flood Detector Tests
+Sliding-window burst and duplicate detection (bot-modules/anti_spam/flood.py).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import anti_spam.commands as commands
+from anti_spam.flood import STICKER, TEXT, FloodDetector, FloodLimits, content_hash
+
+
+def test_content_hash_normalizes_text():
+    assert content_hash("B U Y!!") == content_hash("buy")
+    assert content_hash("Buy​ now") == content_hash("buynow")
+    assert content_hash("hello") != content_hash("world")
+    assert content_hash(None) == 0
+    assert content_hash("text", media_id="file-1") == content_hash(None, media_id="file-1")
+
+
+def test_flood_limit_within_window():
+    detector = FloodDetector()
+    limits = FloodLimits(window=10.0, flood_limit=3, duplicate_limit=0)
+
+    verdicts = [detector.check(1, 2, limits, now=float(second)) for second in range(4)]
+    assert verdicts[:3] == [None, None, None]
+    assert verdicts[3].reason == "flood"
+    assert (verdicts[3].count, verdicts[3].limit) == (4, 3)
+
+
+def test_old_messages_expire():
+    detector = FloodDetector()
+    limits = FloodLimits(window=10.0, flood_limit=3, duplicate_limit=0)
+
+    for second in (0.0, 1.0, 2.0):
+        assert detector.check(1, 2, limits, now=second) is None
+    # The first message left the window
+    assert detector.check(1, 2, limits, now=10.5) is None
+
+
+def test_duplicates_and_kind_limits():
+    detector = FloodDetector()
+    limits = FloodLimits(window=10.0, flood_limit=0, duplicate_limit=2, kind_limits=((STICKER, 1),))
+
+    digest = content_hash("same text")
+    assert detector.check(1, 2, limits, digest=digest, now=0.0) is None
+    assert detector.check(1, 2, limits, digest=digest, now=1.0) is None
+    assert detector.check(1, 2, limits, digest=digest, now=2.0).reason == "duplicate"
+
+    assert detector.check(1, 3, limits, kind=STICKER, now=0.0) is None
+    assert detector.check(1, 3, limits, kind=STICKER, now=1.0).reason == STICKER
+
+
+def test_group_duplicates_across_senders():
+    detector = FloodDetector()
+    limits = FloodLimits(window=10.0, flood_limit=0, duplicate_limit=0, group_duplicate_limit=2)
+
+    digest = content_hash("join my channel")
+    verdicts = [detector.check(1, user_id, limits, kind=TEXT, digest=digest, now=0.0) for user_id in (10, 11, 12)]
+    assert verdicts[:2] == [None, None]
+    assert verdicts[2].reason == "raid_duplicate"
+    # Other groups are counted separately
+    assert detector.check(2, 10, limits, digest=digest, now=0.0) is None
+
+
+def test_idle_senders_are_evicted():
+    detector = FloodDetector(idle_ttl=60.0, sweep_every=1)
+    limits = FloodLimits()
+
+    detector.check(1, 2, limits, now=0.0)
+    detector.check(1, 3, limits, now=100.0)
+    assert len(detector) == 1
+
+
+def test_check_flood_spares_exempt_senders(monkeypatch):
+    punished, admins = [], {7}
+
+    async def get_module_settings(group_id, key):
+        return {"flood_window": 10, "flood_limit": 2, "duplicate_message_limit": 0}
+
+    async def is_exempt(client, message):
+        return message.from_user.id in admins
+
+    async def apply_action(client, message, violation):
+        punished.append(message.from_user.id)
+
+    monkeypatch.setattr(commands, "detector", FloodDetector())
+    monkeypatch.setattr(commands, "get_module_settings", get_module_settings)
+    monkeypatch.setattr(commands, "is_exempt", is_exempt)
+    monkeypatch.setattr(commands, "apply_action", apply_action)
+
+    def message(user_id, text):
+        return SimpleNamespace(
+            chat=SimpleNamespace(id=1), from_user=SimpleNamespace(id=user_id), text=text,
+            forward_date=None, sticker=None, animation=None, media=None, caption=None,
+        )
+
+    for index in range(3):
+        for user_id in (7, 9):
+            asyncio.run(commands.check_flood(None, message(user_id, f"hi {index}")))
+    assert punished == [9]
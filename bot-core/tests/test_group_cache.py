@@ -0,0 +1,52 @@
+"""
+Group Config Cache Tests
+Single-flight loads of the group config cache (services/group_service.py).
+"""
+
+import asyncio
+
+from services.group_service import GroupConfig, GroupConfigCache
+
+
+def test_waiters_survive_a_cancelled_load():
+    async def scenario():
+        cache, loads = GroupConfigCache(max_size=10, ttl=60), []
+
+        async def load(group_id):
+            loads.append(group_id)
+            await asyncio.sleep(0.05)
+            return GroupConfig(group_id, {"group_id": group_id}, [])
+
+        cache._load = load
+        loader = asyncio.create_task(cache.get(1))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get(1))
+        await asyncio.sleep(0)
+
+        loader.cancel()
+        config = await asyncio.wait_for(waiter, timeout=1)
+        return loader.cancelled(), config, loads
+
+    cancelled, config, loads = asyncio.run(scenario())
+    assert cancelled
+    # The waiter loaded the config itself instead of hanging
+    assert config.group_id == 1
+    assert loads == [1, 1]
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache, loads = GroupConfigCache(max_size=10, ttl=60), []
+
+        async def load(group_id):
+            loads.append(group_id)
+            await asyncio.sleep(0.01)
+            return GroupConfig(group_id, {"group_id": group_id}, [])
+
+        cache._load = load
+        configs = await asyncio.gather(*(cache.get(1) for _ in range(5)))
+        return configs, loads
+
+    configs, loads = asyncio.run(scenario())
+    assert loads == [1]
+    assert all(config is configs[0] for config in configs)
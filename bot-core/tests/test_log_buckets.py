@@ -0,0 +1,58 @@
+"""
+Log Bucket Tests
+Bucket layout and upserts of the event log (database-migrations/log_buckets.py).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from log_buckets import bucket_start, bucket_updates, compact_event, expand_event
+
+
+T0 = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def _events(count, group_id=-100, event_type="ban", start=T0, step=timedelta(seconds=1)):
+    return [(group_id, event_type, start + step * index, 1, 2, None) for index in range(count)]
+
+
+def test_bucket_start():
+    assert bucket_start(T0 + timedelta(minutes=59, seconds=59), 60) == T0
+    assert bucket_start(T0 + timedelta(minutes=17), 15) == T0 + timedelta(minutes=15)
+    # Naive datetimes are UTC
+    assert bucket_start(datetime(2024, 5, 1, 10, 30), 60) == T0
+
+
+def test_compact_round_trip():
+    ts = T0 + timedelta(seconds=125, milliseconds=34)
+    event = compact_event(ts, T0, actor_id=111, data={"reason": "spam"})
+    assert event == {"o": 125034, "a": 111, "d": {"reason": "spam"}}
+
+    entry = expand_event({"group_id": -100, "type": "ban", "bucket_start": T0}, event)
+    assert entry["timestamp"] == ts
+    assert (entry["actor_id"], entry["target_id"], entry["data"]) == (111, None, {"reason": "spam"})
+
+
+def test_one_upsert_per_bucket_and_type():
+    events = _events(3) + _events(2, event_type="kick") + _events(1, start=T0 + timedelta(hours=1))
+    operations = bucket_updates(events, minutes=60)
+
+    filters = [(op._filter["type"], op._filter["bucket_start"]) for op in operations]
+    assert filters == [("ban", T0), ("kick", T0), ("ban", T0 + timedelta(hours=1))]
+
+    first = operations[0]._doc
+    assert first["$inc"] == {"count": 3}
+    assert len(first["$push"]["events"]["$each"]) == 3
+    assert first["$min"] == {"first_ts": T0}
+    assert first["$max"] == {"last_ts": T0 + timedelta(seconds=2)}
+    assert first["$setOnInsert"] == {"bucket_end": T0 + timedelta(hours=1)}
+
+
+def test_chunks_only_go_to_buckets_with_room():
+    operations = bucket_updates(_events(25), minutes=60, max_events=10)
+
+    sizes = [op._doc["$inc"]["count"] for op in operations]
+    assert sizes == [10, 10, 5]
+    for op, size in zip(operations, sizes):
+        # A matched bucket never ends up above max_events
+        assert op._filter["count"] == {"$lte": 10 - size}
+        assert op._upsert
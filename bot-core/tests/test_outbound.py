@@ -0,0 +1,143 @@
+"""
+Outbound Scheduler Tests
+Prioritized, paced queue of outgoing API calls (services/outbound.py).
+"""
+
+import asyncio
+import time
+
+from pyrogram.errors import FloodWait
+
+from services.outbound import OutboundScheduler, Priority
+
+
+def _scheduler(**overrides):
+    options = dict(
+        global_per_second=1000,
+        chat_per_minute=60_000,
+        chat_burst=100,
+        max_concurrency=4,
+        max_retries=2,
+        max_pending=100,
+    )
+    options.update(overrides)
+    return OutboundScheduler(**options)
+
+
+def _call(log, name, result=None):
+    async def call():
+        log.append(name)
+        return result
+    return call
+
+
+def test_lanes_run_in_priority_order():
+    async def scenario():
+        scheduler, log = _scheduler(), []
+        futures = [
+            scheduler.submit(1, _call(log, "info"), Priority.INFO),
+            scheduler.submit(1, _call(log, "reply"), Priority.REPLY),
+            scheduler.submit(1, _call(log, "ban"), Priority.MODERATION),
+        ]
+        await asyncio.gather(*futures)
+        await scheduler.stop()
+        return log
+
+    assert asyncio.run(scenario()) == ["ban", "reply", "info"]
+
+
+def test_results_and_coalescing():
+    async def scenario():
+        scheduler, log = _scheduler(), []
+        first = scheduler.submit(1, _call(log, "old", 1), Priority.INFO, key="welcome")
+        second = scheduler.submit(1, _call(log, "new", 2), Priority.INFO, key="welcome")
+        other = scheduler.submit(2, _call(log, "other", 3))
+        results = await asyncio.gather(first, second, other)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+        return log, results, stats
+
+    log, results, stats = asyncio.run(scenario())
+    assert sorted(log) == ["new", "other"]
+    assert results == [2, 2, 3]
+    assert stats["coalesced"] == 1
+    assert stats["sent"] == 2
+
+
+def test_flood_wait_is_retried():
+    async def scenario():
+        scheduler, attempts = _scheduler(), []
+
+        async def call():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise FloodWait(value=0)
+            return "ok"
+
+        result = await scheduler.submit(1, call)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+        return result, attempts, stats
+
+    result, attempts, stats = asyncio.run(scenario())
+    assert result == "ok"
+    assert len(attempts) == 2
+    assert (stats["flood_waits"], stats["retried"], stats["failed"]) == (1, 1, 0)
+
+
+def test_failures_reach_the_future():
+    async def scenario():
+        scheduler = _scheduler(max_retries=1)
+
+        async def flood():
+            raise FloodWait(value=0)
+
+        async def broken():
+            raise ValueError("bad request")
+
+        results = await asyncio.gather(scheduler.submit(1, flood), scheduler.submit(2, broken), return_exceptions=True)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+    assert isinstance(results[0], FloodWait)
+    assert isinstance(results[1], ValueError)
+    assert stats["failed"] == 2
+
+
+def test_info_calls_are_shed_when_full():
+    async def scenario():
+        scheduler, log = _scheduler(max_pending=1), []
+        kept = scheduler.submit(1, _call(log, "reply"))
+        dropped = scheduler.submit(1, _call(log, "info"), Priority.INFO)
+        moderation = scheduler.submit(1, _call(log, "ban"), Priority.MODERATION)
+        await asyncio.gather(kept, dropped, moderation)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+        return log, stats
+
+    log, stats = asyncio.run(scenario())
+    assert sorted(log) == ["ban", "reply"]
+    assert stats["dropped"] == 1
+
+
+def test_chat_messages_are_paced_but_moderation_is_not():
+    async def scenario():
+        # Burst of 2 messages, then one every 0.1 s
+        scheduler, log = _scheduler(chat_per_minute=600, chat_burst=2), []
+        started = time.monotonic()
+        bans = [scheduler.submit(1, _call(log, f"ban{index}"), Priority.MODERATION) for index in range(5)]
+        await asyncio.gather(*bans)
+        bans_done = time.monotonic() - started
+
+        replies = [scheduler.submit(1, _call(log, f"reply{index}")) for index in range(4)]
+        await asyncio.gather(*replies)
+        replies_done = time.monotonic() - started
+        await scheduler.stop()
+        return bans_done, replies_done
+
+    bans_done, replies_done = asyncio.run(scenario())
+    assert bans_done < 0.1
+    # Two replies from the burst, two more 0.1 s apart
+    assert replies_done >= 0.18
@@ -0,0 +1,106 @@
+"""
+Rule Engine Tests
+Compilation and evaluation of per-group rule plans (services/rule_engine.py).
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from handlers.message_handler import is_exempt
+from models.permission import Role
+from services.admin_roster import _Roster, admin_roster
+from services.rule_engine import PHOTO, STICKER, RulePlan
+
+
+def _message(text=None, caption=None):
+    return SimpleNamespace(text=text, caption=caption)
+
+
+def _evaluate(plan, text, bits=0):
+    return plan.evaluate(_message(text), bits)
+
+
+def test_empty_plan():
+    plan = RulePlan.compile(1, None, {"regex_filters": [], "blacklist_words": []})
+    assert plan.empty
+    assert _evaluate(plan, "anything", PHOTO) is None
+
+
+def test_content_lock():
+    plan = RulePlan.compile(1, {"locks": {"photo": True, "lock_sticker": False}, "action": "mute"}, None)
+    violation = plan.evaluate(_message(caption="hi"), PHOTO)
+    assert (violation.module_key, violation.rule, violation.action) == ("locks", "photo", "mute")
+    assert plan.evaluate(_message(), STICKER) is None
+
+
+def test_blacklist_whole_word_and_whitelist():
+    plan = RulePlan.compile(1, None, {
+        "blacklist_words": ["ass", "Spam"],
+        "whitelist_words": ["class"],
+        "whole_word_match": False,
+    })
+    assert _evaluate(plan, "buy SPAM now").detail == "Spam"
+    # Blacklisted word inside a whitelisted one
+    assert _evaluate(plan, "first class ticket") is None
+    assert _evaluate(plan, "you ass").rule == "blacklist_words"
+
+    whole = RulePlan.compile(1, None, {"blacklist_words": ["spam"], "whole_word_match": True})
+    assert _evaluate(whole, "spammer") is None
+    assert _evaluate(whole, "no spam!") is not None
+
+
+def test_blacklist_domain_boundaries():
+    plan = RulePlan.compile(1, None, {"blacklist_domains": ["example.com"]})
+    assert _evaluate(plan, "see sub.example.com").rule == "blacklist_domains"
+    assert _evaluate(plan, "see badexample.com") is None
+    assert _evaluate(plan, "see example.community") is None
+
+
+def test_regex_filters_combined():
+    plan = RulePlan.compile(1, None, {"regex_filters": [r"fr[e3]{2}\s+money", r"\d{4}-\d{4}"]})
+    assert plan.regex is not None
+    assert _evaluate(plan, "call 1234-5678").detail == r"\d{4}-\d{4}"
+    assert _evaluate(plan, "FREE money").detail == r"fr[e3]{2}\s+money"
+    assert _evaluate(plan, "nothing here") is None
+
+
+def test_regex_with_inline_global_flag_is_skipped():
+    # "(?i)" is only valid at the start of the whole regex: combining it used to raise
+    plan = RulePlan.compile(1, None, {"regex_filters": ["(?i)spam", "foo", "([bad"]})
+    assert [rule.pattern for rule in plan.regex_rules] == ["foo"]
+    assert _evaluate(plan, "some foo").detail == "foo"
+    assert _evaluate(plan, "spam") is None
+
+
+def test_regex_with_named_groups_is_skipped():
+    plan = RulePlan.compile(1, None, {"regex_filters": [r"(?P<word>x)", r"(a)\1", "ok"]})
+    assert [rule.pattern for rule in plan.regex_rules] == ["ok"]
+
+
+def test_regex_rules_matched_one_by_one_without_combined_regex():
+    plan = RulePlan.compile(1, None, {"regex_filters": ["alpha", "beta"]})
+    plan.regex = None
+    assert _evaluate(plan, "beta test").detail == "beta"
+    assert _evaluate(plan, "gamma") is None
+
+
+def test_admins_owner_and_anonymous_admins_are_exempt():
+    group_id = -100777
+    admin_roster._entries[group_id] = _Roster({7: Role.ADMIN, 8: Role.OWNER}, time.monotonic())
+
+    def sender(user_id=None, sender_chat=None):
+        return SimpleNamespace(
+            chat=SimpleNamespace(id=group_id),
+            from_user=SimpleNamespace(id=user_id) if user_id else None,
+            sender_chat=sender_chat,
+        )
+
+    try:
+        # 1 is a SUDO user (tests/conftest.py); the roster is cached, so no API call
+        exempt = [asyncio.run(is_exempt(None, sender(user_id))) for user_id in (7, 8, 1, 9)]
+        assert exempt == [True, True, True, False]
+        assert asyncio.run(is_exempt(None, sender(sender_chat=SimpleNamespace(id=group_id))))
+        assert not asyncio.run(is_exempt(None, sender(9, SimpleNamespace(id=-100555))))
+    finally:
+        admin_roster.forget(group_id)
@@ -0,0 +1,73 @@
+"""
+Scheduler Tests
+Offset triggers and group sharding of per-group jobs (services/scheduler.py).
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from services.scheduler import OffsetTrigger, shard_of, shard_query
+
+
+UTC = timezone.utc
+
+
+def test_offset_trigger_shifts_fire_times():
+    trigger = OffsetTrigger(CronTrigger(hour=3, minute=0, timezone=UTC), offset=90)
+    now = datetime(2024, 5, 1, 12, 0, tzinfo=UTC)
+
+    first = trigger.get_next_fire_time(None, now)
+    assert first == datetime(2024, 5, 2, 3, 1, 30, tzinfo=UTC)
+    assert trigger.get_next_fire_time(first, first) == datetime(2024, 5, 3, 3, 1, 30, tzinfo=UTC)
+
+
+def test_offset_trigger_fires_within_offset_after_schedule():
+    # Just after 03:00, the 03:01:30 run of today is still ahead
+    trigger = OffsetTrigger(CronTrigger(hour=3, minute=0, timezone=UTC), offset=90)
+    now = datetime(2024, 5, 1, 3, 0, 30, tzinfo=UTC)
+    assert trigger.get_next_fire_time(None, now) == datetime(2024, 5, 1, 3, 1, 30, tzinfo=UTC)
+
+
+def test_offset_trigger_keeps_interval():
+    start = datetime(2024, 5, 1, tzinfo=UTC)
+    trigger = OffsetTrigger(IntervalTrigger(minutes=10, start_date=start), offset=30)
+
+    first = trigger.get_next_fire_time(None, start)
+    second = trigger.get_next_fire_time(first, first)
+    assert first == start + timedelta(seconds=30)
+    assert second - first == timedelta(minutes=10)
+
+
+def _mongo_mod(value, divisor):
+    # MongoDB's $mod truncates toward zero (the remainder keeps the dividend's sign)
+    return int(math.fmod(value, divisor))
+
+
+def _matches(query, group_id):
+    branches = query.get("$or", [query])
+    return any(
+        _mongo_mod(group_id, branch["group_id"]["$mod"][0]) == branch["group_id"]["$mod"][1]
+        for branch in branches
+    )
+
+
+def test_shard_query_matches_shard_of():
+    shards = 4
+    for group_id in (-1001234567890, -1001234567891, -5, -4, 0, 3, 7, 1001234567890):
+        shard = shard_of(group_id, shards)
+        assert 0 <= shard < shards
+        for candidate in range(shards):
+            query = shard_query(candidate, shards)
+            assert query["approved"] is True
+            assert _matches(query, group_id) == (candidate == shard)
+
+
+def test_shards_split_groups_evenly():
+    shards = 8
+    counts = [0] * shards
+    for group_id in range(-1001000000000, -1001000000000 + 8000):
+        counts[shard_of(group_id, shards)] += 1
+    assert counts == [1000] * shards
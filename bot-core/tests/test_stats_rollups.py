@@ -0,0 +1,75 @@
+"""
+Stats Tests
+Space-Saving heavy hitters of the stats rollups (database-migrations/stats_rollups.py)
+and the admin removals counted for them (handlers/member_update_handler.py).
+"""
+
+import random
+from types import SimpleNamespace
+
+from pyrogram.enums import ChatMemberStatus
+
+from handlers.member_update_handler import removal_of
+from stats_rollups import SpaceSaving
+
+
+def test_exact_below_capacity():
+    sketch = SpaceSaving(k=5)
+    for item, count in ((1, 10), (2, 3), (3, 7)):
+        sketch.add(item, count)
+    assert sketch.top() == [(1, 10), (3, 7), (2, 3)]
+    assert sketch.min_count() == 0
+
+
+def test_heavy_hitters_are_kept():
+    rng = random.Random(7)
+    stream = [1] * 300 + [2] * 200 + [rng.randrange(100, 10_000) for _ in range(500)]
+    rng.shuffle(stream)
+
+    sketch = SpaceSaving(k=10)
+    for item in stream:
+        sketch.add(item)
+
+    assert len(sketch) == 10
+    top = dict(sketch.top(2))
+    assert set(top) == {1, 2}
+    # Counts are overestimates bounded by the recorded error
+    for item, true_count in ((1, 300), (2, 200)):
+        count, error = sketch.counts[item]
+        assert count - error <= true_count <= count
+
+
+def test_merge_keeps_heavy_hitters():
+    left, right = SpaceSaving(k=3), SpaceSaving(k=3)
+    for item, count in ((1, 50), (2, 5), (3, 4)):
+        left.add(item, count)
+    for item, count in ((1, 20), (4, 30), (5, 2)):
+        right.add(item, count)
+
+    merged = left.merge(right)
+    assert len(merged) == 3
+    assert merged.top(2) == [(1, 70), (4, 34)]
+
+
+def test_doc_round_trip():
+    sketch = SpaceSaving(k=2)
+    for item in (1, 1, 2, 3):
+        sketch.add(item)
+    restored = SpaceSaving.from_doc(sketch.to_doc(), k=2)
+    assert restored.counts == sketch.counts
+    assert SpaceSaving.from_doc(None).counts == {}
+
+
+def _member_update(old, new, actor=10, user=20):
+    def member(status):
+        return SimpleNamespace(user=SimpleNamespace(id=user), status=status) if status else None
+    return SimpleNamespace(old_chat_member=member(old), new_chat_member=member(new), from_user=SimpleNamespace(id=actor))
+
+
+def test_admin_removals_are_classified():
+    assert removal_of(_member_update(ChatMemberStatus.MEMBER, ChatMemberStatus.BANNED)) == "ban"
+    assert removal_of(_member_update(ChatMemberStatus.RESTRICTED, ChatMemberStatus.LEFT)) == "kick"
+    # The unban half of a kick, self-leaves and joins are not removals
+    assert removal_of(_member_update(ChatMemberStatus.BANNED, ChatMemberStatus.LEFT)) is None
+    assert removal_of(_member_update(ChatMemberStatus.MEMBER, ChatMemberStatus.LEFT, actor=20)) is None
+    assert removal_of(_member_update(ChatMemberStatus.LEFT, ChatMemberStatus.MEMBER)) is None
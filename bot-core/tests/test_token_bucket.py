@@ -0,0 +1,51 @@
+"""
+Token Bucket Tests
+In-memory token buckets of the rate limiter (utils/token_bucket.py).
+"""
+
+import pytest
+
+from utils.token_bucket import TokenBucketLimiter
+
+
+def test_burst_then_limited():
+    limiter = TokenBucketLimiter()
+    results = [limiter.check("user", capacity=3, refill_per_sec=1, now=0.0) for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+def test_refill_over_time():
+    limiter = TokenBucketLimiter()
+    for _ in range(2):
+        assert limiter.check("user", capacity=2, refill_per_sec=0.5, now=0.0)
+    assert not limiter.check("user", capacity=2, refill_per_sec=0.5, now=1.0)
+    # Half a token after the first second, one full token after two
+    assert limiter.check("user", capacity=2, refill_per_sec=0.5, now=2.0)
+
+
+def test_refill_is_capped_at_capacity():
+    limiter = TokenBucketLimiter()
+    assert limiter.check("user", capacity=2, refill_per_sec=1, now=0.0)
+    results = [limiter.check("user", capacity=2, refill_per_sec=1, now=1000.0) for _ in range(3)]
+    assert results == [True, True, False]
+
+
+def test_cost_and_separate_keys():
+    limiter = TokenBucketLimiter()
+    assert not limiter.check("a", capacity=2, refill_per_sec=1, cost=3, now=0.0)
+    assert limiter.check("b", capacity=5, refill_per_sec=1, cost=5, now=0.0)
+    assert not limiter.check("b", capacity=5, refill_per_sec=1, now=0.0)
+    assert limiter.check("c", capacity=1, refill_per_sec=1, now=0.0)
+
+
+def test_idle_buckets_are_swept():
+    limiter = TokenBucketLimiter(shards=1, idle_ttl=10.0, sweep_every=2)
+    limiter.check("old", capacity=1, refill_per_sec=1, now=0.0)
+    limiter.check("new", capacity=1, refill_per_sec=1, now=20.0)
+    assert len(limiter) == 1
+    assert limiter.evicted == 1
+
+
+def test_shards_must_be_power_of_two():
+    with pytest.raises(ValueError):
+        TokenBucketLimiter(shards=3)
@@ -0,0 +1,97 @@
+"""
+Aho-Corasick Automaton
+Multi-pattern substring search in a single pass over the text.
+
+Used by the rule engine to match word and domain lists: the cost per
+message depends on the text length, not on the number of patterns.
+
+Usage:
+    automaton = AhoCorasick()
+    automaton.add("spam", "word:spam")
+    automaton.add("example.com", "domain:example.com")
+    automaton.build()
+    for start, end, value in automaton.iter_matches("buy spam at example.com"):
+        ...
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """Trie with failure links; outputs are merged along failure chains at build time."""
+
+    __slots__ = ("_goto", "_fail", "_out", "_values", "_built")
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._values: List[Tuple[int, Any]] = []   # pattern index -> (length, value)
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, pattern: str, value: Any = None):
+        """Add a pattern (value is returned with each match, defaults to the pattern)."""
+        if not pattern:
+            return
+        if self._built:
+            raise RuntimeError("Cannot add patterns after build()")
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+
+        self._out[state] += (len(self._values),)
+        self._values.append((len(pattern), pattern if value is None else value))
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links (breadth-first)."""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, value) for every occurrence (overlaps included)."""
+        goto, fail, out, values = self._goto, self._fail, self._out, self._values
+        state = 0
+
+        for index, char in enumerate(text):
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state or 0
+
+            if out[state]:
+                end = index + 1
+                for pattern_index in out[state]:
+                    length, value = values[pattern_index]
+                    yield end - length, end, value
+
+
+__all__ = [
+    "AhoCorasick",
+]
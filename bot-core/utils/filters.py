@@ -1,15 +1,145 @@
 """
 Custom Filters
 Custom Pyrogram filters for flexible command handling.
+
+Command detection is done by parsing the first token of a message ONCE
+(prefix, command, @botname, args) and caching the result on the message.
+Every command filter then only does a set membership test, so the cost of
+filtering a message stays flat no matter how many commands are registered.
 """
 
 from pyrogram import filters
 from pyrogram.types import Message
-from typing import List, Union
-import re
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
 
 from config.settings import settings
+from services.admin_roster import is_anonymous_admin, is_group_admin, is_group_owner
+from services.bot_identity import get_bot_username
+
+
+# ==================== Command Parsing ====================
+
+class ParsedCommand(NamedTuple):
+    """First token of a message, split into its command parts."""
+    prefix: str             # Prefix used ("/", "!", "" ...)
+    name: str               # Command name as typed (e.g. "Ban")
+    key: str                # Lowercased command name (index key)
+    mention: Optional[str]  # Bot username after "@" (if any)
+    args: str               # Everything after the first token
+
+
+# Configured bot username, used until the real identity is cached at startup
+_BOT_USERNAME = settings.BOT_USERNAME.strip().lstrip("@").lower()
+
+# Attribute used to cache parse results on the Message object
+_CACHE_ATTR = "_parsed_commands"
+
+
+def _normalize_prefixes(prefixes: Union[str, List[str], None]) -> Tuple[str, ...]:
+    """
+    Build the prefix tuple used for parsing.
+    Non-empty prefixes are tried longest first, the empty prefix always last.
+    """
+    if prefixes is None:
+        prefixes = []
+        if settings.ALLOW_SLASH_COMMANDS:
+            prefixes.append("/")
+        if settings.ALLOW_NO_PREFIX_COMMANDS:
+            prefixes.append("")  # No prefix
+        if settings.COMMAND_PREFIX:
+            prefixes.append(settings.COMMAND_PREFIX)
+    elif isinstance(prefixes, str):
+        prefixes = [prefixes]
+
+    unique = set(prefixes)
+    ordered = sorted((p for p in unique if p), key=len, reverse=True)
+    if "" in unique:
+        ordered.append("")
+    return tuple(ordered)
+
+
+# Prefixes from settings (shared by all filters that don't override them)
+DEFAULT_PREFIXES: Tuple[str, ...] = _normalize_prefixes(None)
+
+
+def _parse(text: str, prefixes: Tuple[str, ...]) -> Optional[ParsedCommand]:
+    """Parse the first token of text. Returns None if it isn't a command."""
+    parts = text.split(None, 1)
+    if not parts:
+        return None
+
+    token = parts[0]
+    args = parts[1] if len(parts) > 1 else ""
+
+    for prefix in prefixes:
+        if not token.startswith(prefix):
+            continue
+
+        name = token[len(prefix):]
+        mention = None
+        if "@" in name:
+            name, mention = name.split("@", 1)
+            # Commands addressed to another bot are not ours
+            if mention.lower() != (get_bot_username() or _BOT_USERNAME):
+                return None
+
+        if not name:
+            return None
+
+        return ParsedCommand(prefix, name, name.lower(), mention, args)
+
+    return None
+
+
+def parse_command(
+    message: Message,
+    prefixes: Tuple[str, ...] = DEFAULT_PREFIXES
+) -> Optional[ParsedCommand]:
+    """
+    Parse the command in a message (cached per message and prefix set).
+
+    Also fills message.command with [command, *args] like Pyrogram's
+    built-in command filter does.
 
+    Returns:
+        ParsedCommand or None if the message is not a command.
+    """
+    if not message.text:
+        return None
+
+    cache: Optional[Dict] = getattr(message, _CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(message, _CACHE_ATTR, cache)
+    elif prefixes in cache:
+        return cache[prefixes]
+
+    parsed = _parse(message.text, prefixes)
+    cache[prefixes] = parsed
+
+    if parsed is not None and getattr(message, "command", None) is None:
+        message.command = [parsed.key] + parsed.args.split()
+
+    return parsed
+
+
+class _NotACommand(dict):
+    """Parse cache of a message that must be treated as plain text."""
+
+    def __contains__(self, prefixes) -> bool:
+        return True
+
+    def __missing__(self, prefixes) -> None:
+        return None
+
+
+def ignore_command(message: Message):
+    """Make every later parse_command() of this message return None."""
+    setattr(message, _CACHE_ATTR, _NotACommand())
+    message.command = None
+
+
+# ==================== Command Filters ====================
 
 def command(
     commands: Union[str, List[str]],
@@ -21,12 +151,12 @@ def command(
     - Commands WITH slash: /ban, /setvip
     - Commands WITHOUT slash: ban, setvip
     - Both at the same time
-    
+
     Args:
         commands: Command name(s) - e.g., "ban" or ["ban", "kick"]
         prefixes: Custom prefixes (None = use settings)
         case_sensitive: Case sensitivity
-    
+
     Usage:
         @app.on_message(command("ban"))  # Works for: /ban OR ban
         @app.on_message(command(["ban", "kick"]))
@@ -34,57 +164,61 @@ def command(
     # Convert to list
     if isinstance(commands, str):
         commands = [commands]
-    
-    # Determine prefixes
-    if prefixes is None:
-        prefixes = []
-        if settings.ALLOW_SLASH_COMMANDS:
-            prefixes.append("/")
-        if settings.ALLOW_NO_PREFIX_COMMANDS:
-            prefixes.append("")  # No prefix
-        if settings.COMMAND_PREFIX:
-            prefixes.append(settings.COMMAND_PREFIX)
-    elif isinstance(prefixes, str):
-        prefixes = [prefixes]
-    
+
+    prefix_tuple = _normalize_prefixes(prefixes)
+
+    # Prebuilt lookup set - no per-message allocations or regex compiles
+    if case_sensitive:
+        names: FrozenSet[str] = frozenset(commands)
+    else:
+        names = frozenset(cmd.lower() for cmd in commands)
+
     async def func(flt, client, message: Message):
-        if not message.text:
+        parsed = parse_command(message, prefix_tuple)
+        if parsed is None:
             return False
-        
-        text = message.text
-        if not case_sensitive:
-            text = text.lower()
-            commands_lower = [cmd.lower() for cmd in commands]
-        else:
-            commands_lower = commands
-        
-        # Check each command with each prefix
-        for prefix in prefixes:
-            for cmd in commands_lower:
-                # Pattern: ^prefix+command(\s|$)
-                # Matches: "ban ", "ban@botname ", "/ban ", etc.
-                pattern = rf"^{re.escape(prefix)}{re.escape(cmd)}(\s|@|$)"
-                if re.match(pattern, text):
-                    return True
-        
-        return False
-    
-    return filters.create(func, "CustomCommandFilter")
+
+        return (parsed.name if case_sensitive else parsed.key) in names
+
+    return filters.create(
+        func,
+        "CustomCommandFilter",
+        commands=names,
+        prefixes=prefix_tuple,
+        case_sensitive=case_sensitive
+    )
+
+
+async def _sender_is_admin(flt, client, message: Message) -> bool:
+    if is_anonymous_admin(message):
+        return True
+    return message.from_user is not None and await is_group_admin(client, message.chat.id, message.from_user.id)
+
+
+async def _sender_is_owner(flt, client, message: Message) -> bool:
+    return message.from_user is not None and await is_group_owner(client, message.chat.id, message.from_user.id)
+
+
+# Checked against the cached admin roster (services/admin_roster.py),
+# one get_chat_members call per group instead of one API call per command
+sender_is_admin = filters.create(_sender_is_admin, "SenderIsAdminFilter")
+sender_is_owner = filters.create(_sender_is_owner, "SenderIsOwnerFilter")
 
 
 def admin_command(commands: Union[str, List[str]], **kwargs):
     """
     Command filter for admin-only commands.
-    Only works in groups.
+    Only works in groups; the sender must be an admin, the owner or SUDO.
     """
-    return command(commands, **kwargs) & filters.group
+    return command(commands, **kwargs) & filters.group & sender_is_admin
 
 
 def owner_command(commands: Union[str, List[str]], **kwargs):
     """
     Command filter for owner-only commands.
+    Only works in groups; the sender must be the owner or SUDO.
     """
-    return command(commands, **kwargs) & filters.group
+    return command(commands, **kwargs) & filters.group & sender_is_owner
 
 
 def sudo_command(commands: Union[str, List[str]], **kwargs):
@@ -95,8 +229,14 @@ def sudo_command(commands: Union[str, List[str]], **kwargs):
 
 
 __all__ = [
+    "ParsedCommand",
+    "DEFAULT_PREFIXES",
+    "parse_command",
+    "ignore_command",
     "command",
-    "admin_command", 
+    "sender_is_admin",
+    "sender_is_owner",
+    "admin_command",
     "owner_command",
     "sudo_command"
 ]
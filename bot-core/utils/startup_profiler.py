@@ -0,0 +1,136 @@
+"""
+Startup Profiler
+Records wall time and memory of each startup phase and logs a summary table.
+
+Usage:
+    profiler = StartupProfiler()
+    db = await profiler.run("database", init_database())
+    with profiler.measure("handlers"):
+        register_handlers(app)
+    profiler.log_summary()
+"""
+
+import cProfile
+import io
+import pstats
+import resource
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, List, NamedTuple, Optional
+
+from loguru import logger
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KB on Linux, bytes on macOS; good enough as a fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PhaseTiming(NamedTuple):
+    name: str
+    started_ms: float   # Offset from profiler creation
+    duration_ms: float
+    rss_delta_mb: float
+    rss_after_mb: float
+
+
+class StartupProfiler:
+    """Collects per-phase timings. Concurrent phases are recorded independently."""
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self.phases: List[PhaseTiming] = []
+
+    def _record(self, name: str, started: float, rss_before: float):
+        rss_after = current_rss_mb()
+        self.phases.append(PhaseTiming(
+            name=name,
+            started_ms=(started - self._origin) * 1000,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            rss_delta_mb=rss_after - rss_before,
+            rss_after_mb=rss_after,
+        ))
+
+    @contextmanager
+    def measure(self, name: str):
+        """Measure a synchronous (or sequentially awaited) phase."""
+        started, rss_before = time.perf_counter(), current_rss_mb()
+        try:
+            yield
+        finally:
+            self._record(name, started, rss_before)
+
+    async def run(self, name: str, awaitable: Awaitable) -> Any:
+        """Await a phase and record it (use with asyncio.gather for parallel phases)."""
+        started, rss_before = time.perf_counter(), current_rss_mb()
+        try:
+            return await awaitable
+        finally:
+            self._record(name, started, rss_before)
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    def summary_table(self) -> str:
+        """Phases ordered by start time (memory deltas overlap for parallel phases)."""
+        lines = [
+            f"{'phase':<22}{'start ms':>10}{'duration ms':>14}{'rss Δ MB':>11}{'rss MB':>9}",
+            "-" * 66,
+        ]
+        for phase in sorted(self.phases, key=lambda p: p.started_ms):
+            lines.append(
+                f"{phase.name:<22}{phase.started_ms:>10.1f}{phase.duration_ms:>14.1f}"
+                f"{phase.rss_delta_mb:>+11.1f}{phase.rss_after_mb:>9.1f}"
+            )
+        lines.append("-" * 66)
+        lines.append(f"{'total':<22}{'':>10}{self.total_ms:>14.1f}")
+        return "\n".join(lines)
+
+    def log_summary(self):
+        logger.info("⏱  Startup phases:\n" + self.summary_table())
+
+
+# ==================== cProfile Mode ====================
+
+class StartupCProfile:
+    """cProfile wrapper for --profile-startup."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self._profile: Optional[cProfile.Profile] = None
+
+    def start(self):
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop_and_dump(self, top: int = 60) -> Path:
+        """Write <dir>/startup.prof and a text report sorted by cumulative time."""
+        self._profile.disable()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        prof_path = self.output_dir / "startup.prof"
+        self._profile.dump_stats(str(prof_path))
+
+        report = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+        report_path = self.output_dir / "startup_profile.txt"
+        report_path.write_text(report.getvalue(), encoding="utf-8")
+        return report_path
+
+
+__all__ = [
+    "current_rss_mb",
+    "PhaseTiming",
+    "StartupProfiler",
+    "StartupCProfile",
+]
@@ -0,0 +1,146 @@
+"""
+Token Bucket
+Rate limiting primitives used by the rate limiter middleware.
+
+- TokenBucketLimiter: in-memory buckets in sharded dicts, O(1) per check.
+  Buckets idle long enough to be full again are evicted (losslessly), so
+  memory only grows with the number of recently active keys.
+- RedisTokenBucket: the same algorithm as an atomic Redis script, so several
+  bot-core replicas share limits.
+
+This module has no settings/Telegram dependencies so it can be benchmarked
+standalone (see benchmarks/bench_rate_limiter.py).
+"""
+
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class TokenBucketLimiter:
+    """
+    Sharded in-memory token buckets.
+
+    Each bucket is stored as [tokens, last_refill] in one of `shards` dicts.
+    Every `sweep_every` checks one shard is swept for buckets idle for at
+    least `idle_ttl` seconds (set it to the longest full-refill time).
+    """
+
+    def __init__(self, shards: int = 64, idle_ttl: float = 60.0, sweep_every: int = 1024):
+        if shards & (shards - 1):
+            raise ValueError("shards must be a power of two")
+        self._shards: List[Dict[Hashable, List[float]]] = [{} for _ in range(shards)]
+        self._mask = shards - 1
+        self.idle_ttl = idle_ttl
+        self.sweep_every = sweep_every
+        self._checks = 0
+        self._next_sweep = 0
+        self.evicted = 0
+
+    def check(
+        self,
+        key: Hashable,
+        capacity: float,
+        refill_per_sec: float,
+        cost: float = 1.0,
+        now: Optional[float] = None
+    ) -> bool:
+        """Take `cost` tokens from the bucket of key. Returns False if limited."""
+        if now is None:
+            now = time.monotonic()
+
+        self._checks += 1
+        if self._checks % self.sweep_every == 0:
+            self._sweep(now)
+
+        shard = self._shards[hash(key) & self._mask]
+        bucket = shard.get(key)
+
+        if bucket is None:
+            shard[key] = [capacity - cost, now]
+            return cost <= capacity
+
+        tokens = bucket[0] + (now - bucket[1]) * refill_per_sec
+        if tokens > capacity:
+            tokens = capacity
+        bucket[1] = now
+
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return True
+
+        bucket[0] = tokens
+        return False
+
+    def _sweep(self, now: float):
+        """Evict idle buckets from the next shard (round robin)."""
+        shard = self._shards[self._next_sweep]
+        self._next_sweep = (self._next_sweep + 1) & self._mask
+
+        cutoff = now - self.idle_ttl
+        idle = [key for key, bucket in shard.items() if bucket[1] <= cutoff]
+        for key in idle:
+            del shard[key]
+        self.evicted += len(idle)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self),
+            "shards": len(self._shards),
+            "checks": self._checks,
+            "evicted": self.evicted,
+        }
+
+
+# Atomic token bucket: KEYS[1]=bucket, ARGV = capacity, refill/sec, cost
+_REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return allowed
+"""
+
+
+class RedisTokenBucket:
+    """Token buckets stored in Redis (shared by all replicas)."""
+
+    def __init__(self, redis_client, prefix: str = "ratelimit:"):
+        self._redis = redis_client
+        self._prefix = prefix
+        self._script = redis_client.register_script(_REDIS_SCRIPT)
+
+    async def check(self, key: str, capacity: float, refill_per_sec: float, cost: float = 1.0) -> bool:
+        """Take `cost` tokens from the shared bucket of key."""
+        allowed = await self._script(
+            keys=[f"{self._prefix}{key}"],
+            args=[capacity, refill_per_sec, cost]
+        )
+        return bool(allowed)
+
+
+__all__ = [
+    "TokenBucketLimiter",
+    "RedisTokenBucket",
+]
@@ -1,5 +1,74 @@
 """
-commands.py
+Anti-Spam Commands
+Registers the anti_spam module handlers (loaded lazily by the module loader).
+
+Content filters (links, words, domains, regexes) are enforced by the core
+rule engine; this module adds flood, duplicate and per-kind spam limits.
 """
 
-# TODO: Implement
+from typing import Dict, Tuple
+
+from pyrogram import Client
+from pyrogram.enums import MessageMediaType
+from pyrogram.types import Message
+
+from handlers.message_handler import apply_action, is_exempt
+from services.group_service import get_module_settings
+from services.rule_engine import Violation
+
+from .config import MODULE_KEY, DEFAULTS, flood_limits
+from .flood import FORWARD, GIF, MEDIA, STICKER, TEXT, FloodDetector, FloodLimits, content_hash
+
+
+detector = FloodDetector()
+
+# group_id -> (settings document, limits built from it)
+_limits: Dict[int, Tuple[dict, FloodLimits]] = {}
+
+
+def _limits_for(group_id: int, doc: dict) -> FloodLimits:
+    cached = _limits.get(group_id)
+    if cached is None or cached[0] is not doc:
+        cached = _limits[group_id] = (doc, flood_limits(doc))
+    return cached[1]
+
+
+def _classify(message: Message) -> Tuple[str, int]:
+    """Message kind and normalized content hash."""
+    if message.forward_date:
+        return FORWARD, content_hash(message.text or message.caption)
+    if message.sticker:
+        return STICKER, content_hash(None, message.sticker.file_unique_id)
+    if message.animation:
+        return GIF, content_hash(None, message.animation.file_unique_id)
+    if message.media and message.media is not MessageMediaType.WEB_PAGE:
+        return MEDIA, content_hash(message.caption)
+    return TEXT, content_hash(message.text)
+
+
+async def check_flood(client: Client, message: Message):
+    """Feed a group message to the detector and punish on a verdict."""
+    if not message.from_user:
+        return
+
+    group_id = message.chat.id
+    doc = await get_module_settings(group_id, MODULE_KEY)
+    kind, digest = _classify(message)
+
+    verdict = detector.check(group_id, message.from_user.id, _limits_for(group_id, doc), kind, digest)
+    if verdict is None:
+        return
+    # Same exemption as the rule engine, looked up only on a verdict
+    if await is_exempt(client, message):
+        detector.forget(group_id, message.from_user.id)
+        return
+
+    action = doc.get("flood_action", DEFAULTS["flood_action"])
+    await apply_action(client, message, Violation(MODULE_KEY, verdict.reason, action, f"{verdict.count}/{verdict.limit}"))
+    if action != "delete":
+        detector.forget(group_id, message.from_user.id)
+
+
+def setup(module):
+    """Called by the module loader on first use."""
+    module.on("message")(check_flood)
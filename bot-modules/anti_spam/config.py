@@ -1,5 +1,47 @@
 """
-config.py
+Anti-Spam Configuration
+Defaults for the anti_spam settings document and flood limit parsing.
 """
 
-# TODO: Implement
+from typing import Any, Dict
+
+from .flood import FORWARD, GIF, STICKER, FloodLimits
+
+
+MODULE_KEY = "anti_spam"
+
+# Defaults used when a key is missing from the group's settings document
+DEFAULTS: Dict[str, Any] = {
+    "flood_window": 10,
+    "flood_limit": 8,
+    "duplicate_message_limit": 3,
+    "sticker_spam_limit": 5,
+    "gif_spam_limit": 5,
+    "forward_spam_limit": 5,
+    "anti_raid": False,
+    "raid_duplicate_limit": 5,
+    "flood_action": "mute",
+}
+
+# Settings key -> message kind
+KIND_LIMIT_KEYS = {
+    "sticker_spam_limit": STICKER,
+    "gif_spam_limit": GIF,
+    "forward_spam_limit": FORWARD,
+}
+
+
+def flood_limits(doc: Dict[str, Any]) -> FloodLimits:
+    """Build FloodLimits from an anti_spam settings document."""
+    def get(key: str):
+        return doc.get(key, DEFAULTS[key])
+
+    return FloodLimits(
+        window=float(get("flood_window")),
+        flood_limit=int(get("flood_limit")),
+        duplicate_limit=int(get("duplicate_message_limit")),
+        kind_limits=tuple(
+            (kind, int(get(key))) for key, kind in KIND_LIMIT_KEYS.items() if get(key)
+        ),
+        group_duplicate_limit=int(get("raid_duplicate_limit")) if get("anti_raid") else 0,
+    )
@@ -0,0 +1,222 @@
+"""
+Flood Detector
+In-memory sliding windows of recent messages per (group, user).
+
+Each tracked sender keeps a bounded ring buffer of (timestamp, kind,
+content hash) plus running counters of kinds and hashes inside the window,
+so every update is O(1) amortized: append the new entry, pop expired ones
+from the left and adjust the counters. A per-group window of content hashes
+catches many accounts posting the same text (raids).
+
+Senders idle for longer than `idle_ttl` are evicted (LRU order), and the
+number of tracked senders is capped at `max_keys`.
+"""
+
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+# Message kinds with their own limits (see FloodLimits.kind_limits)
+TEXT = "text"
+STICKER = "sticker"
+GIF = "gif"
+FORWARD = "forward"
+MEDIA = "media"
+
+_NON_WORD = re.compile(r"[\W_]+")
+# ASCII punctuation, whitespace and control characters (bytes.translate fast path)
+_ASCII_NON_WORD = bytes(code for code in range(128) if not chr(code).isalnum())
+
+
+def content_hash(text: Optional[str], media_id: Optional[str] = None) -> int:
+    """
+    Hash of normalized content: casefolded text without punctuation, spaces,
+    zero-width characters or emoji, so "B U Y!!" and "buy" collide.
+    Media is identified by its file_unique_id.
+    """
+    if media_id:
+        return hash(media_id)
+    if not text:
+        return 0
+    if text.isascii():
+        return hash(text.encode().lower().translate(None, _ASCII_NON_WORD))
+    # Same bytes as the ASCII path for equal normalized text (zero-width tricks collide)
+    return hash(_NON_WORD.sub("", text.casefold()).encode())
+
+
+class FloodLimits(NamedTuple):
+    window: float = 10.0                 # seconds
+    flood_limit: int = 8                 # messages per window (0 = off)
+    duplicate_limit: int = 3             # same content per window (0 = off)
+    kind_limits: Tuple[Tuple[str, int], ...] = ()   # e.g. (("sticker", 4),)
+    group_duplicate_limit: int = 0       # same content from anyone per window (0 = off)
+
+
+class FloodVerdict(NamedTuple):
+    reason: str     # flood / duplicate / sticker / gif / forward / raid_duplicate
+    count: int
+    limit: int
+
+
+class _Window:
+    """Ring buffer of recent entries with running kind/hash counters."""
+
+    __slots__ = ("entries", "kinds", "hashes", "last_seen")
+
+    def __init__(self, capacity: int):
+        self.entries: deque = deque(maxlen=capacity)
+        self.kinds: Dict[str, int] = {}
+        self.hashes: Dict[int, int] = {}
+        self.last_seen = 0.0
+
+    def _drop(self, entry: Tuple[float, str, int]):
+        _, kind, digest = entry
+        count = self.kinds[kind] - 1
+        if count:
+            self.kinds[kind] = count
+        else:
+            del self.kinds[kind]
+        if digest:
+            count = self.hashes[digest] - 1
+            if count:
+                self.hashes[digest] = count
+            else:
+                del self.hashes[digest]
+
+    def add(self, now: float, window: float, kind: str, digest: int):
+        entries = self.entries
+
+        cutoff = now - window
+        while entries and entries[0][0] <= cutoff:
+            self._drop(entries.popleft())
+        if len(entries) == entries.maxlen:
+            self._drop(entries.popleft())
+
+        entries.append((now, kind, digest))
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+        if digest:
+            self.hashes[digest] = self.hashes.get(digest, 0) + 1
+        self.last_seen = now
+
+
+class FloodDetector:
+    """
+    Sliding-window burst and duplicate detector.
+
+    Usage:
+        detector = FloodDetector()
+        verdict = detector.check(group_id, user_id, FloodLimits(), kind=TEXT,
+                                 digest=content_hash(message.text))
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        idle_ttl: float = 120.0,
+        max_keys: int = 200_000,
+        sweep_every: int = 1024
+    ):
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        self.sweep_every = sweep_every
+        self._windows: "OrderedDict[Tuple[int, int], _Window]" = OrderedDict()
+        self._group_windows: "OrderedDict[int, _Window]" = OrderedDict()
+        self._since_sweep = 0
+        self._stats = {"checks": 0, "flagged": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _window(self, windows: OrderedDict, key: Any) -> _Window:
+        window = windows.get(key)
+        if window is None:
+            window = windows[key] = _Window(self.capacity)
+        else:
+            windows.move_to_end(key)
+        return window
+
+    def check(
+        self,
+        group_id: int,
+        user_id: int,
+        limits: FloodLimits,
+        kind: str = TEXT,
+        digest: int = 0,
+        now: Optional[float] = None
+    ) -> Optional[FloodVerdict]:
+        """Record a message and return a verdict if a limit is exceeded."""
+        now = time.monotonic() if now is None else now
+        self._stats["checks"] += 1
+
+        window = self._window(self._windows, (group_id, user_id))
+        window.add(now, limits.window, kind, digest)
+        verdict = self._verdict(window, limits, kind, digest)
+
+        if verdict is None and limits.group_duplicate_limit and digest:
+            group_window = self._window(self._group_windows, group_id)
+            group_window.add(now, limits.window, kind, digest)
+            count = group_window.hashes.get(digest, 0)
+            if count > limits.group_duplicate_limit:
+                verdict = FloodVerdict("raid_duplicate", count, limits.group_duplicate_limit)
+
+        self._since_sweep += 1
+        if self._since_sweep >= self.sweep_every or len(self._windows) > self.max_keys:
+            self._sweep(now)
+
+        if verdict is not None:
+            self._stats["flagged"] += 1
+        return verdict
+
+    @staticmethod
+    def _verdict(window: _Window, limits: FloodLimits, kind: str, digest: int) -> Optional[FloodVerdict]:
+        count = len(window.entries)
+        if limits.flood_limit and count > limits.flood_limit:
+            return FloodVerdict("flood", count, limits.flood_limit)
+
+        if limits.duplicate_limit and digest:
+            count = window.hashes[digest]
+            if count > limits.duplicate_limit:
+                return FloodVerdict("duplicate", count, limits.duplicate_limit)
+
+        for limited_kind, limit in limits.kind_limits:
+            if limited_kind == kind:
+                count = window.kinds[kind]
+                if count > limit:
+                    return FloodVerdict(kind, count, limit)
+        return None
+
+    def _sweep(self, now: float):
+        """Evict idle senders (oldest first) and enforce max_keys."""
+        self._since_sweep = 0
+        cutoff = now - self.idle_ttl
+
+        for windows in (self._windows, self._group_windows):
+            while windows:
+                window = next(iter(windows.values()))
+                if window.last_seen > cutoff and len(windows) <= self.max_keys:
+                    break
+                windows.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def forget(self, group_id: int, user_id: int):
+        """Drop a sender's history (e.g. after they were punished)."""
+        self._windows.pop((group_id, user_id), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "tracked": len(self._windows), "groups": len(self._group_windows)}
+
+
+__all__ = [
+    "TEXT",
+    "STICKER",
+    "GIF",
+    "FORWARD",
+    "MEDIA",
+    "content_hash",
+    "FloodLimits",
+    "FloodVerdict",
+    "FloodDetector",
+]
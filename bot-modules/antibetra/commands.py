@@ -1,5 +1,191 @@
 """
-commands.py
+Anti-Betrayal Commands
+Stops admins who mass-ban members or demote other admins (coups).
+
+    rantibetra on|off         enable/disable (owner only)
+    setmaxban <count>         bans + kicks allowed per window (owner only)
+    setmaxbantime <minutes>   window length (owner only)
+
+Only the owner may change anti-betrayal (an admin would just switch it off);
+the manifest requires "owner" and the AuthMiddleware enforces it.
+
+Every chat_member_updated performed by an admin is classified (ban, kick,
+demotion) and fed synchronously to the in-memory monitor (monitor.py).
+The event that crosses a limit demotes the admin right away: one Telegram
+call after the update arrives, no database query on the way. Window state
+is written behind to the `antibetra` collection (persistence.py).
 """
 
-# TODO: Implement
+from typing import Dict, List, Tuple
+
+from pyrogram import Client, filters
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import RPCError, UserCreator
+from pyrogram.types import ChatMemberUpdated, ChatPrivileges, Message
+from loguru import logger
+
+from config.settings import settings
+from i18n.loader import _
+from models.permission import Role
+from routers.module_loader import set_module_enabled
+from services.admin_roster import admin_roster
+from services.bot_identity import is_bot_self
+from services.group_service import get_module_settings, update_module_settings
+from services.log_service import log_event
+from services.outbound import Priority, send_message
+
+from .config import DEFAULTS, MAX_BANS_LIMIT, MAX_WINDOW_MINUTES, MODULE_KEY, action_limits
+from .monitor import BAN, DEMOTE, KICK, ActionLimits, AdminActionMonitor, Trip
+from .persistence import StatePersister
+
+
+monitor = AdminActionMonitor()
+persister = StatePersister(monitor)
+
+# group_id -> (settings document, limits built from it)
+_limits: Dict[int, Tuple[dict, ActionLimits]] = {}
+
+# Sender of anonymous admin actions; cannot be attributed to an admin
+_ANONYMOUS_ADMIN_ID = 1087968824
+
+_NO_PRIVILEGES = ChatPrivileges(
+    can_manage_chat=False,
+    can_delete_messages=False,
+    can_manage_video_chats=False,
+    can_restrict_members=False,
+    can_promote_members=False,
+    can_change_info=False,
+    can_post_messages=False,
+    can_edit_messages=False,
+    can_invite_users=False,
+    can_pin_messages=False,
+    is_anonymous=False,
+)
+
+_REMOVABLE = (ChatMemberStatus.MEMBER, ChatMemberStatus.RESTRICTED, ChatMemberStatus.ADMINISTRATOR)
+
+
+def _limits_for(group_id: int, doc: dict) -> ActionLimits:
+    cached = _limits.get(group_id)
+    if cached is None or cached[0] is not doc:
+        cached = _limits[group_id] = (doc, action_limits(doc))
+    return cached[1]
+
+
+def classify(update: ChatMemberUpdated) -> List[str]:
+    """Monitored actions an update represents (empty for joins, self-leaves, ...)."""
+    old, new = update.old_chat_member, update.new_chat_member
+    if new is None or new.user is None or new.user.id == update.from_user.id:
+        return []
+
+    kinds = []
+    if old is not None and old.status == ChatMemberStatus.ADMINISTRATOR and new.status != ChatMemberStatus.ADMINISTRATOR:
+        kinds.append(DEMOTE)
+    if new.status == ChatMemberStatus.BANNED and (old is None or old.status != ChatMemberStatus.BANNED):
+        kinds.append(BAN)
+    elif new.status == ChatMemberStatus.LEFT and old is not None and old.status in _REMOVABLE:
+        # Removed without a ban (a ban + unban is counted once, as the ban)
+        kinds.append(KICK)
+    return kinds
+
+
+# ==================== Monitoring ====================
+
+async def on_member_updated(client: Client, update: ChatMemberUpdated):
+    actor = update.from_user
+    if actor is None or actor.id == _ANONYMOUS_ADMIN_ID or is_bot_self(actor.id) or actor.id in settings.SUDO_USERS:
+        return
+
+    kinds = classify(update)
+    if not kinds:
+        return
+
+    group_id = update.chat.id
+    roster = admin_roster.peek(group_id)
+    if roster is not None and roster.get(actor.id) == Role.OWNER:
+        # owner_protection: the owner's actions are never counted
+        return
+
+    doc = await get_module_settings(group_id, MODULE_KEY)
+    limits = _limits_for(group_id, doc)
+    for kind in kinds:
+        trip = monitor.record(group_id, actor.id, kind, limits)
+        if trip is not None:
+            await _on_trip(client, group_id, actor, trip, doc, limits)
+            return
+
+
+async def _on_trip(client: Client, group_id: int, actor, trip: Trip, doc: dict, limits: ActionLimits):
+    monitor.forget(group_id, actor.id)
+    action = doc.get("action", DEFAULTS["action"])
+
+    demoted = None
+    if action == "demote":
+        try:
+            await client.promote_chat_member(group_id, actor.id, privileges=_NO_PRIVILEGES)
+            demoted = True
+        except UserCreator:
+            # owner_protection: the owner is never demoted or reported
+            return
+        except RPCError as e:
+            demoted = False
+            logger.warning(f"🛡 Could not demote {actor.id} in {group_id}: {e}")
+
+    logger.warning(f"🛡 Anti-betrayal tripped in {group_id} by {actor.id}: {trip.kind} {trip.count}/{trip.limit}")
+    await log_event(group_id, MODULE_KEY, target_id=actor.id, data={
+        "trip": trip.kind, "count": trip.count, "limit": trip.limit, "demoted": demoted,
+    })
+
+    key = "antibetra.coup_detected" if trip.kind == "demotions" else "antibetra.limit_exceeded"
+    lines = [_(group_id, key, admin=actor.mention, count=trip.count, max=trip.limit, time=int(limits.window // 60))]
+    if demoted is True:
+        lines += ["", _(group_id, "antibetra.admin_demoted")]
+    elif demoted is False:
+        lines += ["", _(group_id, "antibetra.demote_failed")]
+    send_message(client, group_id, "\n".join(lines), Priority.INFO)
+
+
+# ==================== Commands ====================
+
+def _arg(message: Message) -> str:
+    parts = (message.text or "").split()
+    return parts[1].lower() if len(parts) > 1 else ""
+
+
+async def rantibetra(client: Client, message: Message):
+    group_id = message.chat.id
+    arg = _arg(message)
+    if arg not in ("on", "off"):
+        await message.reply(_(group_id, "errors.invalid_input"))
+        return
+    await set_module_enabled(group_id, MODULE_KEY, arg == "on")
+    await message.reply(_(group_id, "antibetra.enabled" if arg == "on" else "antibetra.disabled"))
+
+
+async def setmaxban(client: Client, message: Message):
+    group_id = message.chat.id
+    arg = _arg(message)
+    if not arg.isdigit() or not 1 <= int(arg) <= MAX_BANS_LIMIT:
+        await message.reply(_(group_id, "errors.invalid_input"))
+        return
+    await update_module_settings(group_id, MODULE_KEY, {"max_bans": int(arg)})
+    await message.reply(_(group_id, "antibetra.max_ban_set", count=int(arg)))
+
+
+async def setmaxbantime(client: Client, message: Message):
+    group_id = message.chat.id
+    arg = _arg(message)
+    if not arg.isdigit() or not 1 <= int(arg) <= MAX_WINDOW_MINUTES:
+        await message.reply(_(group_id, "errors.invalid_input"))
+        return
+    await update_module_settings(group_id, MODULE_KEY, {"max_ban_minutes": int(arg)})
+    await message.reply(_(group_id, "antibetra.max_ban_time_set", minutes=int(arg)))
+
+
+def setup(module):
+    """Called by the module loader on first use."""
+    module.command("rantibetra", filters=filters.group)(rantibetra)
+    module.command("setmaxban", filters=filters.group)(setmaxban)
+    module.command("setmaxbantime", filters=filters.group)(setmaxbantime)
+    module.on("chat_member_updated")(on_member_updated)
+    persister.start()
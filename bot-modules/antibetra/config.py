@@ -1,5 +1,38 @@
 """
-config.py
+Anti-Betrayal Configuration
+Defaults for the antibetra settings document and limit parsing.
 """
 
-# TODO: Implement
+from typing import Any, Dict
+
+from .monitor import ActionLimits
+
+
+MODULE_KEY = "antibetra"
+
+# Defaults used when a key is missing from the group's settings document
+DEFAULTS: Dict[str, Any] = {
+    "max_bans": 5,               # setmaxban: bans + kicks per window
+    "max_ban_minutes": 30,       # setmaxbantime: window length
+    "max_demotions": 2,          # admins demoted per window
+    "action": "demote",          # demote | alert
+}
+
+# Bounds of the setmaxban / setmaxbantime arguments
+MAX_BANS_LIMIT = 1000
+MAX_WINDOW_MINUTES = 24 * 60
+
+# Seconds between snapshots of the windows to the antibetra collection
+FLUSH_INTERVAL = 15.0
+
+
+def action_limits(doc: Dict[str, Any]) -> ActionLimits:
+    """Build ActionLimits from an antibetra settings document."""
+    def get(key: str):
+        return doc.get(key, DEFAULTS[key])
+
+    return ActionLimits(
+        window=float(min(int(get("max_ban_minutes")), MAX_WINDOW_MINUTES) * 60),
+        max_removals=int(get("max_bans")),
+        max_demotions=int(get("max_demotions")),
+    )
@@ -0,0 +1,176 @@
+"""
+Admin Action Monitor
+In-memory sliding windows of moderation actions per (group, admin).
+
+Every ban, kick and demotion performed by an admin is appended to that
+admin's window and expired entries are popped from the left, so a check is
+O(1) amortized and never touches the database: a coup is detected on the
+event that crosses the limit, not after a log query.
+
+Bans and kicks share the removal limit (mass_ban_prevention); demotions of
+other admins have their own limit (admin_coup_protection).
+
+The windows are plain timestamps, so they can be snapshotted to and
+restored from the `antibetra` collection (see persistence.py).
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+# Monitored actions
+BAN = "ban"
+KICK = "kick"
+DEMOTE = "demote"
+KINDS = (BAN, KICK, DEMOTE)
+
+
+class ActionLimits(NamedTuple):
+    window: float = 1800.0      # seconds
+    max_removals: int = 5       # bans + kicks per window (0 = off)
+    max_demotions: int = 2      # admins demoted per window (0 = off)
+
+
+class Trip(NamedTuple):
+    kind: str       # "removals" or "demotions"
+    count: int
+    limit: int
+
+
+class _Window:
+    __slots__ = ("events", "window")
+
+    def __init__(self, window: float):
+        self.events: Dict[str, deque] = {kind: deque() for kind in KINDS}
+        self.window = window
+
+    def expire(self, now: float):
+        horizon = now - self.window
+        for events in self.events.values():
+            while events and events[0] <= horizon:
+                events.popleft()
+
+    def newest(self) -> float:
+        return max((events[-1] for events in self.events.values() if events), default=0.0)
+
+
+class AdminActionMonitor:
+    """Sliding-window counters of moderation actions per (group, admin)."""
+
+    def __init__(self, max_keys: int = 50_000):
+        self.max_keys = max_keys
+        self._windows: "OrderedDict[Tuple[int, int], _Window]" = OrderedDict()
+        self._by_group: Dict[int, set] = {}
+        self._dirty: set = set()
+        self.stats = {"recorded": 0, "trips": 0, "evicted": 0}
+
+    def record(
+        self,
+        group_id: int,
+        admin_id: int,
+        kind: str,
+        limits: ActionLimits,
+        now: Optional[float] = None
+    ) -> Optional[Trip]:
+        """Add one action; returns a Trip when it crosses a limit."""
+        now = time.time() if now is None else now
+        key = (group_id, admin_id)
+
+        window = self._windows.get(key)
+        if window is None:
+            window = self._add(key, limits.window)
+            if len(self._windows) > self.max_keys:
+                self._remove(next(iter(self._windows)))
+                self.stats["evicted"] += 1
+        else:
+            self._windows.move_to_end(key)
+        window.window = limits.window
+
+        window.events[kind].append(now)
+        window.expire(now)
+        self._dirty.add(group_id)
+        self.stats["recorded"] += 1
+
+        if kind == DEMOTE:
+            count, limit, name = len(window.events[DEMOTE]), limits.max_demotions, "demotions"
+        else:
+            count, limit, name = len(window.events[BAN]) + len(window.events[KICK]), limits.max_removals, "removals"
+
+        if limit and count >= limit:
+            self.stats["trips"] += 1
+            return Trip(name, count, limit)
+        return None
+
+    def forget(self, group_id: int, admin_id: int):
+        """Reset an admin's windows (after a trip has been handled)."""
+        if (group_id, admin_id) in self._windows:
+            self._remove((group_id, admin_id))
+            self._dirty.add(group_id)
+
+    def _add(self, key: Tuple[int, int], window: float) -> _Window:
+        entry = self._windows[key] = _Window(window)
+        self._by_group.setdefault(key[0], set()).add(key[1])
+        return entry
+
+    def _remove(self, key: Tuple[int, int]):
+        del self._windows[key]
+        admins = self._by_group.get(key[0])
+        if admins is not None:
+            admins.discard(key[1])
+            if not admins:
+                del self._by_group[key[0]]
+
+    # ==================== Snapshots ====================
+
+    def take_dirty(self) -> List[int]:
+        """Groups changed since the last call."""
+        dirty, self._dirty = self._dirty, set()
+        return list(dirty)
+
+    def mark_dirty(self, group_ids):
+        self._dirty.update(group_ids)
+
+    def snapshot(self, group_id: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Live windows of a group: {admin_id: {"window": s, kind: [ts, ...]}}."""
+        now = time.time() if now is None else now
+        admins: Dict[str, Any] = {}
+        for admin_id in list(self._by_group.get(group_id, ())):
+            window = self._windows[(group_id, admin_id)]
+            window.expire(now)
+            if not window.newest():
+                self._remove((group_id, admin_id))
+                continue
+            admins[str(admin_id)] = {
+                "window": window.window,
+                **{kind: list(events) for kind, events in window.events.items() if events},
+            }
+        return admins
+
+    def restore(self, group_id: int, admins: Dict[str, Any], now: Optional[float] = None):
+        """Merge persisted windows of a group into memory."""
+        now = time.time() if now is None else now
+        for admin_id, state in admins.items():
+            key = (group_id, int(admin_id))
+            window = self._windows.get(key)
+            if window is None:
+                window = self._add(key, float(state.get("window", ActionLimits().window)))
+            for kind in KINDS:
+                if state.get(kind):
+                    merged = sorted(set(window.events[kind]).union(state[kind]))
+                    window.events[kind] = deque(merged)
+            window.expire(now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "tracked": len(self._windows)}
+
+
+__all__ = [
+    "BAN",
+    "KICK",
+    "DEMOTE",
+    "KINDS",
+    "ActionLimits",
+    "Trip",
+    "AdminActionMonitor",
+]
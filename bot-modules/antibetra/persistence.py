@@ -0,0 +1,93 @@
+"""
+Anti-Betrayal Persistence
+Periodic snapshots of the monitor windows in the `antibetra` collection.
+
+The moderation path never waits for MongoDB: changed groups are written
+every FLUSH_INTERVAL seconds (one upsert per group, one bulk_write per
+flush), and windows younger than the longest window are loaded back when
+the module starts, so a restart in the middle of a coup does not reset the
+counters. At most FLUSH_INTERVAL seconds of actions are lost on a crash.
+
+    {"group_id": -100123, "admins": {"111": {"window": 1800, "ban": [ts, ...]}}, "updated_at": ...}
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from config.database import get_antibetra_collection
+
+from .config import FLUSH_INTERVAL, MAX_WINDOW_MINUTES
+from .monitor import AdminActionMonitor
+
+
+class StatePersister:
+    """Write-behind of AdminActionMonitor windows."""
+
+    def __init__(self, monitor: AdminActionMonitor, flush_interval: float = FLUSH_INTERVAL):
+        self.monitor = monitor
+        self.flush_interval = flush_interval
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"flushes": 0, "groups_written": 0, "groups_loaded": 0, "errors": 0}
+
+    async def load(self):
+        """Restore windows that may still be live."""
+        since = datetime.now(timezone.utc) - timedelta(minutes=MAX_WINDOW_MINUTES)
+        cursor = get_antibetra_collection().find(
+            {"updated_at": {"$gte": since}, "admins": {"$exists": True}},
+            {"group_id": 1, "admins": 1, "_id": 0}
+        )
+        async for doc in cursor:
+            self.monitor.restore(doc["group_id"], doc.get("admins") or {})
+            self.stats["groups_loaded"] += 1
+
+    async def flush(self):
+        group_ids = self.monitor.take_dirty()
+        if not group_ids:
+            return
+
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"group_id": group_id},
+                {"$set": {"admins": self.monitor.snapshot(group_id), "updated_at": now}},
+                upsert=True
+            )
+            for group_id in group_ids
+        ]
+        try:
+            await get_antibetra_collection().bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            self.stats["errors"] += 1
+            logger.error(f"Anti-betrayal state flush failed, retrying {len(group_ids)} groups: {e}")
+            self.monitor.mark_dirty(group_ids)
+            return
+
+        self.stats["flushes"] += 1
+        self.stats["groups_written"] += len(operations)
+
+    async def _run(self):
+        try:
+            await self.load()
+        except PyMongoError as e:
+            logger.error(f"Anti-betrayal state load failed: {e}")
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Anti-betrayal persister error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "monitor": self.monitor.get_stats()}
+
+
+__all__ = ["StatePersister"]
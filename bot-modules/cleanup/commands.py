@@ -1,5 +1,167 @@
 """
-commands.py
+Cleanup Commands
+Member cleanup (inactive, never-active and deleted accounts) for group admins.
+
+    clean_preview [inactive|fakes|deleted] [days]   count + sample, confirm button
+    clean_inactive [days]                           preview inactive members
+    clean_fakes                                     preview never-active members
+    clean_execute [inactive|fakes|deleted]          start or resume a cleanup
+
+Cleanups run in the background through the streaming engine (engine.py)
+and are resumed by the scheduled "cleanup" job after a restart.
+
+Commands and the cleanup panel require an admin (manifest "permissions",
+enforced by the AuthMiddleware before they get here).
 """
 
-# TODO: Implement
+from typing import Any, Dict, Optional
+
+from pyrogram import Client, filters
+from pyrogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from i18n.loader import _
+from services.group_service import get_module_settings
+from services.outbound import send_message
+
+from .config import DEFAULTS, FAKES, INACTIVE, MODES, MODULE_KEY
+from .engine import CANCELLED, DONE, FAILED, cleanup_engine
+
+
+async def _params(group_id: int, days: Optional[int] = None) -> Dict[str, Any]:
+    doc = await get_module_settings(group_id, MODULE_KEY)
+    params = {key: doc.get(key, default) for key, default in DEFAULTS.items()}
+    if days is not None:
+        params["inactive_days"] = days
+    return params
+
+
+def _args(message: Message, default_mode: str):
+    """(mode, days) from "/cmd [mode] [days]"."""
+    mode, days = default_mode, None
+    for part in (message.text or "").split()[1:]:
+        if part in MODES:
+            mode = part
+        elif part.isdigit():
+            days = max(1, int(part))
+    return mode, days
+
+
+def _notifier(client: Client, group_id: int):
+    async def on_done(job: Dict[str, Any]):
+        if job["status"] == DONE:
+            text = f"{_(group_id, 'cleanup.cleanup_executed')}\n{_(group_id, 'cleanup.fakes_removed', count=job['kicked'] + job['banned'])}"
+        elif job["status"] == CANCELLED:
+            text = _(group_id, "cleanup.cancelled", count=job["kicked"] + job["banned"])
+        elif job["status"] == FAILED:
+            text = _(group_id, "cleanup.failed", error=job.get("error", ""))
+        else:
+            return
+        send_message(client, group_id, text)
+    return on_done
+
+
+# ==================== Commands ====================
+
+async def _preview(client: Client, message: Message, default_mode: str):
+    group_id = message.chat.id
+    mode, days = _args(message, default_mode)
+    params = await _params(group_id, days)
+    preview = await cleanup_engine.preview(client, group_id, mode, params)
+
+    if not preview["count"]:
+        await message.reply(_(group_id, "cleanup.no_users_to_clean"))
+        return
+
+    lines = [
+        _(group_id, "cleanup.preview_title"),
+        "",
+        _(group_id, "cleanup.confirm_cleanup", count=preview["count"]),
+        "",
+        _(group_id, "cleanup.preview_desc"),
+    ]
+    lines += [f"• <code>{user_id}</code>" for user_id in preview["sample"]]
+    if preview["count"] > len(preview["sample"]):
+        lines.append("…")
+
+    keyboard = InlineKeyboardMarkup([[
+        InlineKeyboardButton(_(group_id, "common.confirm"), callback_data=f"cleanup:run:{mode}:{params['inactive_days']}"),
+        InlineKeyboardButton(_(group_id, "common.cancel"), callback_data="cleanup:close"),
+    ]])
+    await message.reply("\n".join(lines), reply_markup=keyboard)
+
+
+async def clean_preview(client: Client, message: Message):
+    await _preview(client, message, INACTIVE)
+
+
+async def clean_inactive(client: Client, message: Message):
+    await _preview(client, message, INACTIVE)
+
+
+async def clean_fakes(client: Client, message: Message):
+    await _preview(client, message, FAKES)
+
+
+async def clean_execute(client: Client, message: Message):
+    """Start a cleanup without preview, or resume an interrupted one."""
+    group_id = message.chat.id
+    mode, days = _args(message, INACTIVE)
+    await _start(client, group_id, mode, await _params(group_id, days), message.reply)
+
+
+async def _start(client: Client, group_id: int, mode: str, params: Dict[str, Any], reply):
+    if cleanup_engine.start(client, group_id, mode, params, _notifier(client, group_id)) is None:
+        await reply(_(group_id, "cleanup.already_running"))
+        return
+    stop = InlineKeyboardMarkup([[
+        InlineKeyboardButton(_(group_id, "common.cancel"), callback_data=f"cleanup:stop:{mode}")
+    ]])
+    await reply(_(group_id, "cleanup.started"), reply_markup=stop)
+
+
+# ==================== Panel ====================
+
+async def cleanup_panel(client: Client, query: CallbackQuery):
+    """cleanup:run:<mode>:<days> / cleanup:stop:<mode> / cleanup:close"""
+    group_id = query.message.chat.id
+    parts = query.data.split(":")
+    action = parts[1] if len(parts) > 1 else "close"
+
+    if action == "run" and len(parts) == 4 and parts[2] in MODES and parts[3].isdigit():
+        await query.message.edit_reply_markup(None)
+        await _start(client, group_id, parts[2], await _params(group_id, int(parts[3])), query.message.reply)
+    elif action == "stop" and len(parts) == 3:
+        cleanup_engine.cancel(group_id, parts[2])
+        await query.message.edit_reply_markup(None)
+    else:
+        await query.message.delete()
+    await query.answer()
+
+
+# ==================== Scheduled ====================
+
+async def scheduled_cleanup(client: Client, group_id: int):
+    """
+    Resume interrupted cleanups; start the inactive cleanup if auto_cleanup is on.
+
+    Cleanups run in the background (they are paced and can take hours), so
+    this returns right away instead of holding a scheduler slot for them.
+    """
+    params = await _params(group_id)
+    for mode in MODES:
+        if cleanup_engine.is_running(group_id, mode):
+            continue
+        pending = await cleanup_engine.pending_job(group_id, mode) is not None
+        if pending or (mode == INACTIVE and params["auto_cleanup"]):
+            cleanup_engine.start(client, group_id, mode, params, _notifier(client, group_id))
+
+
+def setup(module):
+    """Called by the module loader on first use."""
+    # Group only: the AuthMiddleware checks requirements in groups
+    module.command("clean_preview", filters=filters.group)(clean_preview)
+    module.command("clean_inactive", filters=filters.group)(clean_inactive)
+    module.command("clean_fakes", filters=filters.group)(clean_fakes)
+    module.command("clean_execute", filters=filters.group)(clean_execute)
+    module.callback("cleanup")(cleanup_panel)
+    module.scheduled("cleanup")(scheduled_cleanup)
@@ -1,5 +1,29 @@
 """
-config.py
+Cleanup Configuration
+Defaults for the cleanup settings document.
 """
 
-# TODO: Implement
+from typing import Any, Dict
+
+
+MODULE_KEY = "cleanup"
+
+# Cleanup modes
+INACTIVE = "inactive"   # no activity for inactive_days
+FAKES = "fakes"         # never active since joining, joined more than fake_grace_days ago
+DELETED = "deleted"     # deleted Telegram accounts (found by listing members)
+MODES = (INACTIVE, FAKES, DELETED)
+
+# Defaults used when a key is missing from the group's settings document
+DEFAULTS: Dict[str, Any] = {
+    "inactive_days": 30,
+    "fake_grace_days": 3,
+    "kicks_per_minute": 20,
+    "auto_cleanup": False,       # run an inactive cleanup on CLEANUP_SCHEDULE
+}
+
+# Candidates fetched per cursor batch (and progress checkpoint interval)
+BATCH_SIZE = 200
+
+# Candidates shown by the preview
+SAMPLE_SIZE = 10
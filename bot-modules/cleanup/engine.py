@@ -0,0 +1,377 @@
+"""
+Cleanup Engine
+Streams cleanup candidates and removes them at a paced, flood-wait-aware rate.
+
+Candidates are never loaded as a whole: inactive/fake members are read from
+group_users with a cursor sorted by (last_seen, _id) on the
+(group_id, last_seen, _id) index, deleted accounts are streamed from Telegram's
+member list. Memory is one cursor batch, whatever the group size.
+
+Progress is checkpointed in `cleanup_jobs` after every batch (the last
+(last_seen, _id) processed and the cutoff frozen at start), so a cleanup
+interrupted by a restart resumes where it stopped instead of starting over.
+
+last_seen in group_users is written behind (services/tracking_service.py),
+so every candidate is checked against the in-memory value before it is
+removed; members active since the last flush are skipped.
+
+Kicks go through KickPacer: a fixed interval derived from kicks_per_minute
+that is halved on every FloodWait and recovers gradually on success. The
+calls themselves are sent in the outbound scheduler's moderation lane
+(services/outbound.py), so they share the global rate with everything else.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pyrogram import Client
+from pyrogram.errors import ChatAdminRequired, FloodWait, RPCError, UserNotParticipant
+from loguru import logger
+
+from config.database import get_database, get_group_users_collection
+from services.outbound import Priority, submit
+from services.tracking_service import last_seen_tracker
+
+from .config import BATCH_SIZE, DELETED, FAKES, INACTIVE, SAMPLE_SIZE
+
+
+JOBS_COLLECTION = "cleanup_jobs"
+
+# Unban attempts after a successful ban before the member is left banned
+UNBAN_ATTEMPTS = 3
+
+# Statuses of a cleanup job document
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class KickPacer:
+    """
+    Spaces kicks evenly at up to `per_minute`. A FloodWait sleeps for the
+    requested time and halves the rate (down to 1/16); every success adds
+    back 1/20 of the configured rate.
+    """
+
+    def __init__(self, per_minute: float):
+        self.max_rate = per_minute / 60.0
+        self.rate = self.max_rate
+        self.flood_waits = 0
+        self._next = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        if self._next > now:
+            await asyncio.sleep(self._next - now)
+        self._next = max(now, self._next) + 1.0 / self.rate
+
+    def success(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    async def flood_wait(self, seconds: float):
+        self.flood_waits += 1
+        self.rate = max(self.max_rate / 16, self.rate / 2)
+        logger.warning(f"🧹 FloodWait {seconds}s during cleanup, pacing at {self.rate * 60:.1f}/min")
+        await asyncio.sleep(seconds)
+        self._next = time.monotonic()
+
+
+# ==================== Candidate Queries ====================
+
+def candidate_query(group_id: int, mode: str, cutoff: datetime) -> Dict[str, Any]:
+    """group_users query of a Mongo-backed mode (served by the (group_id, last_seen, _id) index)."""
+    query: Dict[str, Any] = {
+        "group_id": group_id,
+        "last_seen": {"$lt": cutoff},
+        "role": {"$in": ["member", None]},
+        "is_vip": {"$ne": True},
+        "removed_at": {"$exists": False},
+    }
+    if mode == FAKES:
+        # Joined before the cutoff and never seen after joining
+        query["join_time"] = {"$lt": cutoff}
+        query["$expr"] = {"$lte": ["$last_seen", "$join_time"]}
+    return query
+
+
+def _after(checkpoint: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keyset condition: strictly after the checkpointed (last_seen, _id)."""
+    if not checkpoint:
+        return {}
+    last_seen, last_id = checkpoint["last_seen"], checkpoint["last_id"]
+    return {"$or": [
+        {"last_seen": {"$gt": last_seen}},
+        {"last_seen": last_seen, "_id": {"$gt": last_id}},
+    ]}
+
+
+def cutoff_for(mode: str, params: Dict[str, Any], now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    days = params["fake_grace_days"] if mode == FAKES else params["inactive_days"]
+    return now - timedelta(days=int(days))
+
+
+# ==================== Engine ====================
+
+class CleanupEngine:
+    """Preview and checkpointed execution of member cleanups."""
+
+    def __init__(self):
+        # job id -> running task (in this process)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancelled: set = set()
+
+    @staticmethod
+    def job_id(group_id: int, mode: str) -> str:
+        return f"{group_id}:{mode}"
+
+    def is_running(self, group_id: int, mode: str) -> bool:
+        task = self._tasks.get(self.job_id(group_id, mode))
+        return task is not None and not task.done()
+
+    # ==================== Preview ====================
+
+    async def preview(self, client: Client, group_id: int, mode: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Candidate count and a small sample, without materializing the list.
+
+        Returns:
+            {"count": int, "sample": [user_id, ...]}
+        """
+        if mode == DELETED:
+            count, sample = 0, []
+            async for member in client.get_chat_members(group_id):
+                if member.user and member.user.is_deleted:
+                    count += 1
+                    if len(sample) < SAMPLE_SIZE:
+                        sample.append(member.user.id)
+            return {"count": count, "sample": sample}
+
+        query = candidate_query(group_id, mode, cutoff_for(mode, params))
+        collection = get_group_users_collection()
+        count = await collection.count_documents(query)
+        cursor = collection.find(query, {"user_id": 1, "_id": 0}).sort("last_seen", 1).limit(SAMPLE_SIZE)
+        return {"count": count, "sample": [doc["user_id"] async for doc in cursor]}
+
+    # ==================== Execution ====================
+
+    def start(self, client: Client, group_id: int, mode: str, params: Dict[str, Any], on_done=None) -> Optional[asyncio.Task]:
+        """
+        Start (or resume) a cleanup in the background.
+
+        Returns:
+            The cleanup task, or None if the same cleanup is already running
+            in this process
+        """
+        job_id = self.job_id(group_id, mode)
+        if self.is_running(group_id, mode):
+            return None
+        self._cancelled.discard(job_id)
+        task = self._tasks[job_id] = asyncio.create_task(self.run(client, group_id, mode, params, on_done))
+        return task
+
+    def cancel(self, group_id: int, mode: str):
+        """Stop after the current candidate; the checkpoint is kept."""
+        self._cancelled.add(self.job_id(group_id, mode))
+
+    async def pending_job(self, group_id: int, mode: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint of an interrupted cleanup, if any."""
+        return await get_database()[JOBS_COLLECTION].find_one(
+            {"_id": self.job_id(group_id, mode), "status": RUNNING}
+        )
+
+    async def run(self, client: Client, group_id: int, mode: str, params: Dict[str, Any], on_done=None) -> Dict[str, Any]:
+        jobs = get_database()[JOBS_COLLECTION]
+        job_id = self.job_id(group_id, mode)
+        now = datetime.now(timezone.utc)
+
+        job = await jobs.find_one({"_id": job_id, "status": RUNNING})
+        if job is None:
+            job = {
+                "_id": job_id,
+                "group_id": group_id,
+                "mode": mode,
+                "status": RUNNING,
+                "cutoff": cutoff_for(mode, params, now),
+                "checkpoint": None,
+                "kicked": 0,
+                "gone": 0,
+                "failed": 0,
+                "banned": 0,
+                "active": 0,
+                "started_at": now,
+            }
+            await jobs.replace_one({"_id": job_id}, job, upsert=True)
+            logger.info(f"🧹 Cleanup {mode} started in {group_id}")
+        else:
+            job.setdefault("banned", 0)
+            logger.info(f"🧹 Cleanup {mode} resumed in {group_id} ({job['kicked']} already removed)")
+
+        pacer = KickPacer(params["kicks_per_minute"])
+        try:
+            if mode == DELETED:
+                await self._run_deleted(client, job, pacer)
+            else:
+                await self._run_tracked(client, job, pacer)
+            job["status"] = CANCELLED if job_id in self._cancelled else DONE
+        except ChatAdminRequired:
+            job["status"] = FAILED
+            job["error"] = "bot is not an admin with ban rights"
+        except asyncio.CancelledError:
+            # Shutdown: the checkpoint stays RUNNING and is resumed later
+            raise
+        except Exception as e:
+            job["status"] = FAILED
+            job["error"] = str(e)
+            logger.exception(f"❌ Cleanup {mode} failed in {group_id}: {e}")
+
+        job["flood_waits"] = pacer.flood_waits
+        job["finished_at"] = datetime.now(timezone.utc)
+        await jobs.replace_one({"_id": job_id}, job)
+        logger.info(
+            f"🧹 Cleanup {mode} {job['status']} in {group_id}: "
+            f"{job['kicked']} removed, {job['banned']} left banned, {job['gone']} already gone, {job['failed']} failed"
+        )
+
+        if on_done is not None:
+            await on_done(job)
+        return job
+
+    async def _kick(self, client: Client, group_id: int, user_id: int, pacer: KickPacer) -> str:
+        """
+        Remove one member. Returns kicked / gone / failed, or banned when the
+        ban went through but the unban failed UNBAN_ATTEMPTS times (removed,
+        but unable to rejoin until an admin unbans them).
+        """
+        banned = False
+        unban_errors = 0
+        while True:
+            await pacer.wait()
+            try:
+                if not banned:
+                    await submit(group_id, lambda: client.ban_chat_member(group_id, user_id),
+                                 Priority.MODERATION, label="cleanup_ban")
+                    banned = True
+                await submit(group_id, lambda: client.unban_chat_member(group_id, user_id),
+                             Priority.MODERATION, label="cleanup_unban")
+                pacer.success()
+                return "kicked"
+            except FloodWait as e:
+                await pacer.flood_wait(e.value)
+            except UserNotParticipant:
+                return "gone"
+            except ChatAdminRequired:
+                raise
+            except RPCError as e:
+                if not banned:
+                    logger.debug(f"Could not remove {user_id} from {group_id}: {e}")
+                    return "failed"
+                unban_errors += 1
+                if unban_errors >= UNBAN_ATTEMPTS:
+                    logger.warning(f"⚠️  {user_id} stays banned in {group_id}, unban failed: {e}")
+                    return "banned"
+
+    async def _run_tracked(self, client: Client, job: Dict[str, Any], pacer: KickPacer):
+        group_id, job_id = job["group_id"], job["_id"]
+        collection = get_group_users_collection()
+        jobs = get_database()[JOBS_COLLECTION]
+        base = candidate_query(group_id, job["mode"], job["cutoff"])
+        # Stored datetimes come back naive (UTC)
+        cutoff = job["cutoff"].replace(tzinfo=timezone.utc)
+
+        while job_id not in self._cancelled:
+            query = {"$and": [base, _after(job["checkpoint"])]} if job["checkpoint"] else base
+            batch = await collection.find(
+                query, {"user_id": 1, "last_seen": 1}
+            ).sort([("last_seen", 1), ("_id", 1)]).limit(BATCH_SIZE).to_list(length=BATCH_SIZE)
+            if not batch:
+                return
+
+            removed: List[int] = []
+            for doc in batch:
+                if job_id in self._cancelled:
+                    break
+                job["checkpoint"] = {"last_seen": doc["last_seen"], "last_id": doc["_id"]}
+                seen = last_seen_tracker.peek(group_id, doc["user_id"])
+                if seen is not None and seen >= cutoff:
+                    # Active since the last flush of last_seen
+                    job["active"] = job.get("active", 0) + 1
+                    continue
+                outcome = await self._kick(client, group_id, doc["user_id"], pacer)
+                job[outcome] += 1
+                if outcome != "failed":
+                    removed.append(doc["user_id"])
+
+            if removed:
+                await collection.update_many(
+                    {"group_id": group_id, "user_id": {"$in": removed}},
+                    {"$set": {"removed_at": datetime.now(timezone.utc), "removed_by": f"cleanup:{job['mode']}"}}
+                )
+            await jobs.update_one({"_id": job_id}, {"$set": {
+                "checkpoint": job["checkpoint"],
+                "kicked": job["kicked"],
+                "gone": job["gone"],
+                "failed": job["failed"],
+                "banned": job["banned"],
+                "active": job.get("active", 0),
+                "updated_at": datetime.now(timezone.utc),
+            }})
+
+    async def _run_deleted(self, client: Client, job: Dict[str, Any], pacer: KickPacer):
+        """
+        Deleted accounts are only known to Telegram. The member list has no
+        resumable offset, and kicking while it is being read shifts the offsets
+        of the pages still to come (members would be skipped). So each pass
+        reads up to BATCH_SIZE deleted accounts, then kicks them; the next pass
+        reads the list again, until one finds none. A resumed run does the same.
+        """
+        group_id, job_id = job["group_id"], job["_id"]
+        jobs = get_database()[JOBS_COLLECTION]
+        # Accounts that could not be removed stay listed; don't pick them again
+        skipped = set()
+
+        while job_id not in self._cancelled:
+            batch: List[int] = []
+            async for member in client.get_chat_members(group_id):
+                if job_id in self._cancelled:
+                    return
+                if member.user and member.user.is_deleted and member.user.id not in skipped:
+                    batch.append(member.user.id)
+                    if len(batch) >= BATCH_SIZE:
+                        break
+            if not batch:
+                return
+
+            for user_id in batch:
+                if job_id in self._cancelled:
+                    break
+                outcome = await self._kick(client, group_id, user_id, pacer)
+                job[outcome] += 1
+                if outcome != "kicked":
+                    skipped.add(user_id)
+
+            await jobs.update_one({"_id": job_id}, {"$set": {
+                "kicked": job["kicked"],
+                "gone": job["gone"],
+                "failed": job["failed"],
+                "banned": job["banned"],
+                "updated_at": datetime.now(timezone.utc),
+            }})
+
+
+cleanup_engine = CleanupEngine()
+
+
+__all__ = [
+    "KickPacer",
+    "CleanupEngine",
+    "cleanup_engine",
+    "candidate_query",
+    "cutoff_for",
+    "INACTIVE",
+    "FAKES",
+    "DELETED",
+]
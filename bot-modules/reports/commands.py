@@ -1,5 +1,124 @@
 """
-commands.py
+Reports Commands
+Group statistics from the pre-aggregated rollups (services/stats_service.py).
+
+A report over N days reads at most N daily documents (plus the hourly
+documents of today), never the raw logs. stats and top_chatters need the
+"reports" bot permission (manifest, enforced by the AuthMiddleware).
 """
 
-# TODO: Implement
+from datetime import datetime, timedelta, timezone
+
+from pyrogram import Client, filters
+from pyrogram.types import Message
+
+from i18n.loader import _
+from services.group_service import get_module_settings
+from services.stats_service import get_group_stats
+from stats_rollups import day_start, peak_hours
+
+from .config import DEFAULT_DAYS, MAX_DAYS, MODULE_KEY, TOP_CHATTERS
+
+
+def _days(message: Message) -> int:
+    """Optional day count argument: /stats 30"""
+    parts = (message.text or "").split()
+    if len(parts) > 1 and parts[1].isdigit():
+        return max(1, min(int(parts[1]), MAX_DAYS))
+    return DEFAULT_DAYS
+
+
+async def _load(message: Message, days: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return await get_group_stats(message.chat.id, now - timedelta(days=days), now)
+
+
+def _top_lines(summary: dict) -> list:
+    return [
+        f"{rank}. <code>{user_id}</code> — {count}"
+        for rank, (user_id, count) in enumerate(summary["top"].top(TOP_CHATTERS), start=1)
+    ]
+
+
+async def show_stats(client: Client, message: Message):
+    group_id = message.chat.id
+    days = _days(message)
+    summary = await _load(message, days)
+
+    if not summary["documents"]:
+        await message.reply(_(group_id, "reports.no_data"))
+        return
+
+    lines = [
+        _(group_id, "reports.stats_title", days=days),
+        "",
+        f"{_(group_id, 'reports.total_messages')}: {summary['messages']}",
+        f"{_(group_id, 'reports.new_joins')}: {summary['joins']}",
+        f"{_(group_id, 'reports.left_users')}: {summary['leaves']}",
+    ]
+
+    if summary["media"]:
+        kinds = sorted(summary["media"].items(), key=lambda pair: pair[1], reverse=True)
+        lines += ["", _(group_id, "reports.media")]
+        lines += [f"• {kind}: {count}" for kind, count in kinds]
+
+    if summary["actions"]:
+        lines += ["", _(group_id, "reports.moderation")]
+        lines += [f"• {action}: {count}" for action, count in sorted(summary["actions"].items())]
+
+    peaks = peak_hours(summary)
+    if peaks:
+        lines += ["", _(group_id, "reports.peak_hours")]
+        lines += [f"• {hour:02d}:00 — {count}" for hour, count in peaks]
+
+    top = _top_lines(summary)
+    if top:
+        lines += ["", _(group_id, "reports.top_chatters")] + top
+
+    await message.reply("\n".join(lines))
+
+
+async def show_top_chatters(client: Client, message: Message):
+    group_id = message.chat.id
+    summary = await _load(message, _days(message))
+
+    top = _top_lines(summary)
+    if not top:
+        await message.reply(_(group_id, "reports.no_data"))
+        return
+
+    await message.reply("\n".join([_(group_id, "reports.top_chatters"), ""] + top))
+
+
+async def send_daily_report(client: Client, group_id: int):
+    """Scheduled: yesterday's report, for groups with daily_report enabled."""
+    doc = await get_module_settings(group_id, MODULE_KEY)
+    if not doc.get("daily_report", False):
+        return
+
+    today = day_start(datetime.now(timezone.utc))
+    yesterday = today - timedelta(days=1)
+    summary = await get_group_stats(group_id, yesterday, today)
+    if not summary["documents"]:
+        return
+
+    lines = [
+        _(group_id, "reports.daily_report_title"),
+        f"{_(group_id, 'reports.date')}: {yesterday:%Y-%m-%d}",
+        "",
+        f"{_(group_id, 'reports.total_messages')}: {summary['messages']}",
+        f"{_(group_id, 'reports.new_joins')}: {summary['joins']}",
+        f"{_(group_id, 'reports.left_users')}: {summary['leaves']}",
+    ]
+    top = _top_lines(summary)
+    if top:
+        lines += ["", _(group_id, "reports.top_chatters")] + top
+
+    await client.send_message(group_id, "\n".join(lines))
+
+
+def setup(module):
+    """Called by the module loader on first use."""
+    module.command("stats", filters=filters.group)(show_stats)
+    module.command("top_chatters", filters=filters.group)(show_top_chatters)
+    module.scheduled("daily_report")(send_daily_report)
@@ -1,5 +1,14 @@
 """
-config.py
+Reports Configuration
+Defaults of the reports module.
 """
 
-# TODO: Implement
+
+MODULE_KEY = "reports"
+
+# Report range of /stats and /top_chatters without an argument, and its cap
+DEFAULT_DAYS = 7
+MAX_DAYS = 365
+
+# Senders listed in top chatters
+TOP_CHATTERS = 10
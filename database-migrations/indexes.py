@@ -0,0 +1,230 @@
+"""
+Index Declarations
+Single source of truth for MongoDB indexes.
+
+Shared by bot-core (config/database.py), admin-api (services/database.py)
+and the 002_add_indexes migration. Indexes are declared as data and
+reconciled against list_indexes(): only missing or changed indexes are
+built, one create_indexes() batch per collection, collections in parallel.
+Indexes superseded by a declaration are listed in RETIRED and dropped;
+other undeclared indexes are left alone.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+
+# ==================== Declarations ====================
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel("user_id", unique=True),
+        IndexModel("username"),
+        IndexModel("is_sudo"),
+    ],
+    "groups": [
+        IndexModel("group_id", unique=True),
+        IndexModel("approved"),
+        IndexModel("owner_user_id"),
+        # admin-api group list; _id breaks ties for keyset pagination
+        IndexModel([("approved", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel("updated_at"),  # group cache polling fallback
+    ],
+    "group_users": [
+        IndexModel([("group_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("group_id", ASCENDING), ("role", ASCENDING)]),
+        IndexModel([("group_id", ASCENDING), ("is_vip", ASCENDING)]),
+        # _id breaks ties for keyset pagination (admin-api member lists, cleanup batches)
+        IndexModel([("group_id", ASCENDING), ("last_seen", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("group_id", ASCENDING), ("join_time", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel("added_by"),
+        IndexModel("invite_link_id"),
+    ],
+    "admin_defaults": [
+        IndexModel("group_id", unique=True),
+        IndexModel("updated_at"),  # group cache polling fallback
+    ],
+    "admin_overrides": [
+        IndexModel([("group_id", ASCENDING), ("admin_user_id", ASCENDING)], unique=True),
+        IndexModel("group_id"),
+        IndexModel("updated_at"),  # group cache polling fallback
+    ],
+    "invite_links": [
+        IndexModel([("group_id", ASCENDING), ("link_id", ASCENDING)], unique=True),
+        IndexModel("group_id"),
+        IndexModel("created_by"),
+        IndexModel([("group_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "logs": [  # legacy one-document-per-event layout (read-only after migration 003)
+        IndexModel([("group_id", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("group_id", ASCENDING), ("type", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel("actor_id"),
+        IndexModel("target_id"),
+        IndexModel("timestamp", expireAfterSeconds=60 * 60 * 24 * 90),  # 90 days TTL
+    ],
+    "logs_buckets": [
+        # group timeline; _id breaks ties for keyset pagination
+        IndexModel([("group_id", ASCENDING), ("bucket_start", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("group_id", ASCENDING), ("type", ASCENDING), ("bucket_start", DESCENDING)]),
+        IndexModel("bucket_end", expireAfterSeconds=60 * 60 * 24 * 90),  # 90 days TTL
+    ],
+    "stats_hourly": [
+        IndexModel([("group_id", ASCENDING), ("hour", ASCENDING)], unique=True),
+        IndexModel("hour", expireAfterSeconds=60 * 60 * 24 * 35),  # 35 days TTL, also serves rollups
+    ],
+    "stats_daily": [
+        IndexModel([("group_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        IndexModel("day", expireAfterSeconds=60 * 60 * 24 * 400),  # 400 days TTL, also serves rollups
+    ],
+    "stats_monthly": [
+        IndexModel([("group_id", ASCENDING), ("month", ASCENDING)], unique=True),
+    ],
+    "settings": [
+        IndexModel([("group_id", ASCENDING), ("module_key", ASCENDING)], unique=True),
+        IndexModel("group_id"),
+        IndexModel("updated_at"),  # group cache polling fallback
+    ],
+    "antibetra": [
+        IndexModel("group_id", unique=True),
+    ],
+}
+
+# Key specs of indexes replaced by a declaration above (dropped if present)
+RETIRED: Dict[str, List[List[Tuple[str, int]]]] = {
+    "group_users": [
+        # Superseded by the (..., _id) keyset pagination indexes
+        [("group_id", ASCENDING), ("last_seen", DESCENDING)],
+        [("group_id", ASCENDING), ("join_time", DESCENDING)],
+    ],
+}
+
+# Index options compared when deciding whether an index changed
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+# ==================== Reconciliation ====================
+
+def _key_of(index: Dict[str, Any]) -> Tuple:
+    return tuple(index["key"].items())
+
+
+def _options_of(index: Dict[str, Any]) -> Dict[str, Any]:
+    options = {name: index[name] for name in _COMPARED_OPTIONS if name in index}
+    if not options.get("unique"):
+        options.pop("unique", None)
+    if not options.get("sparse"):
+        options.pop("sparse", None)
+    return options
+
+
+def _without_ttl(options: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in options.items() if name != "expireAfterSeconds"}
+
+
+async def _reconcile_collection(
+    db,
+    name: str,
+    models: List[IndexModel],
+    retired: List[List[Tuple[str, int]]]
+) -> Dict[str, int]:
+    collection = db[name]
+
+    existing: Dict[Tuple, Dict[str, Any]] = {}
+    async for index in collection.list_indexes():
+        existing[_key_of(index)] = index
+
+    dropped = 0
+    for keys in retired:
+        current = existing.pop(tuple(keys), None)
+        if current is not None:
+            await collection.drop_index(current["name"])
+            dropped += 1
+
+    to_create: List[IndexModel] = []
+    ttl_updated = 0
+    rebuilt = 0
+
+    for model in models:
+        wanted = model.document
+        current = existing.get(_key_of(wanted))
+
+        if current is None:
+            to_create.append(model)
+            continue
+
+        wanted_options = _options_of(wanted)
+        current_options = _options_of(current)
+        if wanted_options == current_options:
+            continue
+
+        # Only the TTL changed: update in place instead of rebuilding
+        if ("expireAfterSeconds" in wanted_options and "expireAfterSeconds" in current_options
+                and _without_ttl(wanted_options) == _without_ttl(current_options)):
+            await db.command(
+                "collMod", name,
+                index={"name": current["name"], "expireAfterSeconds": wanted_options["expireAfterSeconds"]}
+            )
+            ttl_updated += 1
+            continue
+
+        await collection.drop_index(current["name"])
+        to_create.append(model)
+        rebuilt += 1
+
+    if to_create:
+        await collection.create_indexes(to_create)
+
+    return {
+        "created": len(to_create) - rebuilt,
+        "rebuilt": rebuilt,
+        "ttl_updated": ttl_updated,
+        "unchanged": len(models) - len(to_create) - ttl_updated,
+        "dropped": dropped,
+    }
+
+
+async def reconcile_indexes(
+    db,
+    indexes: Dict[str, List[IndexModel]] = None,
+    retired: Dict[str, List[List[Tuple[str, int]]]] = None
+) -> Dict[str, Any]:
+    """
+    Make the database indexes match the declarations.
+
+    Args:
+        db: Motor database
+        indexes: Declarations (defaults to INDEXES)
+        retired: Key specs of indexes to drop (defaults to RETIRED)
+
+    Returns:
+        Summary: per-collection counts, totals and elapsed_ms
+    """
+    indexes = INDEXES if indexes is None else indexes
+    retired = RETIRED if retired is None else retired
+    started = time.perf_counter()
+
+    names = list(indexes) + [name for name in retired if name not in indexes]
+    results = await asyncio.gather(*(
+        _reconcile_collection(db, name, indexes.get(name, []), retired.get(name, [])) for name in names
+    ))
+
+    per_collection = dict(zip(names, results))
+    totals = {
+        key: sum(result[key] for result in results)
+        for key in ("created", "rebuilt", "ttl_updated", "unchanged", "dropped")
+    }
+
+    return {
+        "collections": per_collection,
+        **totals,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+__all__ = [
+    "INDEXES",
+    "RETIRED",
+    "reconcile_indexes",
+]
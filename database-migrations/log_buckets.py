@@ -0,0 +1,158 @@
+"""
+Log Buckets
+Storage layout of the bucketed event log (collection `logs_buckets`).
+
+Instead of one document per event (the legacy `logs` collection), events are
+grouped into one document per group, per type, per LOG_BUCKET_MINUTES:
+
+    {
+        "group_id": -100123,
+        "type": "ban",
+        "bucket_start": ISODate("2024-05-01T10:00:00Z"),
+        "bucket_end": ISODate("2024-05-01T11:00:00Z"),   # TTL index field
+        "count": 3,
+        "first_ts": ISODate(...), "last_ts": ISODate(...),
+        "events": [
+            {"o": 125034, "a": 111, "t": 222, "d": {"reason": "spam"}},  # o = ms offset
+            ...
+        ]
+    }
+
+Index maintenance is paid once per bucket instead of once per event, and
+field names are stored once per bucket instead of once per event.
+
+Shared by bot-core (writer/reader), admin-api, the 003 migration and the
+storage benchmark.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+
+LOG_BUCKETS_COLLECTION = "logs_buckets"
+
+# Max events per bucket document; a full bucket continues in a new document
+DEFAULT_MAX_EVENTS = 1000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Legacy `logs` fields that map onto compact event fields
+_CORE_FIELDS = ("_id", "group_id", "type", "timestamp", "actor_id", "target_id")
+
+
+def _aware(ts: datetime) -> datetime:
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def bucket_start(ts: datetime, minutes: int) -> datetime:
+    """Start of the bucket containing ts."""
+    size = minutes * 60
+    seconds = int((_aware(ts) - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % size)
+
+
+def compact_event(
+    ts: datetime,
+    start: datetime,
+    actor_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Compact event stored inside a bucket (empty fields are omitted)."""
+    event: Dict[str, Any] = {"o": int((_aware(ts) - start).total_seconds() * 1000)}
+    if actor_id is not None:
+        event["a"] = actor_id
+    if target_id is not None:
+        event["t"] = target_id
+    if data:
+        event["d"] = data
+    return event
+
+
+def expand_event(bucket: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact event back to the flat log entry shape."""
+    return {
+        "group_id": bucket["group_id"],
+        "type": bucket["type"],
+        "timestamp": _aware(bucket["bucket_start"]) + timedelta(milliseconds=event["o"]),
+        "actor_id": event.get("a"),
+        "target_id": event.get("t"),
+        "data": event.get("d") or {},
+    }
+
+
+def legacy_to_event(doc: Dict[str, Any]) -> Tuple[int, str, datetime, Optional[int], Optional[int], Dict[str, Any]]:
+    """Convert a legacy one-document-per-event log into writer arguments."""
+    data = {name: value for name, value in doc.items() if name not in _CORE_FIELDS}
+    return (
+        doc["group_id"],
+        doc.get("type", "unknown"),
+        _aware(doc["timestamp"]),
+        doc.get("actor_id"),
+        doc.get("target_id"),
+        data,
+    )
+
+
+def bucket_updates(
+    events: Iterable[Tuple[int, str, datetime, Optional[int], Optional[int], Optional[Dict[str, Any]]]],
+    minutes: int,
+    max_events: int = DEFAULT_MAX_EVENTS
+) -> List[UpdateOne]:
+    """
+    Build one upsert per (group, type, bucket) chunk: $push the compact
+    events into a bucket document that still has room for the whole chunk
+    (or a new one), so no document ever holds more than max_events.
+
+    Args:
+        events: (group_id, type, timestamp, actor_id, target_id, data)
+        minutes: Bucket width
+        max_events: Events per bucket document
+    """
+    grouped: Dict[Tuple[int, str, datetime], List[Dict[str, Any]]] = {}
+    bounds: Dict[Tuple[int, str, datetime], Tuple[datetime, datetime]] = {}
+
+    for group_id, event_type, ts, actor_id, target_id, data in events:
+        start = bucket_start(ts, minutes)
+        key = (group_id, event_type, start)
+        grouped.setdefault(key, []).append(compact_event(ts, start, actor_id, target_id, data))
+
+        ts = _aware(ts)
+        first, last = bounds.get(key, (ts, ts))
+        bounds[key] = (min(first, ts), max(last, ts))
+
+    operations = []
+    for (group_id, event_type, start), compact in grouped.items():
+        first, last = bounds[(group_id, event_type, start)]
+        for offset in range(0, len(compact), max_events):
+            chunk = compact[offset:offset + max_events]
+            operations.append(UpdateOne(
+                {
+                    "group_id": group_id,
+                    "type": event_type,
+                    "bucket_start": start,
+                    "count": {"$lte": max_events - len(chunk)},
+                },
+                {
+                    "$push": {"events": {"$each": chunk}},
+                    "$inc": {"count": len(chunk)},
+                    "$min": {"first_ts": first},
+                    "$max": {"last_ts": last},
+                    "$setOnInsert": {"bucket_end": start + timedelta(minutes=minutes)},
+                },
+                upsert=True
+            ))
+    return operations
+
+
+__all__ = [
+    "LOG_BUCKETS_COLLECTION",
+    "DEFAULT_MAX_EVENTS",
+    "bucket_start",
+    "compact_event",
+    "expand_event",
+    "legacy_to_event",
+    "bucket_updates",
+]
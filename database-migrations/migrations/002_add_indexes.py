@@ -1,5 +1,36 @@
+#!/usr/bin/env python3
 """
 002_add_indexes.py
+Reconcile MongoDB indexes with the shared declarations (indexes.py).
+
+Use this when bot-core/admin-api run with SKIP_INDEX_BOOTSTRAP=true.
+
+Usage:
+    MONGODB_URI=mongodb://localhost:27017/ DATABASE_NAME=telegram_group_bot \\
+        python database-migrations/migrations/002_add_indexes.py
 """
 
-# TODO: Implement
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from indexes import reconcile_indexes
+
+
+async def main():
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    try:
+        db = client[os.getenv("DATABASE_NAME", "telegram_group_bot")]
+        summary = await reconcile_indexes(db)
+        print(json.dumps(summary, indent=2))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+003_bucket_logs.py
+Copy the legacy one-document-per-event `logs` collection into time buckets
+(`logs_buckets`, layout in log_buckets.py).
+
+Legacy logs are read in _id order in batches and written with the same
+bucket upserts the bot uses. Progress (last copied _id) is stored in the
+`migrations` collection after every batch, so an interrupted run continues
+where it stopped; a batch interrupted mid-write may be copied twice.
+
+Usage:
+    MONGODB_URI=mongodb://localhost:27017/ DATABASE_NAME=telegram_group_bot \\
+        python database-migrations/migrations/003_bucket_logs.py [--batch-size 5000] [--drop-legacy]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from log_buckets import LOG_BUCKETS_COLLECTION, bucket_updates, legacy_to_event
+
+MIGRATION_ID = "003_bucket_logs"
+
+
+async def migrate(db, batch_size: int, bucket_minutes: int, max_events: int, drop_legacy: bool):
+    legacy = db.logs
+    buckets = db[LOG_BUCKETS_COLLECTION]
+    state = await db.migrations.find_one({"_id": MIGRATION_ID}) or {}
+
+    if state.get("completed_at"):
+        print(f"{MIGRATION_ID} already completed at {state['completed_at']}")
+    else:
+        last_id = state.get("last_id")
+        copied = state.get("copied", 0)
+        started = time.perf_counter()
+
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            docs = await legacy.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not docs:
+                break
+
+            events = [legacy_to_event(doc) for doc in docs if doc.get("group_id") is not None and doc.get("timestamp")]
+            if events:
+                await buckets.bulk_write(bucket_updates(events, bucket_minutes, max_events), ordered=False)
+
+            last_id = docs[-1]["_id"]
+            copied += len(events)
+            await db.migrations.update_one(
+                {"_id": MIGRATION_ID},
+                {"$set": {"last_id": last_id, "copied": copied, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+            print(f"copied {copied:,} events ({copied / (time.perf_counter() - started):,.0f}/s)")
+
+        await db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"completed_at": datetime.now(timezone.utc), "bucket_minutes": bucket_minutes}},
+            upsert=True
+        )
+        print(f"{MIGRATION_ID} completed: {copied:,} events")
+
+    if drop_legacy:
+        await legacy.drop()
+        print("legacy logs collection dropped")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--bucket-minutes", type=int, default=int(os.getenv("LOG_BUCKET_MINUTES", "60")))
+    parser.add_argument("--max-events", type=int, default=int(os.getenv("LOG_BUCKET_MAX_EVENTS", "1000")))
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop `logs` after a completed copy")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    try:
+        db = client[os.getenv("DATABASE_NAME", "telegram_group_bot")]
+        await migrate(db, args.batch_size, args.bucket_minutes, args.max_events, args.drop_legacy)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
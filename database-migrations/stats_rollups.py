@@ -0,0 +1,344 @@
+"""
+Stats Rollups
+Layout of the pre-aggregated group statistics (`stats_hourly`,
+`stats_daily`, `stats_monthly`) and the merge/read helpers shared by
+bot-core (writer, scheduled rollups, reports module) and admin-api.
+
+Hourly documents are written incrementally by bot-core with $inc:
+
+    {
+        "group_id": -100123,
+        "hour": ISODate("2024-05-01T10:00:00Z"),
+        "messages": 420, "joins": 12, "leaves": 3,
+        "actions": {"delete": 9, "ban": 1},          # moderation actions
+        "media": {"text": 380, "photo": 25, ...},    # message kinds
+        "top": {"<writer id>": [[user_id, count, error], ...]}   # top-K sketches
+    }
+
+Daily and monthly documents have the same counters, merged top users
+(`top`: one sketch) and `hours`: messages per UTC hour of day (24 ints, for
+peak hours). They are recomputed from the level below, so re-running a
+rollup is idempotent.
+
+Reading a range uses the coarsest level that covers each part of it
+(months, then days, then hours), so a 30-day report reads ~30 documents
+instead of every log entry.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+
+STATS_HOURLY_COLLECTION = "stats_hourly"
+STATS_DAILY_COLLECTION = "stats_daily"
+STATS_MONTHLY_COLLECTION = "stats_monthly"
+
+# Plain counters of every level
+COUNTERS = ("messages", "joins", "leaves")
+# Counter maps of every level
+COUNTER_MAPS = ("actions", "media")
+
+DEFAULT_TOP_K = 20
+
+
+# ==================== Top-K Sketch ====================
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch (Metwally et al.) with at most k entries.
+
+    Every item with a true count above n/k is kept; a kept item's count
+    overestimates its true count by at most its recorded error. Sketches are
+    mergeable, so hourly sketches roll up into daily and monthly ones.
+    """
+
+    __slots__ = ("k", "counts")
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        self.k = k
+        # item -> [count, error]
+        self.counts: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, item: int, count: int = 1):
+        entry = self.counts.get(item)
+        if entry is not None:
+            entry[0] += count
+        elif len(self.counts) < self.k:
+            self.counts[item] = [count, 0]
+        else:
+            # Replace the minimum (O(k), k is small); its count becomes the error bound
+            victim = min(self.counts, key=lambda key: self.counts[key][0])
+            floor = self.counts.pop(victim)[0]
+            self.counts[item] = [floor + count, floor]
+
+    def min_count(self) -> int:
+        if len(self.counts) < self.k:
+            return 0
+        return min(entry[0] for entry in self.counts.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Merge another sketch into this one (Agarwal et al., mergeable summaries)."""
+        own_floor, other_floor = self.min_count(), other.min_count()
+        merged: Dict[int, List[int]] = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count, error = self.counts.get(item, (own_floor, own_floor))
+            other_count, other_error = other.counts.get(item, (other_floor, other_floor))
+            merged[item] = [count + other_count, error + other_error]
+
+        kept = sorted(merged.items(), key=lambda pair: pair[1][0], reverse=True)[:self.k]
+        self.counts = {item: entry for item, entry in kept}
+        return self
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(item, estimated count), highest first."""
+        ranked = sorted(self.counts.items(), key=lambda pair: pair[1][0], reverse=True)
+        return [(item, entry[0]) for item, entry in ranked[:n]]
+
+    def to_doc(self) -> List[List[int]]:
+        return [[item, count, error] for item, (count, error) in self.counts.items()]
+
+    @classmethod
+    def from_doc(cls, doc: Optional[List[List[int]]], k: int = DEFAULT_TOP_K) -> "SpaceSaving":
+        sketch = cls(k)
+        for item, count, error in doc or ():
+            sketch.counts[item] = [count, error]
+        return sketch
+
+
+# ==================== Time Helpers ====================
+
+def _aware(ts: datetime) -> datetime:
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def hour_start(ts: datetime) -> datetime:
+    return _aware(ts).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(ts: datetime) -> datetime:
+    return _aware(ts).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def month_start(ts: datetime) -> datetime:
+    return day_start(ts).replace(day=1)
+
+
+def next_month(start: datetime) -> datetime:
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+# ==================== Merging ====================
+
+def empty_summary(k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    return {
+        **{name: 0 for name in COUNTERS},
+        **{name: {} for name in COUNTER_MAPS},
+        "hours": [0] * 24,
+        "top": SpaceSaving(k),
+        "documents": 0,
+    }
+
+
+def merge_doc(summary: Dict[str, Any], doc: Dict[str, Any]):
+    """Add an hourly, daily or monthly document into a summary."""
+    for name in COUNTERS:
+        summary[name] += doc.get(name, 0)
+    for name in COUNTER_MAPS:
+        target = summary[name]
+        for key, value in (doc.get(name) or {}).items():
+            target[key] = target.get(key, 0) + value
+
+    if "hours" in doc:
+        summary["hours"] = [a + b for a, b in zip(summary["hours"], doc["hours"])]
+    elif "hour" in doc:
+        summary["hours"][_aware(doc["hour"]).hour] += doc.get("messages", 0)
+
+    top = doc.get("top")
+    k = summary["top"].k
+    if isinstance(top, dict):
+        # Hourly: one sketch per writer
+        for sketch in top.values():
+            summary["top"].merge(SpaceSaving.from_doc(sketch, k))
+    elif top:
+        summary["top"].merge(SpaceSaving.from_doc(top, k))
+
+    summary["documents"] += 1
+
+
+def summary_fields(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary as stored in a daily/monthly document."""
+    return {
+        **{name: summary[name] for name in COUNTERS},
+        **{name: summary[name] for name in COUNTER_MAPS},
+        "hours": summary["hours"],
+        "top": summary["top"].to_doc(),
+    }
+
+
+# ==================== Rollups ====================
+
+async def _rollup(source, target, key: str, source_key: str, start: datetime, end: datetime, k: int) -> int:
+    summaries: Dict[int, Dict[str, Any]] = {}
+    async for doc in source.find({source_key: {"$gte": start, "$lt": end}}):
+        summary = summaries.get(doc["group_id"])
+        if summary is None:
+            summary = summaries[doc["group_id"]] = empty_summary(k)
+        merge_doc(summary, doc)
+
+    operations = [
+        UpdateOne(
+            {"group_id": group_id, key: start},
+            {"$set": {**summary_fields(summary), "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        for group_id, summary in summaries.items()
+    ]
+    if operations:
+        await target.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def rollup_day(db, day: datetime, k: int = DEFAULT_TOP_K) -> int:
+    """Merge the hourly documents of one UTC day into stats_daily (all groups)."""
+    start = day_start(day)
+    return await _rollup(
+        db[STATS_HOURLY_COLLECTION], db[STATS_DAILY_COLLECTION],
+        "day", "hour", start, start + timedelta(days=1), k
+    )
+
+
+async def rollup_month(db, month: datetime, k: int = DEFAULT_TOP_K) -> int:
+    """Merge the daily documents of one UTC month into stats_monthly (all groups)."""
+    start = month_start(month)
+    return await _rollup(
+        db[STATS_DAILY_COLLECTION], db[STATS_MONTHLY_COLLECTION],
+        "month", "day", start, next_month(start), k
+    )
+
+
+# ==================== Reading ====================
+
+def plan_ranges(since: datetime, until: datetime) -> Tuple[List[datetime], List[datetime], List[Tuple[datetime, datetime]]]:
+    """
+    Split [since, until) into whole months, whole days and leftover hour ranges.
+
+    Returns:
+        (month starts, day starts, [(hour range start, end)])
+    """
+    since, until = hour_start(since), _aware(until)
+    months, days, hours = [], [], []
+
+    cursor = since
+    while cursor < until:
+        if cursor == month_start(cursor) and next_month(cursor) <= until:
+            months.append(cursor)
+            cursor = next_month(cursor)
+        elif cursor == day_start(cursor) and cursor + timedelta(days=1) <= until:
+            days.append(cursor)
+            cursor += timedelta(days=1)
+        else:
+            end = min(day_start(cursor) + timedelta(days=1), until)
+            hours.append((cursor, end))
+            cursor = end
+    return months, days, hours
+
+
+async def load_stats(
+    db,
+    group_id: int,
+    since: datetime,
+    until: datetime,
+    k: int = DEFAULT_TOP_K
+) -> Dict[str, Any]:
+    """
+    Statistics of a group for [since, until) (hour granularity).
+
+    Months and days whose rollup has not run yet are read from the level
+    below, so recent ranges are complete before the scheduler catches up.
+    """
+    months, days, hours = plan_ranges(since, until)
+    summary = empty_summary(k)
+
+    if months:
+        found = set()
+        async for doc in db[STATS_MONTHLY_COLLECTION].find({"group_id": group_id, "month": {"$in": months}}):
+            merge_doc(summary, doc)
+            found.add(_aware(doc["month"]))
+        for month in months:
+            if month not in found:
+                end, day = next_month(month), month
+                while day < end:
+                    days.append(day)
+                    day += timedelta(days=1)
+
+    if days:
+        found = set()
+        async for doc in db[STATS_DAILY_COLLECTION].find({"group_id": group_id, "day": {"$in": days}}):
+            merge_doc(summary, doc)
+            found.add(_aware(doc["day"]))
+        hours.extend((day, day + timedelta(days=1)) for day in days if day not in found)
+
+    if hours:
+        query = {
+            "group_id": group_id,
+            "$or": [{"hour": {"$gte": start, "$lt": end}} for start, end in hours],
+        }
+        async for doc in db[STATS_HOURLY_COLLECTION].find(query):
+            merge_doc(summary, doc)
+
+    return summary
+
+
+def peak_hours(summary: Dict[str, Any], n: int = 3) -> List[Tuple[int, int]]:
+    """(UTC hour of day, messages) of the busiest hours."""
+    ranked = sorted(enumerate(summary["hours"]), key=lambda pair: pair[1], reverse=True)
+    return [(hour, count) for hour, count in ranked[:n] if count]
+
+
+def hourly_updates(
+    rows: Iterable[Tuple[int, datetime, Dict[str, int], Optional[Tuple[str, List[List[int]]]]]]
+) -> List[UpdateOne]:
+    """
+    Build one $inc upsert per (group, hour).
+
+    Args:
+        rows: (group_id, hour, {dotted counter: delta}, (writer id, sketch doc) or None)
+    """
+    operations = []
+    for group_id, hour, increments, sketch in rows:
+        update: Dict[str, Any] = {}
+        if increments:
+            update["$inc"] = increments
+        if sketch is not None:
+            writer_id, doc = sketch
+            update["$set"] = {f"top.{writer_id}": doc}
+        if update:
+            operations.append(UpdateOne({"group_id": group_id, "hour": hour}, update, upsert=True))
+    return operations
+
+
+__all__ = [
+    "STATS_HOURLY_COLLECTION",
+    "STATS_DAILY_COLLECTION",
+    "STATS_MONTHLY_COLLECTION",
+    "DEFAULT_TOP_K",
+    "SpaceSaving",
+    "hour_start",
+    "day_start",
+    "month_start",
+    "next_month",
+    "empty_summary",
+    "merge_doc",
+    "summary_fields",
+    "rollup_day",
+    "rollup_month",
+    "plan_ranges",
+    "load_stats",
+    "peak_hours",
+    "hourly_updates",
+]